@@ -0,0 +1,248 @@
+"""Offline micro-benchmarks for the model layer.
+
+Runs against recorded Notion payloads in `benchmarks/payloads/` and needs no network access.
+
+Usage:
+    python -m benchmarks.model                   # Run and compare against `baseline.json`.
+    python -m benchmarks.model --save-baseline   # Run and store the results as new baseline.
+
+Exits with status 1 if any benchmark got slower or allocates more than the baseline allows.
+Timings depend on the machine, so baselines should be created on the machine running the check.
+"""
+import argparse
+import json
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from notion import NotionClient
+from notion.model import block as blocks
+from notion.model import filters
+
+BENCHMARK_DIR = Path(__file__).parent
+PAYLOAD_DIR = BENCHMARK_DIR / "payloads"
+BASELINE_PATH = BENCHMARK_DIR / "baseline.json"
+
+
+def load_payload(name: str) -> dict:
+    with open(PAYLOAD_DIR / f"{name}.json", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class FakeClient(NotionClient):
+    "A `NotionClient` whose requests are answered from a list of prepared result sets."
+
+    def __init__(self, result_sets: List[dict]):
+        super().__init__("secret_benchmark", codec="json")
+        self.result_sets = result_sets
+        self.calls = 0
+
+    def _make_request(self, request_type: str, entity, payload=None) -> dict:
+        result_set = self.result_sets[self.calls % len(self.result_sets)]
+        self.calls += 1
+        return result_set
+
+
+# ---------------------------------------------------------------------------
+# Benchmarks
+# ---------------------------------------------------------------------------
+
+
+def build_benchmarks() -> Dict[str, Callable[[], object]]:
+    query = load_payload("database_query")
+    children = load_payload("block_children")
+    client = FakeClient([query])
+    strict_client = FakeClient([query])
+    strict_client.strict = True
+
+    page_data = query["results"]
+    block_data = children["results"]
+    pages = [client._decode_page(data) for data in page_data]
+    decoded_blocks = [blocks.block_from_json(data, client, True) for data in block_data]
+    text_blocks = [block for block in decoded_blocks if hasattr(block, "text")]
+
+    # Ten result sets of 100 pages each, chained together by cursors.
+    paginated_sets = [
+        {**query, "has_more": i < 9, "next_cursor": f"cursor-{i}" if i < 9 else None}
+        for i in range(10)
+    ]
+
+    def decode_pages():
+        return [client._decode_page(data) for data in page_data]
+
+    def decode_pages_strict():
+        return [strict_client._decode_page(data) for data in page_data]
+
+    def decode_blocks():
+        return [blocks.block_from_json(data, client, True) for data in block_data]
+
+    def decode_blocks_strict():
+        return [blocks.block_from_json(data, client) for data in block_data]
+
+    def serialize_blocks():
+        return [block.to_json() for block in decoded_blocks]
+
+    def serialize_new_blocks():
+        return [
+            blocks.Paragraph("Some text").to_json(),
+            blocks.HeadingOne("Heading").to_json(),
+            blocks.ToDo("Task", checked=True).to_json(),
+            blocks.Code("print('Hello World')", language="python").to_json(),
+            blocks.Callout("Note", "💡", children=[blocks.Quote("Quote")]).to_json(),
+            blocks.Table(
+                table_width=2,
+                children=[blocks.TableRow(["a", "b"]), blocks.TableRow(["c", "d"])],
+            ).to_json(),
+        ]
+
+    def serialize_filter():
+        return (
+            filters.Checkbox("Done").equals(False)
+            & (
+                filters.MultiSelect("Tags").contains("Backend")
+                | filters.MultiSelect("Tags").contains("Ops")
+            )
+            & filters.Number("Estimate").less_than_or_equal_to(8)
+            & filters.Date("Due").on_or_after("2022-08-01")
+        ).to_json()
+
+    def page_accessors():
+        return [
+            (page.id, page.title, page.parent, page.properties, page.url, page.archived)
+            for page in pages
+        ]
+
+    def page_timestamps():
+        return [(page.created_time, page.last_edited_time) for page in pages]
+
+    def block_accessors():
+        return [(block.type, block.has_children, block.text) for block in text_blocks]
+
+    # Building a client sets up its session and scheduler, which isn't what's measured.
+    paginating_client = FakeClient(paginated_sets)
+
+    def paginate():
+        paginating_client.calls = 0
+        return paginating_client._paginate("post", "databases/benchmark/query")
+
+    return {
+        "decode_pages": decode_pages,
+        "decode_pages_strict": decode_pages_strict,
+        "decode_blocks": decode_blocks,
+        "decode_blocks_strict": decode_blocks_strict,
+        "serialize_blocks": serialize_blocks,
+        "serialize_new_blocks": serialize_new_blocks,
+        "serialize_filter": serialize_filter,
+        "page_accessors": page_accessors,
+        "page_timestamps": page_timestamps,
+        "block_accessors": block_accessors,
+        "paginate": paginate,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+
+def measure(func: Callable[[], object], repeat: int) -> dict:
+    """Measure the time per call (best of `repeat` runs) and the memory allocated by one call.
+
+    Like `python -m timeit`, each run calls `func` often enough to take at least 0.2 seconds.
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    timings = [timing / number for timing in timer.repeat(repeat, number)]
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"time_us": min(timings) * 1e6, "peak_kib": peak / 1024}
+
+
+def run(names: List[str] = None, repeat: int = 5) -> Dict[str, dict]:
+    benchmarks = build_benchmarks()
+    return {
+        name: measure(func, repeat)
+        for name, func in benchmarks.items()
+        if not names or name in names
+    }
+
+
+def compare(
+    results: Dict[str, dict],
+    baseline: Dict[str, dict],
+    time_tolerance: float,
+    memory_tolerance: float,
+) -> List[str]:
+    "Return a list of regressions of `results` compared to `baseline`."
+    tolerances = {"time_us": time_tolerance, "peak_kib": memory_tolerance}
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        for metric, tolerance in tolerances.items():
+            limit = baseline[name][metric] * (1 + tolerance)
+            if result[metric] > limit:
+                regressions.append(
+                    f"{name}: {metric} {result[metric]:.1f} > {limit:.1f} "
+                    f"(baseline {baseline[name][metric]:.1f})"
+                )
+    return regressions
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("names", nargs="*", help="Only run the given benchmarks.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--time-tolerance",
+        type=float,
+        default=0.5,
+        help="Allowed relative slowdown before a benchmark counts as regression.",
+    )
+    parser.add_argument(
+        "--memory-tolerance",
+        type=float,
+        default=0.1,
+        help="Allowed relative increase of allocated memory.",
+    )
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = run(args.names, args.repeat)
+
+    baseline = {}
+    if args.baseline.exists():
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    print(f"{'benchmark':<24}{'time (us)':>12}{'baseline':>12}{'peak (KiB)':>12}")
+    for name, result in results.items():
+        base = baseline.get(name, {}).get("time_us")
+        base = f"{base:.1f}" if base is not None else "-"
+        print(
+            f"{name:<24}{result['time_us']:>12.1f}{base:>12}{result['peak_kib']:>12.1f}"
+        )
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({**baseline, **results}, f, indent=2, sort_keys=True)
+        print(f"Saved baseline to {args.baseline}.")
+        return 0
+
+    regressions = compare(results, baseline, args.time_tolerance, args.memory_tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
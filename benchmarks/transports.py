@@ -0,0 +1,93 @@
+"""Throughput of the HTTP transports under concurrency, measured against the local emulator.
+
+Usage:
+    python -m benchmarks.transports [--threads 16] [--requests 400] [--latency 0.02]
+
+Note that the emulator only speaks HTTP/1.1, so `HttpxTransport` falls back to HTTP/1.1
+here. To compare HTTP/2 multiplexing, point `--base-url` at an HTTP/2 capable stand-in.
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+import requests
+
+from notion import NotionClient
+from notion.transport import HttpxTransport, RequestsTransport, Transport
+from notion.testing import NotionEmulator
+
+
+class UnpooledTransport(Transport):
+    "Opens a new connection for every request, like the module-level `requests` functions."
+
+    errors = (requests.RequestException,)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: dict,
+        body: Optional[bytes],
+        timeout: Optional[float] = None,
+    ):
+        return requests.request(
+            method, url, headers=headers, data=body, timeout=timeout
+        )
+
+
+def transports() -> Dict[str, Callable[[], Transport]]:
+    candidates = {
+        "requests (unpooled)": UnpooledTransport,
+        "requests (session)": RequestsTransport,
+        "httpx (http2)": HttpxTransport,
+    }
+    available = {}
+    for name, factory in candidates.items():
+        try:
+            factory().close()
+        except ImportError:
+            print(f"Skipping {name}: not installed.")
+            continue
+        available[name] = factory
+    return available
+
+
+def measure(client: NotionClient, page_id: str, threads: int, requests: int) -> float:
+    "Return the throughput in requests per second."
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as executor:
+        list(executor.map(lambda _: client.get_page(page_id), range(requests)))
+    return requests / (time.perf_counter() - start)
+
+
+def run(base_url: str, page_id: str, token: str, threads: int, requests: int):
+    for name, factory in transports().items():
+        with NotionClient(token, base_url=base_url, transport=factory()) as client:
+            throughput = measure(client, page_id, threads, requests)
+        print(f"{name:<24}{throughput:>10.1f} req/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument(
+        "--base-url", help="Benchmark this server instead of the emulator."
+    )
+    parser.add_argument("--page-id", help="Page to request from `--base-url`.")
+    parser.add_argument("--token", default="secret_benchmark")
+    args = parser.parse_args()
+
+    if args.base_url:
+        run(args.base_url, args.page_id, args.token, args.threads, args.requests)
+        return
+
+    with NotionEmulator(latency=args.latency) as emulator:
+        page_id = emulator.add_page("Benchmark")["id"]
+        run(emulator.url, page_id, args.token, args.threads, args.requests)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""Record and replay the HTTP traffic of `NotionClient`.
+
+Recording captures every request/response pair with its timing:
+
+    with client.record("workload.jsonl.gz"):
+        run_workload(client)
+
+Replaying serves the recorded responses without network access or a token:
+
+    client = NotionClient("", transport=ReplayTransport("workload.jsonl.gz", speed=10))
+    run_workload(client)
+
+Requests are matched by method, path and body. Identical requests are answered in recorded
+order, so pagination cursors and changing block children are replayed faithfully.
+"""
+import gzip
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Deque, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from notion.transport import Transport
+
+CASSETTE_VERSION = 1
+RECORDED_HEADERS = ("Content-Type", "Retry-After")
+
+
+class CassetteMismatchError(LookupError):
+    "Raised when a replayed request has no matching recorded interaction."
+
+
+def _open(path: str, mode: str):
+    if str(path).endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def request_key(method: str, url: str, body: Optional[bytes]) -> Tuple[str, str, str]:
+    """Identify a request independently of the API host and JSON formatting.
+
+    The path is taken relative to the API version prefix, so recordings made against the
+    Notion API can be replayed against another `base_url` and vice versa.
+    """
+    url = urlsplit(url)
+    path = url.path.strip("/")
+    path = path.split("/", 1)[1] if path.startswith("v1/") else path
+    if url.query:
+        path = f"{path}?{url.query}"
+    normalized_body = json.dumps(json.loads(body), sort_keys=True) if body else ""
+    return method.upper(), path, normalized_body
+
+
+class RecordedResponse:
+    def __init__(self, status_code: int, headers: dict, content: bytes):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    @property
+    def text(self) -> str:
+        return self.content.decode()
+
+
+class Cassette:
+    "A list of recorded interactions, stored as compact JSON lines (gzipped for `.gz`)."
+
+    def __init__(self, interactions: Optional[List[dict]] = None):
+        self.interactions = interactions or []
+
+    @staticmethod
+    def load(path: str) -> "Cassette":
+        with _open(path, "r") as f:
+            header = json.loads(f.readline())
+            if header.get("version") != CASSETTE_VERSION:
+                raise ValueError(
+                    f"Cassette version {header.get('version')!r} is not supported."
+                )
+            return Cassette([json.loads(line) for line in f if line.strip()])
+
+    def save(self, path: str):
+        with _open(path, "w") as f:
+            f.write(json.dumps({"version": CASSETTE_VERSION}) + "\n")
+            for interaction in self.interactions:
+                f.write(json.dumps(interaction, separators=(",", ":")) + "\n")
+
+
+class RecordingTransport(Transport):
+    """Passes requests on to `transport` and records them into `cassette`.
+
+    The `Authorization` header is never recorded.
+    """
+
+    def __init__(self, transport: Transport, cassette: Optional[Cassette] = None):
+        self.transport = transport
+        self.errors = transport.errors
+        self.cassette = cassette or Cassette()
+        self._start_time = time.monotonic()
+        self._lock = threading.Lock()
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: dict,
+        body: Optional[bytes],
+        timeout: Optional[float] = None,
+    ):
+        offset = time.monotonic() - self._start_time
+        start_time = time.perf_counter()
+        response = self.transport.request(method, url, headers, body, timeout)
+        elapsed = time.perf_counter() - start_time
+
+        method, path, _ = request_key(method, url, None)
+        interaction = {
+            "method": method,
+            "path": path,
+            "request_body": body.decode() if body else None,
+            "status": response.status_code,
+            "headers": {
+                name: response.headers[name]
+                for name in RECORDED_HEADERS
+                if name in response.headers
+            },
+            "body": response.content.decode(),
+            "offset": round(offset, 6),
+            "elapsed": round(elapsed, 6),
+        }
+        with self._lock:
+            self.cassette.interactions.append(interaction)
+        return response
+
+    def close(self):
+        self.transport.close()
+
+
+class ReplayTransport(Transport):
+    """Answers requests with the responses of a recorded cassette.
+
+    Params:
+        cassette: A `Cassette` or the path of a saved one.
+        speed (optional): Replay each response after its recorded duration divided by
+                          `speed`; e.g. `10` replays ten times faster. If `None`, responses
+                          are returned immediately.
+        allow_repeats (optional): Once all recordings of a request are used up, keep answering
+                                  it with the last one instead of raising.
+    """
+
+    def __init__(
+        self,
+        cassette,
+        speed: Optional[float] = None,
+        allow_repeats: bool = False,
+    ):
+        if not isinstance(cassette, Cassette):
+            cassette = Cassette.load(cassette)
+        self.cassette = cassette
+        self.speed = speed
+        self.allow_repeats = allow_repeats
+
+        self._queues: Dict[Tuple[str, str, str], Deque[dict]] = defaultdict(deque)
+        for interaction in cassette.interactions:
+            body = interaction["request_body"]
+            key = request_key(
+                interaction["method"],
+                interaction["path"],
+                body.encode() if body else None,
+            )
+            self._queues[key].append(interaction)
+        self._last: Dict[Tuple[str, str, str], dict] = {}
+        self._lock = threading.Lock()
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: dict,
+        body: Optional[bytes],
+        timeout: Optional[float] = None,
+    ):
+        key = request_key(method, url, body)
+        with self._lock:
+            queue = self._queues.get(key)
+            if queue:
+                interaction = queue.popleft()
+                self._last[key] = interaction
+            elif self.allow_repeats and key in self._last:
+                interaction = self._last[key]
+            else:
+                raise CassetteMismatchError(
+                    f"No recorded response left for {key[0]} {key[1]}."
+                )
+
+        if self.speed:
+            time.sleep(interaction["elapsed"] / self.speed)
+        return RecordedResponse(
+            interaction["status"],
+            interaction["headers"],
+            interaction["body"].encode(),
+        )
+
+    @property
+    def remaining(self) -> int:
+        "Number of recorded interactions that have not been replayed yet."
+        return sum(len(queue) for queue in self._queues.values())
@@ -0,0 +1,158 @@
+"""Fail fast while the Notion API is degraded.
+
+`CircuitBreaker` tracks the outcome of recent requests per endpoint family (`"pages"`,
+`"databases"`, `"blocks"`, `"search"`, ...). Server errors, timeouts and connection problems
+count as failures; rate limiting and client errors don't. Once the failure rate of a family
+reaches the threshold, its circuit opens and requests to it raise `CircuitOpenError` right
+away instead of being sent. After `open_duration` seconds, the circuit is half open and lets
+a few probe requests through: if they succeed, it closes again, otherwise it reopens.
+
+    client = NotionClient("secret_token", circuit_breaker=CircuitBreaker(failure_rate=0.5))
+    try:
+        page = client.get_page(page_id)
+    except CircuitOpenError:
+        page = cache[page_id]
+
+State changes are emitted as `circuit` events with `event.endpoint` set to the family and
+`event.state` to the new state.
+"""
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+from notion.errors import CircuitOpenError
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def endpoint_family(entity: str) -> str:
+    "The endpoint family of a request path, e.g. `pages` for `pages/<id>`."
+    return str(entity).split("?")[0].strip("/").split("/")[0]
+
+
+class Circuit:
+    def __init__(self, window: int):
+        self.state = CLOSED
+        self.outcomes = deque(maxlen=window)
+        self.opened_at = 0.0
+        self.probes = 0
+        self.probe_successes = 0
+
+
+class CircuitBreaker:
+    """Circuit breaker keyed by endpoint family.
+
+    Params:
+        failure_rate (optional): Share of failed requests among the last `window` requests
+                                 of a family that opens its circuit.
+        minimum_requests (optional): Requests needed before the failure rate is considered.
+        window (optional): Number of recent requests the failure rate is computed over.
+        open_duration (optional): Seconds an open circuit rejects requests before probing.
+        half_open_probes (optional): Successful probes needed to close the circuit again.
+    """
+
+    def __init__(
+        self,
+        failure_rate: float = 0.5,
+        minimum_requests: int = 10,
+        window: int = 50,
+        open_duration: float = 10.0,
+        half_open_probes: int = 3,
+    ):
+        self.failure_rate = failure_rate
+        self.minimum_requests = minimum_requests
+        self.window = window
+        self.open_duration = open_duration
+        self.half_open_probes = half_open_probes
+        self.circuits: Dict[str, Circuit] = {}
+        self._lock = threading.Lock()
+
+    def state(self, family: str) -> str:
+        "The current state of the circuit of an endpoint family."
+        with self._lock:
+            circuit = self.circuits.get(family)
+            return circuit.state if circuit else CLOSED
+
+    def _circuit(self, family: str) -> Circuit:
+        circuit = self.circuits.get(family)
+        if circuit is None:
+            circuit = self.circuits[family] = Circuit(self.window)
+        return circuit
+
+    def _check_open(self, family: str, circuit: Circuit):
+        if circuit.state == OPEN:
+            retry_after = circuit.opened_at + self.open_duration - time.monotonic()
+            if retry_after > 0:
+                raise CircuitOpenError(
+                    f"The circuit for {family} is open.", family, retry_after
+                )
+
+    def check(self, family: str):
+        "Raise `CircuitOpenError` if the circuit of `family` rejects requests right now."
+        with self._lock:
+            circuit = self.circuits.get(family)
+            if circuit is not None:
+                self._check_open(family, circuit)
+
+    def allow(self, family: str) -> Optional[str]:
+        """Admit a request to `family` or raise `CircuitOpenError`.
+
+        Returns the new state if admitting the request changed it. Every admitted request
+        must be followed by `record()`.
+        """
+        with self._lock:
+            circuit = self._circuit(family)
+            transition = None
+            self._check_open(family, circuit)
+            if circuit.state == OPEN:
+                circuit.state = transition = HALF_OPEN
+                circuit.probes = circuit.probe_successes = 0
+            if circuit.state == HALF_OPEN:
+                if circuit.probes >= self.half_open_probes:
+                    raise CircuitOpenError(
+                        f"The circuit for {family} is half open and waits for probes.",
+                        family,
+                        0.0,
+                    )
+                circuit.probes += 1
+            return transition
+
+    def record(self, family: str, success: Optional[bool]) -> Optional[str]:
+        """Record the outcome of an admitted request. Returns the new state if it changed.
+
+        `success` is `None` for outcomes that say nothing about the API's health, e.g. rate
+        limiting; they only free the slot of a probe.
+        """
+        with self._lock:
+            circuit = self._circuit(family)
+            if success is None:
+                if circuit.state == HALF_OPEN:
+                    circuit.probes -= 1
+                return None
+            if circuit.state == HALF_OPEN:
+                if not success:
+                    return self._open(circuit)
+                circuit.probe_successes += 1
+                if circuit.probe_successes >= self.half_open_probes:
+                    circuit.state = CLOSED
+                    circuit.outcomes.clear()
+                    return CLOSED
+                return None
+
+            circuit.outcomes.append(success)
+            if (
+                circuit.state == CLOSED
+                and len(circuit.outcomes) >= self.minimum_requests
+            ):
+                failures = circuit.outcomes.count(False)
+                if failures / len(circuit.outcomes) >= self.failure_rate:
+                    return self._open(circuit)
+            return None
+
+    def _open(self, circuit: Circuit) -> str:
+        circuit.state = OPEN
+        circuit.opened_at = time.monotonic()
+        return OPEN
@@ -1,65 +1,473 @@
-from typing import Any, Dict, List, Optional, Union
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import copy_context
+from functools import partial
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Union
+from urllib.parse import urlencode
 
 import requests
 
+from notion import scheduling
+from notion.cassette import RecordingTransport
+from notion.circuit_breaker import CircuitBreaker, endpoint_family
+from notion.codec import get_codec
+from notion.concurrency import AdaptiveConcurrency
+from notion import deadlines, idempotency
+from notion.errors import CircuitOpenError, DeadlineExceeded, NotionAPIError
+from notion.hooks import Hooks, endpoint_template
 from notion.model.common.utils import UUIDv4
 from notion.model.databases.database import Database
 from notion.model.filters import Filter
 from notion.model.page import Page
+from notion.profiling import RequestProfile
+from notion.rate_limit import RateLimiter
+from notion.scheduling import BULK, PriorityClass, Scheduler, current_priority
+from notion.transport import Transport, get_transport
 
 API_BASE_URL = "https://api.notion.com/v1/"
 API_VERSION = "2022-02-22"
 
+RETRYABLE_STATUS_CODES = (500, 502, 503, 504)
+
+
+def is_retryable(request_type: str, entity: str) -> bool:
+    "Whether a request can be repeated without side effects, e.g. after a server error."
+    entity = entity.split("?")[0].strip("/")
+    return request_type == "get" or (
+        request_type == "post" and (entity == "search" or entity.endswith("/query"))
+    )
+
 
 class NotionClient:
-    def __init__(self, token: str):
+    """Client for the Notion API.
+
+    Params:
+        token: The secret of the Notion integration.
+        codec (optional): Codec used to (de)serialize JSON bodies. Either a codec name
+                          (`"json"`, `"orjson"`, `"msgspec"`) or an object implementing
+                          `dumps` and `loads`. Defaults to the fastest available codec.
+        strict (optional): If set, objects returned by the API are built through their
+                           validating constructors instead of the trusted fast path.
+        base_url (optional): URL of the Notion API, e.g. to use a local emulator.
+        max_retries (optional): How often failed requests are retried. Rate limited
+                                requests are always retried, server errors and connection
+                                problems only for requests that do not change anything.
+        retry_backoff (optional): Seconds to wait before the first retry, doubling with every
+                                  further retry, unless the API sends a `Retry-After` header.
+        transport (optional): The `Transport` sending the HTTP requests, or the name of a
+                              built-in one (`"requests"`, `"httpx"`). Defaults to a
+                              connection-pooling `requests` session.
+        rate_limit (optional): Requests per second the client sends at most. Requests above
+                               the limit wait in the client instead of being throttled by
+                               the API.
+        priority_classes (optional): Weights and concurrency limits of the priority classes
+                                     requests are scheduled by, see `notion.scheduling`.
+        timeout (optional): Seconds to wait for the server before a request attempt fails.
+                            If `None`, a stalled connection blocks forever.
+        circuit_breaker (optional): A `CircuitBreaker` making requests fail fast with
+                                    `CircuitOpenError` while an endpoint family keeps
+                                    failing. See `notion.circuit_breaker`.
+        idempotent_writes (optional): Retry creating pages and databases and appending
+                                      blocks after server errors and connection problems,
+                                      looking up whether the failed attempt was applied
+                                      first. See `notion.idempotency`.
+    """
+
+    def __init__(
+        self,
+        token: str,
+        codec=None,
+        strict: bool = False,
+        base_url: str = API_BASE_URL,
+        max_retries: int = 3,
+        retry_backoff: float = 0.5,
+        transport: Union[str, Transport, None] = None,
+        rate_limit: Optional[float] = None,
+        priority_classes: Optional[Dict[str, PriorityClass]] = None,
+        timeout: Optional[float] = 60.0,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        idempotent_writes: bool = True,
+    ):
         self.token = token
+        self.base_url = base_url
+        self.codec = get_codec(codec)
+        self.strict = strict
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.circuit_breaker = circuit_breaker
+        self.idempotent_writes = idempotent_writes
+        self._created = idempotency.CreatedObjects()
+        self.retry_backoff = retry_backoff
+        self.hooks = Hooks()
+        self.transport = get_transport(transport)
+        self.scheduler = Scheduler(
+            RateLimiter(rate_limit) if rate_limit else None, priority_classes
+        )
+        self.concurrency = None
+        if BULK in self.scheduler.classes:
+            self.concurrency = AdaptiveConcurrency(self.scheduler).attach(self)
 
-    def _make_request(self, request_type: str, entity, payload=None) -> dict:
-        url = f"{API_BASE_URL}{entity}/"
+    def close(self):
+        "Close the connections held by the client's transport."
+        self.transport.close()
+
+    def __enter__(self) -> "NotionClient":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _make_request(
+        self,
+        request_type: str,
+        entity,
+        payload=None,
+        recover: Optional[Callable[[], Optional[dict]]] = None,
+    ) -> dict:
+        """Send a request, retrying it if that is safe.
+
+        Requests that change something are only retried after server errors and connection
+        problems if `recover` is given. It is called before every such retry and returns the
+        result of an earlier attempt that was applied after all, or `None`.
+        """
+        path, _, query = str(entity).partition("?")
+        url = f"{self.base_url}{path}/" + (f"?{query}" if query else "")
 
         headers = {
             "Accept": "application/json",
             "Notion-Version": API_VERSION,
             "Content-Type": "application/json",
-            "Authorization": self.token,
         }
 
         assert request_type in ("get", "post", "patch", "delete")
-        requests_func = getattr(requests, request_type)
 
-        response = requests_func(
-            url,
-            headers=headers,
-            json=payload,
-        )
-        if response.status_code != 200:
-            raise ValueError(response.text)
+        body = None if payload is None else self.codec.dumps(payload)
+        event_info = {
+            "method": request_type.upper(),
+            "endpoint": endpoint_template(entity),
+            "url": url,
+            "request_bytes": len(body) if body else 0,
+            "priority": current_priority(),
+        }
+        attempt = 0
+        retries = 0
+        priority_class = event_info["priority"]
+        deadline = deadlines.current_deadline()
+        family = endpoint_family(entity)
+        while True:
+            try:
+                deadlines.check_deadline()
+                if self.circuit_breaker:
+                    # Fail fast, without waiting for the rate limit first.
+                    self.circuit_breaker.check(family)
+                wait = self.scheduler.acquire(priority_class, deadline)
+            except (DeadlineExceeded, CircuitOpenError) as e:
+                self.hooks.emit("error", attempt=attempt, error=e, **event_info)
+                raise
+            # Everything up to the response runs while holding the scheduler slot, which has
+            # to be released whatever fails, e.g. a hook or checking out a token.
+            token = None
+            connection_error = None
+            try:
+                if wait:
+                    self.hooks.emit(
+                        "throttle", attempt=attempt, wait=wait, **event_info
+                    )
+                token = self._checkout_token(attempt, event_info)
+                headers["Authorization"] = token
+                if self.circuit_breaker:
+                    self._circuit_event(
+                        family, self.circuit_breaker.allow(family), event_info
+                    )
+                self.hooks.emit("before_request", attempt=attempt, **event_info)
+                start_time = time.perf_counter()
+                timeout = self.timeout
+                if deadline is not None:
+                    left = max(0.0, deadline - time.monotonic())
+                    timeout = left if timeout is None else min(timeout, left)
+                try:
+                    response = self.transport.request(
+                        request_type, url, headers, body, timeout
+                    )
+                except self.transport.errors as e:
+                    connection_error = e
+            except BaseException as e:
+                if token is not None:
+                    self._checkin_token(token)
+                if isinstance(e, (NotionAPIError, CircuitOpenError)):
+                    self.hooks.emit("error", attempt=attempt, error=e, **event_info)
+                raise
+            finally:
+                self.scheduler.release(priority_class)
+
+            if connection_error is not None:
+                self._checkin_token(token)
+                deadline_passed = deadline is not None and time.monotonic() >= deadline
+                # A timeout cut short by the deadline says nothing about the API's health.
+                self._record_circuit(
+                    family, None if deadline_passed else False, event_info
+                )
+                if deadline_passed:
+                    # Most likely the attempt timed out because of the deadline.
+                    exceeded = DeadlineExceeded("Deadline exceeded during the request.")
+                    self.hooks.emit(
+                        "error", attempt=attempt, error=exceeded, **event_info
+                    )
+                    raise exceeded from connection_error
+                if retries < self.max_retries and (
+                    recover or is_retryable(request_type, entity)
+                ):
+                    self._wait_before_retry(attempt, None, event_info)
+                    attempt, retries = attempt + 1, retries + 1
+                    if recover:
+                        recovered = recover()
+                        if recovered is not None:
+                            return recovered
+                    continue
+                self.hooks.emit(
+                    "error", attempt=attempt, error=connection_error, **event_info
+                )
+                raise connection_error
+
+            self.hooks.emit(
+                "after_response",
+                attempt=attempt,
+                status=response.status_code,
+                elapsed=time.perf_counter() - start_time,
+                response_bytes=len(response.content),
+                **event_info,
+            )
+            self._record_circuit(
+                family,
+                None if response.status_code == 429 else response.status_code < 500,
+                event_info,
+            )
+            if response.status_code == 200:
+                self._checkin_token(token)
+                # Decode straight from the raw bytes instead of going through `response.text`.
+                return self.codec.loads(response.content)
+
+            error = NotionAPIError.from_response(response, self.codec)
+            if self._checkin_token(token, error):
+                # Another token can send the request right away.
+                self.hooks.emit(
+                    "retry", attempt=attempt, wait=0.0, error=error, **event_info
+                )
+                attempt += 1
+                continue
+
+            # Rate limited requests are rejected before they take effect, so they are
+            # always safe to retry. Server errors are only retried for read requests.
+            retryable = response.status_code == 429 or (
+                response.status_code in RETRYABLE_STATUS_CODES
+                and (recover or is_retryable(request_type, entity))
+            )
+            if not retryable or retries == self.max_retries:
+                self.hooks.emit("error", attempt=attempt, error=error, **event_info)
+                raise error
+            self._wait_before_retry(attempt, error, event_info)
+            attempt, retries = attempt + 1, retries + 1
+            if recover and response.status_code != 429:
+                recovered = recover()
+                if recovered is not None:
+                    return recovered
+
+    def _record_circuit(self, family: str, success: Optional[bool], event_info: dict):
+        if self.circuit_breaker:
+            state = self.circuit_breaker.record(family, success)
+            self._circuit_event(family, state, event_info)
+
+    def _circuit_event(self, family: str, state: Optional[str], event_info: dict):
+        if state is not None:
+            self.hooks.emit(
+                "circuit", state=state, **{**event_info, "endpoint": family}
+            )
 
-        return response.json()
+    def _checkout_token(self, attempt: int, event_info: dict) -> str:
+        "Get the token to authorize the next attempt of a request with."
+        return self.token
 
-    def _paginate(
+    def _checkin_token(
+        self, token: str, error: Optional[NotionAPIError] = None
+    ) -> bool:
+        """Hand back a token after a request (attempt) finished.
+
+        Returns whether the failed request should be repeated right away with another token.
+        """
+        return False
+
+    def _wait_before_retry(
+        self, attempt: int, error: Optional[NotionAPIError], event_info: dict
+    ):
+        """Sleep before the next attempt, honoring the `Retry-After` header if present.
+
+        Raises `DeadlineExceeded` instead if the next attempt would start after the deadline.
+        """
+        if error is not None and error.retry_after is not None:
+            wait = error.retry_after
+        else:
+            wait = self.retry_backoff * 2**attempt * (0.5 + random.random() / 2)
+        left = deadlines.remaining()
+        if left is not None and wait >= left:
+            exceeded = DeadlineExceeded(
+                f"Retrying in {wait:.3f}s would exceed the deadline."
+            )
+            self.hooks.emit("error", attempt=attempt, error=exceeded, **event_info)
+            raise exceeded from error
+        self.hooks.emit("retry", attempt=attempt, wait=wait, error=error, **event_info)
+        if error is not None and error.status == 429:
+            self.hooks.emit("throttle", attempt=attempt, wait=wait, **event_info)
+        time.sleep(wait)
+
+    def deadline(self, seconds: float):
+        """Give all requests made inside the `with` block `seconds` in total.
+
+        Once the deadline has passed, requests raise `DeadlineExceeded` instead of being sent.
+        See `notion.deadlines`.
+        """
+        return deadlines.deadline(seconds)
+
+    def priority(self, priority_class: str):
+        """Send all requests made inside the `with` block with the given priority class.
+
+        Priority classes are `"interactive"`, `"normal"` (the default) and `"bulk"`, unless
+        configured otherwise through `priority_classes`.
+        """
+        return scheduling.priority(priority_class)
+
+    @contextmanager
+    def record(self, path: str):
+        """Record all requests made inside the `with` block into a cassette file at `path`.
+
+        The cassette can be replayed later with `notion.cassette.ReplayTransport`.
+        """
+        recorder = RecordingTransport(self.transport)
+        self.transport = recorder
+        try:
+            yield recorder.cassette
+        finally:
+            self.transport = recorder.transport
+            recorder.cassette.save(path)
+
+    @contextmanager
+    def profile(self, n_plus_one_threshold: int = 5, log: bool = True):
+        """Account for every request made inside the `with` block.
+
+        Yields a `RequestProfile` grouping the requests by the model method and call site
+        that triggered them, flagging repeated `GET`s and N+1 patterns. Unless `log` is
+        unset, its summary is logged when the block ends.
+        """
+        profile = RequestProfile(n_plus_one_threshold)
+        self.hooks.register("before_request", profile._on_before_request)
+        self.hooks.register("after_response", profile._on_after_response)
+        try:
+            yield profile
+        finally:
+            self.hooks.unregister("before_request", profile._on_before_request)
+            self.hooks.unregister("after_response", profile._on_after_response)
+            if log:
+                profile.log()
+
+    def bulk_map(
+        self, func: Callable, items: Iterable, max_workers: Optional[int] = None
+    ) -> list:
+        """Call `func` for all `items` concurrently at bulk priority and return the results.
+
+        The number of requests in flight follows the adaptive limit of `client.concurrency`,
+        running at most `max_workers` calls at once.
+        Workers run in the caller's context, so e.g. its `deadline()` applies to them. The
+        first exception raised by `func` is re-raised and cancels the calls not started yet.
+        """
+        items = list(items)
+        if max_workers is None:
+            max_workers = self.concurrency.max_limit if self.concurrency else 4
+
+        def call(item):
+            with scheduling.priority(BULK):
+                return func(item)
+
+        pool = ThreadPoolExecutor(max_workers=min(max_workers, len(items) or 1))
+        try:
+            # Each call needs its own copy of the context, one can't be entered twice at once.
+            futures = [pool.submit(copy_context().run, call, item) for item in items]
+            return [future.result() for future in futures]
+        finally:
+            pool.shutdown(cancel_futures=True)
+
+    def _create(self, entity: str, data: dict) -> dict:
+        "Create a page or database, safe to retry if `idempotent_writes` is set."
+        recover = None
+        if self.idempotent_writes:
+            find = {
+                "pages": idempotency.find_created_page,
+                "databases": idempotency.find_created_database,
+            }[entity]
+            recover = partial(find, self, data, idempotency.write_started())
+        response = self._make_request("post", entity, data, recover)
+        self._created.add(response["id"])
+        return response
+
+    def _iter_result_sets(
         self,
         request_type: str,
         entity: str,
         payload: Optional[Dict[str, Any]] = None,
-        limit: Optional[int] = None,
-    ) -> List[dict]:
+    ) -> Iterator[dict]:
+        "Yield the result sets of a paginated endpoint, requesting each one when it is needed."
         if payload is None:
             payload = {}
 
-        results = []
         start_cursor = {}
         has_more = True
-        while has_more and (not limit or len(results) < limit):
-            result_set = self._make_request(
-                request_type, entity, {**payload, **start_cursor}
-            )
-            results.extend(result_set["results"])
+        while has_more:
+            if request_type == "get":
+                # `GET` endpoints take the cursor as query parameter instead of in the body.
+                query = urlencode({**payload, **start_cursor})
+                result_set = self._make_request(
+                    request_type, f"{entity}?{query}" if query else entity
+                )
+            else:
+                result_set = self._make_request(
+                    request_type, entity, {**payload, **start_cursor}
+                )
+            yield result_set
             start_cursor = {"start_cursor": result_set.get("next_cursor")}
             has_more = result_set.get("has_more", False)
 
-        return results[:limit]
+    def _iter_paginate(
+        self,
+        request_type: str,
+        entity: str,
+        payload: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[dict]:
+        "Yield the results of a paginated endpoint, requesting each page when it is needed."
+        for result_set in self._iter_result_sets(request_type, entity, payload):
+            yield from result_set["results"]
+
+    def _paginate(
+        self,
+        request_type: str,
+        entity: str,
+        payload: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+    ) -> List[dict]:
+        # Whole result sets are added at once, which is faster than going item by item.
+        results = []
+        for result_set in self._iter_result_sets(request_type, entity, payload):
+            results.extend(result_set["results"])
+            if limit is not None and len(results) >= limit:
+                del results[limit:]
+                break
+        return results
+
+    def _decode_page(self, data: dict) -> Page:
+        "Turn page data returned by the API into a `Page` object."
+        if self.strict:
+            return Page.from_json(data).with_client(self)
+        return Page._from_trusted_json(data, self)
 
     # ---------------------------------------------------------------------------
     # Databases
@@ -68,7 +476,9 @@ class NotionClient:
     def get_database(self, database_id) -> Database:
         "Get a single Notion database by its ID."
         data = self._make_request("get", f"databases/{database_id}")
-        return Database.from_json(data).with_client(self)
+        if self.strict:
+            return Database.from_json(data).with_client(self)
+        return Database._from_trusted_json(data, self)
 
     def query_database(
         self,
@@ -83,13 +493,13 @@ class NotionClient:
         data = self._paginate(
             "post", f"databases/{database_id}/query", {**filter_, **(sort or {})}
         )
-        return [Page.from_json(page_data).with_client(self) for page_data in data]
+        return [self._decode_page(page_data) for page_data in data]
 
     def create_database(self, database: Database, parent_id: Optional[UUIDv4] = None):
         "Create a new Notion database."
         if parent_id:
             database._data["parent"] = {"type": "page_id", "page_id": parent_id}
-        response = self._make_request("post", "databases", database._data)
+        response = self._create("databases", database._data)
         database._data = response
         database._client = self
 
@@ -111,13 +521,12 @@ class NotionClient:
     def get_page(self, page_id):
         "Get a single Notion page by its ID."
         data = self._make_request("get", f"pages/{page_id}")
-        return Page(client=self, data=data)
+        return self._decode_page(data)
 
     def create_page(self, page: Union[Page, dict]) -> Page:
         "Create a new Notion page."
         page_data = page.to_json() if isinstance(page, Page) else page
-        response = self._make_request("post", "pages", page_data)
-        return response
+        return self._create("pages", page_data)
 
     def update_page(self, page_id, payload: dict):
         "Update properties of an existing Notion page."
@@ -130,6 +539,18 @@ class NotionClient:
         """
         return self.update_page(page_id, {"archived": True})
 
+    def create_pages(self, pages: Iterable[Union[Page, dict]]) -> List[dict]:
+        "Create many Notion pages concurrently, see `bulk_map()`."
+        return self.bulk_map(self.create_page, pages)
+
+    def update_pages(self, payloads: Dict[str, dict]) -> List[dict]:
+        "Update many Notion pages concurrently, given a payload per page ID."
+        return self.bulk_map(lambda item: self.update_page(*item), payloads.items())
+
+    def delete_pages(self, page_ids: Iterable[str]) -> List[dict]:
+        "Archive many Notion pages concurrently."
+        return self.bulk_map(self.delete_page, page_ids)
+
     # ---------------------------------------------------------------------------
     # Blocks
     # ---------------------------------------------------------------------------
@@ -142,11 +563,70 @@ class NotionClient:
         "Retrieve children of a given block."
         return self._make_request("get", f"blocks/{block_id}/children")
 
-    def append_block_children(self, block_id: str, children: str):
-        "Append children blocks to an existing block"
-        return self._make_request(
-            "patch", f"blocks/{block_id}/children", {"children": children}
+    def iter_block_children(
+        self, block_id: str, page_size: Optional[int] = None
+    ) -> Iterator[dict]:
+        "Yield all children of a block, requesting each page of results when it is needed."
+        payload = {"page_size": page_size} if page_size else None
+        return self._iter_paginate("get", f"blocks/{block_id}/children", payload)
+
+    def append_block_children(
+        self, block_id: str, children: str, after: Optional[str] = None
+    ):
+        "Append children blocks to an existing block, or insert them after its child `after`."
+        recover = None
+        if self.idempotent_writes:
+            recover = partial(
+                idempotency.find_appended_children,
+                self,
+                block_id,
+                children,
+                idempotency.write_started(),
+            )
+        payload = {"children": children}
+        if after:
+            payload["after"] = after
+        response = self._make_request(
+            "patch", f"blocks/{block_id}/children", payload, recover
         )
+        for block in response.get("results", []):
+            self._created.add(block["id"])
+        return response
+
+    def retrieve_block_tree(
+        self, block_id: str, max_depth: Optional[int] = None
+    ) -> List[dict]:
+        """Retrieve all nested children of a block, loading each level concurrently.
+
+        The children of a block are put into its type object, e.g.
+        `block["toggle"]["children"]`, the format `append_block_children` accepts.
+        Child pages and databases are not descended into.
+        """
+        tree = []
+        level = [(block_id, tree)]
+        depth = 1
+        while level:
+            children_per_block = self.bulk_map(
+                lambda item: self._paginate("get", f"blocks/{item[0]}/children"),
+                level,
+            )
+            next_level = []
+            for (_, target), children in zip(level, children_per_block):
+                target.extend(children)
+                if max_depth is not None and depth >= max_depth:
+                    continue
+                for child in children:
+                    if child.get("has_children") and child["type"] not in (
+                        "child_page",
+                        "child_database",
+                    ):
+                        content = child.setdefault(child["type"], {})
+                        next_level.append(
+                            (child["id"], content.setdefault("children", []))
+                        )
+            level = next_level
+            depth += 1
+        return tree
 
     def delete_block(self, block_id: str):
         """Deletes the Notion Block with the given ID.
@@ -167,11 +647,29 @@ class NotionClient:
         limit: Optional[int] = None,
     ) -> Page:
         "Search for Notion pages in all workspaces and databases."
+        return list(islice(self.iter_search(query, sort, filter), limit))
+
+    def iter_search(
+        self,
+        query: str,
+        sort: dict = None,
+        filter: Optional[dict] = None,
+        page_size: Optional[int] = None,
+    ) -> Iterator[Page]:
+        """Search like `search()`, but yield the pages while paginating.
+
+        The next page of results is only requested once the previous one is consumed, so
+        stopping early, e.g. at the first match, saves the remaining requests:
+
+            page = next(p for p in client.iter_search("Roadmap") if p.title == "Roadmap")
+        """
         payload = {"query": query}
         if sort:
             payload["sort"] = sort
         if filter:
             payload["filter"] = filter
+        if page_size:
+            payload["page_size"] = page_size
 
-        results = self._paginate("post", "search", payload, limit)
-        return [Page.from_json(page_data).with_client(self) for page_data in results]
+        for page_data in self._iter_paginate("post", "search", payload):
+            yield self._decode_page(page_data)
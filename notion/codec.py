@@ -0,0 +1,96 @@
+"""JSON codecs used by `NotionClient` to serialize requests and deserialize responses.
+
+A codec is any object with a `dumps(obj) -> bytes` and a `loads(data: bytes)` method.
+`orjson` and `msgspec` are optional; if installed, they are picked up automatically.
+"""
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover
+    msgspec = None
+
+
+class JSONCodec:
+    "Codec based on the standard library `json` module."
+
+    name = "json"
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec:
+    "Codec based on `orjson` (https://github.com/ijl/orjson)."
+
+    name = "orjson"
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("The `orjson` codec requires `pip install orjson`.")
+
+    def dumps(self, obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+    def loads(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+
+class MsgspecCodec:
+    "Codec based on `msgspec` (https://github.com/jcrist/msgspec)."
+
+    name = "msgspec"
+
+    def __init__(self):
+        if msgspec is None:
+            raise ImportError("The `msgspec` codec requires `pip install msgspec`.")
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder()
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._encoder.encode(obj)
+
+    def loads(self, data: bytes) -> Any:
+        return self._decoder.decode(data)
+
+
+CODECS = {
+    "json": JSONCodec,
+    "orjson": OrjsonCodec,
+    "msgspec": MsgspecCodec,
+}
+
+
+def default_codec():
+    "Return the fastest codec that is available in the current environment."
+    if orjson is not None:
+        return OrjsonCodec()
+    if msgspec is not None:
+        return MsgspecCodec()
+    return JSONCodec()
+
+
+def get_codec(codec: Union[str, Any, None] = None):
+    """Resolve `codec` to a codec instance.
+
+    `codec` can be `None` (use the fastest available codec), the name of a built-in codec
+    (`"json"`, `"orjson"` or `"msgspec"`) or any object implementing `dumps` and `loads`.
+    """
+    if codec is None:
+        return default_codec()
+    if isinstance(codec, str):
+        if codec not in CODECS:
+            raise ValueError(f"Codec {codec!r} is not supported.")
+        return CODECS[codec]()
+    if not (hasattr(codec, "dumps") and hasattr(codec, "loads")):
+        raise TypeError("A codec must implement `dumps` and `loads`.")
+    return codec
@@ -0,0 +1,110 @@
+"""Adaptive concurrency of bulk requests.
+
+`AdaptiveConcurrency` tunes how many requests of a priority class (`"bulk"` by default) the
+scheduler of a client lets through at once, by additive increase and multiplicative
+decrease (AIMD): every successful request raises the limit a little, so it grows by about
+one per round of requests while latency stays flat. A rate limited request, a server error,
+a connection problem or rising latency halves it.
+
+Bulk operations of `NotionClient`, like `create_pages()` or `retrieve_block_tree()`, run
+on a thread pool at bulk priority, so the number of requests they actually have in flight
+follows the limit.
+"""
+import threading
+import time
+from typing import Optional
+
+from notion.hooks import RequestEvent
+from notion.scheduling import BULK
+
+
+class AdaptiveConcurrency:
+    """AIMD controller for the concurrency limit of a priority class of a client's scheduler.
+
+    Params:
+        scheduler: The `Scheduler` whose class limit is adjusted.
+        priority_class (optional): The class to control.
+        initial_limit (optional): Limit to start with.
+        min_limit (optional): The limit never drops below this.
+        max_limit (optional): The limit never grows above this.
+        decrease_factor (optional): Factor the limit is multiplied with on congestion.
+        latency_tolerance (optional): Congestion is assumed once the smoothed latency exceeds
+                                      the lowest one seen by this factor.
+    """
+
+    def __init__(
+        self,
+        scheduler,
+        priority_class: str = BULK,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        decrease_factor: float = 0.5,
+        latency_tolerance: float = 2.0,
+    ):
+        self.scheduler = scheduler
+        self.priority_class = priority_class
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+
+        self.limit = float(initial_limit)
+        self.latency: Optional[float] = None
+        self.min_latency: Optional[float] = None
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+        self._apply()
+
+    def attach(self, client) -> "AdaptiveConcurrency":
+        "Adjust the limit based on the requests made by `client`."
+        client.hooks.register("after_response", self._on_response)
+        client.hooks.register("retry", self._on_retry)
+        return self
+
+    def _apply(self):
+        self.scheduler.set_max_concurrency(self.priority_class, int(self.limit))
+
+    def _on_response(self, event: RequestEvent):
+        if event.priority != self.priority_class:
+            return
+        if event.status == 429 or event.status >= 500:
+            self.decrease()
+        elif event.status == 200:
+            self.observe(event.elapsed)
+
+    def _on_retry(self, event: RequestEvent):
+        # Responses with an error status were already seen, this is a connection problem.
+        if event.priority == self.priority_class and event.error is None:
+            self.decrease()
+
+    def observe(self, latency: float):
+        "Account for a successful request that took `latency` seconds."
+        with self._lock:
+            if self.latency is None:
+                self.latency = self.min_latency = latency
+            else:
+                self.latency = 0.8 * self.latency + 0.2 * latency
+                self.min_latency = min(self.min_latency, latency)
+            congested = self.latency > self.min_latency * self.latency_tolerance
+        if congested:
+            self.decrease()
+            return
+        with self._lock:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self._apply()
+
+    def decrease(self):
+        "Cut the limit after congestion, at most once per round trip."
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_decrease < (self.latency or 0.0):
+                return
+            self._last_decrease = now
+            self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+            if self.latency is not None:
+                # Judge the next requests afresh, and let the baseline drift up in case the
+                # API has become slower for good.
+                self.min_latency = min(self.min_latency * 1.1, self.latency)
+                self.latency = self.min_latency
+            self._apply()
@@ -0,0 +1,353 @@
+"""Discover all pages and databases reachable from the workspace root or a given page.
+
+    crawler = Crawler(client, roots=[page_id], checkpoint="crawl.json")
+    for obj in crawler.crawl():
+        print(obj.type, obj.id, obj.depth)
+
+The crawl runs breadth-first. Every page is scanned for child pages, child databases and
+`link_to_page` targets, also inside toggles, columns and other nested blocks, and every
+database is queried for its rows. Each level is processed in batches on the bulk worker pool
+of the client (see `NotionClient.bulk_map()`), and every object is visited once.
+
+With a `checkpoint` file, the frontier is saved after every batch and when the consumer
+stops the crawl, and newly discovered IDs are appended to a `<checkpoint>.seen` file next
+to it. A crawl started again with the same checkpoint continues with the first object that
+wasn't yielded yet; after a crash, the objects of the interrupted batch are visited again.
+
+To crawl with several processes, each with its own client and token, every process calls
+`work()` with the same `WorkQueue` (see `notion.work_queue`) instead of `crawl()`:
+
+    queue = SQLiteWorkQueue("crawl.db")
+    for obj in Crawler(client, roots=[page_id]).work(queue, worker="worker-1"):
+        ...
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, List, Optional, Set, Tuple
+
+from notion.errors import NotionAPIError
+from notion.work_queue import Lease, WorkQueue
+
+CHECKPOINT_VERSION = 2
+PAGE = "page"
+DATABASE = "database"
+
+# Statuses of objects that can't be visited, e.g. link targets not shared with the integration.
+SKIPPED_STATUSES = (403, 404)
+
+
+def normalize_id(object_id: str) -> str:
+    return object_id.replace("-", "").lower()
+
+
+@dataclass
+class CrawlTask:
+    type: str
+    id: str
+    depth: int
+    parent_id: Optional[str] = None
+
+    def to_json(self) -> list:
+        return [self.type, self.id, self.depth, self.parent_id]
+
+    @property
+    def key(self) -> str:
+        return normalize_id(self.id)
+
+
+@dataclass
+class CrawledObject:
+    type: str
+    id: str
+    depth: int
+    parent_id: Optional[str]
+    data: dict = field(repr=False)
+
+
+@contextmanager
+def _renewing(queue: WorkQueue, leases: List[Lease]):
+    "Renew `leases` in the background, a few times per lease duration, inside the block."
+    interval = max(0.01, (min(lease.expires for lease in leases) - time.time()) / 3)
+    stop = threading.Event()
+
+    def renew():
+        while not stop.wait(interval):
+            for lease in leases:
+                queue.renew(lease)
+
+    thread = threading.Thread(target=renew, daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+class Crawler:
+    """Breadth-first crawler over pages and databases.
+
+    Params:
+        client: The `NotionClient` to crawl with.
+        roots (optional): IDs of the pages to start at. Defaults to the workspace root, i.e.
+                          all pages and databases shared with the integration whose parent
+                          isn't shared with it.
+        max_depth (optional): Don't visit objects further than this from the roots.
+        types (optional): Object types to visit, `"page"` and/or `"database"`. Rows of
+                          databases are only found if databases are visited.
+        batch_size (optional): Objects visited between two checkpoints.
+        max_workers (optional): Objects visited at once.
+        checkpoint (optional): Path of a JSON file to save the crawl's progress to.
+    """
+
+    def __init__(
+        self,
+        client,
+        roots: Optional[Iterable[str]] = None,
+        max_depth: Optional[int] = None,
+        types: Iterable[str] = (PAGE, DATABASE),
+        batch_size: int = 100,
+        max_workers: Optional[int] = None,
+        checkpoint: Optional[str] = None,
+    ):
+        self.client = client
+        self.roots = list(roots) if roots is not None else None
+        self.max_depth = max_depth
+        self.types = set(types)
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.checkpoint = checkpoint
+
+        self.frontier: List[CrawlTask] = []
+        self.seen: Set[str] = set()
+        # IDs added to `seen` since the last checkpoint, and the number saved before them.
+        self._unsaved_seen: List[str] = []
+        self._saved_seen = 0
+        self.skipped: List[Tuple[CrawlTask, NotionAPIError]] = []
+
+    # ---------------------------------------------------------------------------
+    # Checkpoints
+    # ---------------------------------------------------------------------------
+
+    def _load_checkpoint(self) -> bool:
+        if not self.checkpoint or not os.path.exists(self.checkpoint):
+            return False
+        with open(self.checkpoint, encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(
+                f"Checkpoint version {state.get('version')!r} is not supported."
+            )
+        self.frontier = [CrawlTask(*task) for task in state["frontier"]]
+        # IDs appended after the last checkpoint belong to a batch that is visited again.
+        with open(self._seen_path, encoding="utf-8") as f:
+            seen = [line.rstrip("\n") for _, line in zip(range(state["seen"]), f)]
+        with open(self._seen_path, "w", encoding="utf-8") as f:
+            f.writelines(f"{key}\n" for key in seen)
+        self.seen = set(seen)
+        self._unsaved_seen = []
+        self._saved_seen = len(seen)
+        return True
+
+    @property
+    def _seen_path(self) -> str:
+        return f"{self.checkpoint}.seen"
+
+    def _save_checkpoint(self):
+        if not self.checkpoint:
+            return
+        # Only the newly discovered IDs are written, so checkpoints of a large crawl stay
+        # cheap. The checkpoint records how many of them it covers.
+        mode = "a" if self._saved_seen else "w"
+        with open(self._seen_path, mode, encoding="utf-8") as f:
+            f.writelines(f"{key}\n" for key in self._unsaved_seen)
+            f.flush()
+            os.fsync(f.fileno())
+        self._saved_seen += len(self._unsaved_seen)
+        self._unsaved_seen = []
+        state = {
+            "version": CHECKPOINT_VERSION,
+            "frontier": [task.to_json() for task in self.frontier],
+            "seen": self._saved_seen,
+        }
+        # Write to a temporary file first, so a crash never leaves a truncated checkpoint.
+        temporary_path = f"{self.checkpoint}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(temporary_path, self.checkpoint)
+
+    # ---------------------------------------------------------------------------
+    # Crawling
+    # ---------------------------------------------------------------------------
+
+    def _accepts(self, task: CrawlTask) -> bool:
+        return task.type in self.types and (
+            self.max_depth is None or task.depth <= self.max_depth
+        )
+
+    def _enqueue(self, task: CrawlTask, queue: List[CrawlTask]):
+        if task.key in self.seen or not self._accepts(task):
+            return
+        self.seen.add(task.key)
+        self._unsaved_seen.append(task.key)
+        queue.append(task)
+
+    def _root_tasks(self) -> List[CrawlTask]:
+        if self.roots is not None:
+            return [CrawlTask(PAGE, root, 0) for root in self.roots]
+
+        shared = list(self.client._iter_paginate("post", "search", {"query": ""}))
+        shared_ids = {normalize_id(data["id"]) for data in shared}
+        tasks = []
+        for data in shared:
+            parent = data.get("parent", {})
+            parent_id = parent.get(parent.get("type"))
+            if (
+                not isinstance(parent_id, str)
+                or normalize_id(parent_id) not in shared_ids
+            ):
+                tasks.append(CrawlTask(data["object"], data["id"], 0))
+        return tasks
+
+    def _scan_blocks(self, task: CrawlTask) -> List[CrawlTask]:
+        "Find child pages, child databases and link targets in the blocks of a page."
+        found = []
+        block_ids = [task.id]
+        while block_ids:
+            block_id = block_ids.pop()
+            entity = f"blocks/{block_id}/children"
+            for block in self.client._iter_paginate("get", entity):
+                type_ = block["type"]
+                if type_ == "child_page":
+                    found.append(CrawlTask(PAGE, block["id"], task.depth + 1, task.id))
+                elif type_ == "child_database":
+                    found.append(
+                        CrawlTask(DATABASE, block["id"], task.depth + 1, task.id)
+                    )
+                elif type_ == "link_to_page":
+                    target = block[type_]
+                    target_type = PAGE if target["type"] == "page_id" else DATABASE
+                    found.append(
+                        CrawlTask(
+                            target_type, target[target["type"]], task.depth + 1, task.id
+                        )
+                    )
+                elif block.get("has_children"):
+                    block_ids.append(block["id"])
+        return found
+
+    def _visit(self, task: CrawlTask):
+        "Load an object and find the objects it leads to."
+        try:
+            if task.type == PAGE:
+                data = self.client._make_request("get", f"pages/{task.id}")
+                found = self._scan_blocks(task)
+            else:
+                data = self.client._make_request("get", f"databases/{task.id}")
+                found = [
+                    CrawlTask(PAGE, row["id"], task.depth + 1, task.id)
+                    for row in self.client._iter_paginate(
+                        "post", f"databases/{task.id}/query", {}
+                    )
+                ]
+        except NotionAPIError as e:
+            if e.status in SKIPPED_STATUSES:
+                return None, [], e
+            raise
+        crawled = CrawledObject(task.type, task.id, task.depth, task.parent_id, data)
+        return crawled, found, None
+
+    def crawl(self) -> Iterator[CrawledObject]:
+        "Visit all reachable objects, yielding each one once."
+        if not self._load_checkpoint():
+            self.frontier = []
+            self.seen = set()
+            self._unsaved_seen = []
+            self._saved_seen = 0
+            for task in self._root_tasks():
+                self._enqueue(task, self.frontier)
+            self._save_checkpoint()
+
+        while self.frontier:
+            batch = self.frontier[: self.batch_size]
+            results = self.client.bulk_map(self._visit, batch, self.max_workers)
+
+            discovered = []
+            done = 0
+            try:
+                for task, (crawled, found, error) in zip(batch, results):
+                    if error is not None:
+                        self.skipped.append((task, error))
+                    for found_task in found:
+                        self._enqueue(found_task, discovered)
+                    # An object counts as visited once it is handed to the consumer, which
+                    # may stop the crawl at any `yield`.
+                    done += 1
+                    if crawled is not None:
+                        yield crawled
+            finally:
+                # The frontier stays ordered by depth, since new tasks are one level deeper
+                # than the ones in the batch.
+                self.frontier = self.frontier[done:] + discovered
+                self._save_checkpoint()
+
+    # ---------------------------------------------------------------------------
+    # Distributed crawling
+    # ---------------------------------------------------------------------------
+
+    def work(
+        self, queue: WorkQueue, worker: str, poll_interval: float = 1.0
+    ) -> Iterator[CrawledObject]:
+        """Visit objects leased from a queue shared with other workers, until it is finished.
+
+        The roots are added to the queue by every worker, which has no effect once they are
+        in it. Objects whose visit fails are given back to the queue to be retried. Leases are
+        renewed while their batch is visited, so slow batches aren't stolen by other workers.
+        Objects are de-duplicated by the queue, and `seen` and `checkpoint` are not used.
+        """
+        queue.put(
+            (task.key, {"task": task.to_json()})
+            for task in self._root_tasks()
+            if self._accepts(task)
+        )
+
+        def visit(task: CrawlTask):
+            try:
+                return self._visit(task)
+            except Exception as e:
+                return None, [], e
+
+        while True:
+            leases = queue.lease(worker, self.batch_size)
+            if not leases:
+                if queue.finished():
+                    return
+                # Other workers may still discover objects in the items they are visiting.
+                time.sleep(poll_interval)
+                continue
+
+            tasks = [CrawlTask(*lease.data["task"]) for lease in leases]
+            with _renewing(queue, leases):
+                results = self.client.bulk_map(visit, tasks, self.max_workers)
+            for lease, task, (crawled, found, error) in zip(leases, tasks, results):
+                queue.put(
+                    (found_task.key, {"task": found_task.to_json()})
+                    for found_task in found
+                    if self._accepts(found_task)
+                )
+                if crawled is None and not (
+                    isinstance(error, NotionAPIError)
+                    and error.status in SKIPPED_STATUSES
+                ):
+                    queue.fail(lease, repr(error))
+                    continue
+                if error is not None:
+                    self.skipped.append((task, error))
+                # Objects are yielded only by the worker that still holds the lease, so a
+                # stolen object is reported once.
+                if queue.complete(lease) and crawled is not None:
+                    yield crawled
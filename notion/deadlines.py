@@ -0,0 +1,55 @@
+"""Time budgets for operations made of many requests.
+
+A deadline applies to all requests made inside a `with` block, including those made while
+paginating, traversing block trees or in the workers of bulk operations:
+
+    with client.deadline(5):
+        page.delete()
+
+Once it has passed, no further request is sent and `DeadlineExceeded` is raised instead.
+Requests in flight are cut short by limiting their timeout to the time left, and retries
+are not attempted if their backoff would end after the deadline. Nested deadlines can only
+shorten the budget of the enclosing one.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from notion.errors import DeadlineExceeded
+
+_current_deadline: ContextVar[Optional[float]] = ContextVar(
+    "notion_deadline", default=None
+)
+
+
+def current_deadline() -> Optional[float]:
+    "The deadline of the current context as `time.monotonic()` value, if there is one."
+    return _current_deadline.get()
+
+
+def remaining() -> Optional[float]:
+    "Seconds left until the deadline of the current context, or `None` without one."
+    deadline = _current_deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def check_deadline():
+    "Raise `DeadlineExceeded` if the deadline of the current context has passed."
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded(f"Deadline exceeded by {-left:.3f}s.")
+
+
+@contextmanager
+def deadline(seconds: float):
+    "Give all requests inside the `with` block `seconds` in total."
+    new_deadline = time.monotonic() + seconds
+    enclosing = _current_deadline.get()
+    if enclosing is not None:
+        new_deadline = min(new_deadline, enclosing)
+    reset_token = _current_deadline.set(new_deadline)
+    try:
+        yield
+    finally:
+        _current_deadline.reset(reset_token)
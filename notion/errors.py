@@ -0,0 +1,52 @@
+from typing import Optional
+
+
+class NotionAPIError(ValueError):
+    """An error response of the Notion API.
+
+    Subclasses `ValueError` since that is what the client used to raise for all failed requests.
+
+    Docs: https://developers.notion.com/reference/errors
+    """
+
+    def __init__(
+        self,
+        message: str,
+        status: Optional[int] = None,
+        code: Optional[str] = None,
+        retry_after: Optional[float] = None,
+    ):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+        self.retry_after = retry_after
+
+    @staticmethod
+    def from_response(response, codec) -> "NotionAPIError":
+        try:
+            code = codec.loads(response.content).get("code")
+        except Exception:
+            code = None
+        retry_after = response.headers.get("Retry-After")
+        return NotionAPIError(
+            response.text,
+            status=response.status_code,
+            code=code,
+            retry_after=float(retry_after) if retry_after else None,
+        )
+
+
+class DeadlineExceeded(TimeoutError):
+    "Raised instead of sending a request once the deadline of the current operation passed."
+
+
+class CircuitOpenError(ConnectionError):
+    """Raised instead of sending a request while the circuit of its endpoint family is open.
+
+    `retry_after` are the seconds until the circuit lets probe requests through again.
+    """
+
+    def __init__(self, message: str, family: str, retry_after: float):
+        super().__init__(message)
+        self.family = family
+        self.retry_after = retry_after
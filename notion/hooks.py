@@ -0,0 +1,78 @@
+"""Event hooks to observe the requests made by `NotionClient`.
+
+Handlers are registered per event and called synchronously with a `RequestEvent`:
+
+    client.hooks.register("after_response", lambda event: print(event.elapsed))
+
+Events:
+    before_request: A request (or a retry of it) is about to be sent.
+    after_response: A response was received, whatever its status.
+    retry: A failed request will be retried after `event.wait` seconds.
+    throttle: The client waits `event.wait` seconds because of rate limiting.
+    error: A request failed for good; `event.error` holds the exception.
+    circuit: The circuit breaker of the endpoint family `event.endpoint` changed to
+             `event.state`.
+"""
+import re
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+EVENTS = ("before_request", "after_response", "retry", "throttle", "error", "circuit")
+
+ID_REGEX = re.compile(
+    r"[0-9a-f]{8}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{12}"
+)
+
+
+def endpoint_template(entity: str) -> str:
+    "Turn a request path like `pages/<id>` into the endpoint name `pages/{id}`."
+    return ID_REGEX.sub("{id}", entity.split("?")[0]).strip("/")
+
+
+@dataclass
+class RequestEvent:
+    event: str
+    method: str
+    endpoint: str
+    url: str
+    attempt: int = 0
+    status: Optional[int] = None
+    elapsed: Optional[float] = None
+    request_bytes: int = 0
+    response_bytes: int = 0
+    wait: Optional[float] = None
+    error: Optional[Exception] = None
+    priority: Optional[str] = None
+    state: Optional[str] = None
+
+
+class Hooks:
+    def __init__(self):
+        self._handlers: Dict[str, List[Callable[[RequestEvent], None]]] = {
+            event: [] for event in EVENTS
+        }
+        self._lock = threading.Lock()
+
+    def register(self, event: str, handler: Callable[[RequestEvent], None]):
+        "Call `handler` for every `event`. Returns the handler, so it works as decorator."
+        if event not in self._handlers:
+            raise ValueError(f"Event {event!r} is not supported.")
+        with self._lock:
+            self._handlers[event] = self._handlers[event] + [handler]
+        return handler
+
+    def unregister(self, event: str, handler: Callable[[RequestEvent], None]):
+        with self._lock:
+            self._handlers[event] = [h for h in self._handlers[event] if h != handler]
+
+    def has_handlers(self, event: str) -> bool:
+        return bool(self._handlers[event])
+
+    def emit(self, event: str, **kwargs) -> None:
+        handlers = self._handlers[event]
+        if not handlers:
+            return
+        request_event = RequestEvent(event=event, **kwargs)
+        for handler in handlers:
+            handler(request_event)
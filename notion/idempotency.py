@@ -0,0 +1,178 @@
+"""Make retries of non-idempotent writes safe by looking up their result before retrying.
+
+The Notion API has no idempotency keys. When creating a page or database or appending
+blocks fails with a server error or a lost connection, the write may have been applied
+anyway. Before such a request is retried, the client looks for the object it would have
+created: a page or database with the same parent and title, a database row with the same
+values of all properties that were sent, or a run of blocks matching the appended ones,
+created since the first attempt. If one is found, it is returned instead of
+creating a duplicate.
+
+Objects returned by earlier creates of the same client are never returned again, so bulk
+writers creating many objects with the same title don't get each other's results. Rows of
+a database often share a title, so they are told apart by all their properties; a
+concurrent create of a row with exactly the same values can still be mistaken for another. Since
+Notion rounds `created_time` down to the minute, objects created by someone else with the
+same parent and title within about a minute before the write could still be mistaken for
+its result.
+"""
+import threading
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from notion.model.common.utils import comparable, parse_notion_datetime
+
+CLOCK_SKEW = timedelta(seconds=60)
+TYPES_WITHOUT_TEXT = ("child_page", "child_database")
+
+
+def write_started() -> datetime:
+    "The earliest `created_time` an object created by a write starting now can have."
+    return (datetime.now(timezone.utc) - CLOCK_SKEW).replace(second=0, microsecond=0)
+
+
+def plain_text(rich_text: List[dict]) -> str:
+    "Plain text of rich text as sent to (`text.content`) or returned by the API."
+    return "".join(
+        item.get("plain_text") or item.get("text", {}).get("content", "")
+        for item in rich_text or []
+    )
+
+
+def block_signature(block: dict):
+    "What a block sent to the API and the block returned for it have in common."
+    type_ = block.get("type") or next(k for k in block if k != "object")
+    content = block.get(type_) or {}
+    if type_ in TYPES_WITHOUT_TEXT:
+        return type_, content.get("title", "")
+    return type_, plain_text(content.get("rich_text"))
+
+
+class CreatedObjects:
+    "IDs of the most recently created objects, with a bounded memory footprint."
+
+    def __init__(self, maxlen: int = 10_000):
+        self._order = deque()
+        self._ids = set()
+        self._maxlen = maxlen
+        self._lock = threading.Lock()
+
+    def add(self, object_id: str):
+        with self._lock:
+            if object_id in self._ids:
+                return
+            self._order.append(object_id)
+            self._ids.add(object_id)
+            if len(self._order) > self._maxlen:
+                self._ids.discard(self._order.popleft())
+
+    def __contains__(self, object_id: str) -> bool:
+        return object_id in self._ids
+
+
+def _children(client, block_id: str) -> List[dict]:
+    return client._paginate("get", f"blocks/{block_id}/children")
+
+
+def _is_new(client, obj: dict, since: datetime) -> bool:
+    return (
+        obj["id"] not in client._created
+        and not obj.get("archived")
+        and parse_notion_datetime(obj["created_time"]) >= since
+    )
+
+
+def _page_title(page_data: dict) -> str:
+    for value in (page_data.get("properties") or {}).values():
+        if "title" in value:
+            return plain_text(value["title"])
+    return ""
+
+
+def _has_properties(page: dict, properties: dict) -> bool:
+    "Whether a page returned by the API has all `properties` as sent to create it."
+    current = page.get("properties") or {}
+    title_name = next(
+        (name for name, value in current.items() if value.get("type") == "title"), None
+    )
+    for name, value in properties.items():
+        prop = current.get(name)
+        if prop is None and "title" in value:
+            # The title can be sent under any name.
+            prop = current.get(title_name)
+        if prop is None:
+            return False
+        type_ = prop["type"]
+        sent = value[type_] if type_ in value else next(iter(value.values()))
+        if comparable(type_, sent) != comparable(type_, prop.get(type_)):
+            return False
+    return True
+
+
+def _find_child(client, parent_id: str, type_: str, title: str, since: datetime):
+    for block in reversed(_children(client, parent_id)):
+        if block_signature(block) == (type_, title) and _is_new(client, block, since):
+            return block["id"]
+    return None
+
+
+def find_created_page(client, page_data: dict, since: datetime) -> Optional[dict]:
+    "Find a page created by a `create_page` call with `page_data` since `since`."
+    parent = page_data.get("parent") or {}
+    if "page_id" in parent:
+        title = _page_title(page_data)
+        page_id = _find_child(client, parent["page_id"], "child_page", title, since)
+        return client._make_request("get", f"pages/{page_id}") if page_id else None
+
+    if "database_id" in parent:
+        payload = {
+            "filter": {
+                "timestamp": "created_time",
+                "created_time": {"on_or_after": since.date().isoformat()},
+            },
+            "sorts": [{"timestamp": "created_time", "direction": "descending"}],
+        }
+        pages = client._paginate(
+            "post", f"databases/{parent['database_id']}/query", payload
+        )
+        for page in pages:
+            if _has_properties(page, page_data.get("properties") or {}) and _is_new(
+                client, page, since
+            ):
+                return page
+    return None
+
+
+def find_created_database(
+    client, database_data: dict, since: datetime
+) -> Optional[dict]:
+    "Find a database created by a `create_database` call with `database_data`."
+    parent = database_data.get("parent") or {}
+    if "page_id" not in parent:
+        return None
+    title = plain_text(database_data.get("title"))
+    database_id = _find_child(client, parent["page_id"], "child_database", title, since)
+    return (
+        client._make_request("get", f"databases/{database_id}") if database_id else None
+    )
+
+
+def find_appended_children(
+    client, block_id: str, children: List[dict], since: datetime
+) -> Optional[dict]:
+    """Find the blocks added by an `append_block_children` call with `children`.
+
+    Looks for the last run of new child blocks matching `children` one by one.
+    """
+    if not children:
+        return None
+    signatures = [block_signature(child) for child in children]
+    existing = _children(client, block_id)
+    for start in range(len(existing) - len(children), -1, -1):
+        run = existing[start : start + len(children)]
+        if [block_signature(block) for block in run] == signatures and all(
+            _is_new(client, block, since) for block in run
+        ):
+            return {"object": "list", "results": run, "next_cursor": None}
+    return None
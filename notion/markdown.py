@@ -0,0 +1,757 @@
+"""Export the content of pages and blocks as Markdown, and import Markdown documents.
+
+    with open("page.md", "w") as f:
+        MarkdownExporter(client).export_page(page, f)
+
+Markdown is written to the file-like object block by block, in document order, while the
+children of upcoming blocks are loaded by a pool of workers. Only the blocks in a window
+of `prefetch` blocks per nesting level are kept in memory, so the first lines are written
+long before a large page has loaded completely.
+
+Every block type of `notion.model.block` has a renderer in `RENDERERS`, which can be
+extended or overridden for other types and output styles. Blocks of unknown types are
+exported as their text, if they have any.
+
+`MarkdownImporter` converts CommonMark documents with tables into blocks and uploads them
+in as few requests as the limits of the API allow:
+
+    MarkdownImporter(client).import_markdown(page_id, text)
+"""
+import re
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import copy_context
+from dataclasses import dataclass, field
+from io import StringIO
+from itertools import chain
+from typing import Callable, Dict, Iterator, List, Optional, TextIO
+
+from notion.model.block import CODE_BLOCK_LANGUAGES, split_rich_text
+
+try:
+    from markdown_it import MarkdownIt
+    from markdown_it.tree import SyntaxTreeNode
+except ImportError:  # pragma: no cover
+    MarkdownIt = SyntaxTreeNode = None
+
+# Children of these blocks are separate pages, which are linked to instead of exported.
+PAGE_TYPES = ("child_page", "child_database")
+# Consecutive blocks of the same group, e.g. the items of a list, are not separated by
+# blank lines.
+TIGHT_GROUPS = {
+    "bulleted_list_item": "bullets",
+    "to_do": "bullets",
+    "numbered_list_item": "numbers",
+    "table_row": "table_rows",
+}
+INDENT = "    "
+
+_ESCAPED = re.compile(r"([\\`*_\[\]<>|])")
+
+
+# ---------------------------------------------------------------------------
+# Rich Text
+# ---------------------------------------------------------------------------
+
+
+def escape(text: str) -> str:
+    "Escape characters that would otherwise be read as Markdown syntax."
+    return _ESCAPED.sub(r"\\\1", text)
+
+
+def _wrap(text: str, marker: str) -> str:
+    "Put `marker` around `text`, keeping surrounding whitespace outside like Markdown needs."
+    stripped = text.strip()
+    if not stripped:
+        return text
+    start = text.index(stripped)
+    return f"{text[:start]}{marker}{stripped}{marker}{text[start + len(stripped):]}"
+
+
+def rich_text_to_markdown(rich_text: List[dict]) -> str:
+    "Render rich text objects with their annotations and links."
+    parts = []
+    for item in rich_text or []:
+        text = item.get("plain_text")
+        if text is None:
+            text = item.get(item.get("type", "text"), {}).get("content", "")
+        annotations = item.get("annotations") or {}
+        if item.get("type") == "equation":
+            parts.append(f"${item['equation']['expression']}$")
+            continue
+        if annotations.get("code"):
+            text = _wrap(text, "`")
+        else:
+            text = escape(text)
+        if annotations.get("bold"):
+            text = _wrap(text, "**")
+        if annotations.get("italic"):
+            text = _wrap(text, "*")
+        if annotations.get("strikethrough"):
+            text = _wrap(text, "~~")
+        link = item.get("href") or (item.get("text") or {}).get("link")
+        if isinstance(link, dict):
+            link = link.get("url")
+        if link:
+            text = f"[{text}]({link})"
+        parts.append(text)
+    return "".join(parts)
+
+
+# ---------------------------------------------------------------------------
+# Renderers
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class RenderContext:
+    "Where a block is rendered: its parent block, position among siblings and list number."
+
+    parent: Optional[dict]
+    index: int
+    number: int
+
+
+@dataclass
+class Rendered:
+    """The Markdown of a block.
+
+    `lines` are written before the block's children, which are prefixed with
+    `child_prefix`, and `after` is written after them.
+    """
+
+    lines: List[str]
+    child_prefix: str = ""
+    after: List[str] = field(default_factory=list)
+
+
+def _content(block: dict) -> dict:
+    return block.get(block["type"]) or {}
+
+
+def _text(block: dict) -> str:
+    return rich_text_to_markdown(_content(block).get("rich_text"))
+
+
+def _file_url(block: dict) -> str:
+    content = _content(block)
+    return (content.get("external") or content.get("file") or {}).get("url", "")
+
+
+def _caption(block: dict) -> str:
+    return rich_text_to_markdown(_content(block).get("caption"))
+
+
+def notion_url(object_id: str) -> str:
+    return f"https://www.notion.so/{object_id.replace('-', '')}"
+
+
+def _heading(level: int) -> Callable:
+    def render(block: dict, context: RenderContext) -> Rendered:
+        return Rendered(["#" * level + " " + _text(block)])
+
+    return render
+
+
+def _render_code(block: dict, context: RenderContext) -> Rendered:
+    content = _content(block)
+    language = content.get("language", "")
+    code = "".join(
+        item.get("plain_text") or item.get("text", {}).get("content", "")
+        for item in content.get("rich_text") or []
+    )
+    # A fence longer than any run of backticks in the code can't be closed by it.
+    fence = "`" * max(3, max(map(len, re.findall("`+", code)), default=0) + 1)
+    lines = [fence + ("" if language == "plain text" else language)]
+    lines.extend(code.split("\n"))
+    lines.append(fence)
+    if content.get("caption"):
+        lines.extend(["", _caption(block)])
+    return Rendered(lines)
+
+
+def _render_callout(block: dict, context: RenderContext) -> Rendered:
+    icon = (_content(block).get("icon") or {}).get("emoji")
+    text = _text(block)
+    return Rendered([f"> {icon} {text}" if icon else f"> {text}"], "> ")
+
+
+def _render_numbered(block: dict, context: RenderContext) -> Rendered:
+    return Rendered([f"{context.number}. {_text(block)}"], INDENT)
+
+
+def _render_to_do(block: dict, context: RenderContext) -> Rendered:
+    checked = "x" if _content(block).get("checked") else " "
+    return Rendered([f"- [{checked}] {_text(block)}"], INDENT)
+
+
+def _render_toggle(block: dict, context: RenderContext) -> Rendered:
+    return Rendered(
+        ["<details>", f"<summary>{_text(block)}</summary>"], "", ["", "</details>"]
+    )
+
+
+def _render_link(title: str, url: str) -> Rendered:
+    return Rendered([f"[{title or url}]({url})"])
+
+
+def _render_media(block: dict, context: RenderContext) -> Rendered:
+    url = _file_url(block) or _content(block).get("url", "")
+    name = _caption(block) or escape(_content(block).get("name") or "") or url
+    if block["type"] == "image":
+        return Rendered([f"![{_caption(block)}]({url})"])
+    return _render_link(name, url)
+
+
+def _render_child(block: dict, context: RenderContext) -> Rendered:
+    return _render_link(
+        escape(_content(block).get("title", "")), notion_url(block["id"])
+    )
+
+
+def _render_link_to_page(block: dict, context: RenderContext) -> Rendered:
+    content = _content(block)
+    return _render_link("", notion_url(content[content["type"]]))
+
+
+def _render_equation(block: dict, context: RenderContext) -> Rendered:
+    return Rendered(["$$", _content(block).get("expression", ""), "$$"])
+
+
+def _table_row(cells: List[str]) -> str:
+    return "| " + " | ".join(cells) + " |"
+
+
+def _render_table_row(block: dict, context: RenderContext) -> Rendered:
+    cells = [
+        rich_text_to_markdown(cell).replace("\n", "<br>")
+        for cell in _content(block).get("cells", [])
+    ]
+    separator = _table_row(["---"] * len(cells))
+    if context.index > 0:
+        return Rendered([_table_row(cells)])
+    table = _content(context.parent) if context.parent else {}
+    if table.get("has_column_header"):
+        return Rendered([_table_row(cells), separator])
+    # Markdown tables need a header row, so tables without one get an empty one.
+    return Rendered([_table_row([""] * len(cells)), separator, _table_row(cells)])
+
+
+def _render_container(block: dict, context: RenderContext) -> Rendered:
+    "Blocks that only hold other blocks, which are exported like top-level blocks."
+    return Rendered([])
+
+
+def _render_nothing(block: dict, context: RenderContext) -> Optional[Rendered]:
+    return None
+
+
+def _render_generic(block: dict, context: RenderContext) -> Rendered:
+    text = _text(block)
+    return Rendered([text] if text else [])
+
+
+RENDERERS: Dict[str, Callable[[dict, RenderContext], Optional[Rendered]]] = {
+    "paragraph": lambda block, context: Rendered([_text(block)]),
+    "heading_1": _heading(1),
+    "heading_2": _heading(2),
+    "heading_3": _heading(3),
+    "quote": lambda block, context: Rendered(["> " + _text(block)], "> "),
+    "callout": _render_callout,
+    "code": _render_code,
+    "divider": lambda block, context: Rendered(["---"]),
+    "bulleted_list_item": lambda block, context: Rendered(
+        ["- " + _text(block)], INDENT
+    ),
+    "numbered_list_item": _render_numbered,
+    "to_do": _render_to_do,
+    "toggle": _render_toggle,
+    "template": _render_generic,
+    "equation": _render_equation,
+    "bookmark": lambda block, context: _render_link(
+        _caption(block), _content(block).get("url", "")
+    ),
+    "embed": lambda block, context: _render_link(
+        _caption(block), _content(block).get("url", "")
+    ),
+    "link_preview": lambda block, context: _render_link(
+        "", _content(block).get("url", "")
+    ),
+    "image": _render_media,
+    "video": _render_media,
+    "audio": _render_media,
+    "file": _render_media,
+    "pdf": _render_media,
+    "child_page": _render_child,
+    "child_database": _render_child,
+    "link_to_page": _render_link_to_page,
+    "synced_block": _render_container,
+    "column_list": _render_container,
+    "column": _render_container,
+    "table": _render_container,
+    "table_row": _render_table_row,
+    "table_of_contents": _render_nothing,
+    "breadcrumb": _render_nothing,
+}
+
+
+# ---------------------------------------------------------------------------
+# Exporter
+# ---------------------------------------------------------------------------
+
+
+def _write_line(out: TextIO, prefix: str, line: str):
+    out.write(prefix + line + "\n" if line else prefix.rstrip() + "\n")
+
+
+class MarkdownExporter:
+    """Streams the block trees of pages as Markdown.
+
+    Params:
+        client: The `NotionClient` to load blocks with.
+        max_workers (optional): Number of children lists loaded concurrently.
+        prefetch (optional): Number of upcoming blocks per nesting level whose children are
+                             loaded ahead of time.
+        renderers (optional): Renderers to use instead of the default ones for some types.
+    """
+
+    def __init__(
+        self,
+        client,
+        max_workers: int = 4,
+        prefetch: int = 16,
+        renderers: Optional[Dict[str, Callable]] = None,
+    ):
+        self.client = client
+        self.max_workers = max_workers
+        self.prefetch = prefetch
+        self.renderers = {**RENDERERS, **(renderers or {})}
+
+    def _open(self, block_id: str) -> Iterator[dict]:
+        "Load the first batch of children of a block, leaving the rest to be loaded lazily."
+        children = self.client._iter_paginate("get", f"blocks/{block_id}/children")
+        first = next(children, None)
+        return iter(()) if first is None else chain([first], children)
+
+    def _submit(self, pool: ThreadPoolExecutor, block: dict) -> Optional[Future]:
+        if not block.get("has_children") or block["type"] in PAGE_TYPES:
+            return None
+        return pool.submit(copy_context().run, self._open, block["id"])
+
+    def _write_blocks(
+        self,
+        pool: ThreadPoolExecutor,
+        blocks: Iterator[dict],
+        out: TextIO,
+        prefix: str,
+        parent: Optional[dict],
+    ):
+        window = deque()
+        previous_type = None
+        index = number = 0
+        while True:
+            while len(window) < self.prefetch:
+                block = next(blocks, None)
+                if block is None:
+                    break
+                window.append((block, self._submit(pool, block)))
+            if not window:
+                return
+            block, children = window.popleft()
+
+            type_ = block["type"]
+            number = number + 1 if type_ == previous_type else 1
+            renderer = self.renderers.get(type_, _render_generic)
+            rendered = renderer(block, RenderContext(parent, index, number))
+            if rendered is None:
+                if children is not None:
+                    children.cancel()
+                continue
+
+            group = TIGHT_GROUPS.get(type_)
+            if index > 0 and not (group and group == TIGHT_GROUPS.get(previous_type)):
+                _write_line(out, prefix, "")
+            for line in rendered.lines:
+                _write_line(out, prefix, line)
+            if children is not None:
+                child_prefix = prefix + rendered.child_prefix
+                # Children of list items continue the item, others start a new paragraph.
+                if rendered.lines and type_ not in TIGHT_GROUPS:
+                    _write_line(out, child_prefix, "")
+                self._write_blocks(pool, children.result(), out, child_prefix, block)
+            for line in rendered.after:
+                _write_line(out, prefix, line)
+            previous_type = type_
+            index += 1
+
+    def export(self, block_id: str, out: TextIO):
+        "Write the children of a block or page, and all their descendants, to `out`."
+        pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            self._write_blocks(pool, self._open(block_id), out, "", None)
+        finally:
+            pool.shutdown(cancel_futures=True)
+
+    def export_page(self, page, out: TextIO):
+        "Write the title of a `Page` as heading, followed by its content."
+        out.write(f"# {escape(page.title)}\n\n")
+        self.export(page.id, out)
+
+    def to_markdown(self, block_id: str) -> str:
+        "The Markdown of the children of a block or page, as string."
+        out = StringIO()
+        self.export(block_id, out)
+        return out.getvalue()
+
+
+# ---------------------------------------------------------------------------
+# Import
+# ---------------------------------------------------------------------------
+
+# Limits of the Notion API for appending blocks.
+MAX_CHILDREN = 100
+MAX_NESTING = 2
+MAX_BLOCKS_PER_REQUEST = 1000
+MAX_RICH_TEXT_ITEMS = 100
+
+# Blocks that can't be created without (some of) their children.
+REQUIRED_CHILDREN_TYPES = ("table", "column_list", "column")
+
+LANGUAGE_ALIASES = {
+    "": "plain text",
+    "text": "plain text",
+    "txt": "plain text",
+    "py": "python",
+    "js": "javascript",
+    "ts": "typescript",
+    "sh": "shell",
+    "zsh": "shell",
+    "console": "shell",
+    "yml": "yaml",
+    "cpp": "c++",
+    "cs": "c#",
+    "csharp": "c#",
+    "rb": "ruby",
+    "rs": "rust",
+    "kt": "kotlin",
+    "md": "markdown",
+    "dockerfile": "docker",
+    "tex": "latex",
+}
+
+_ANNOTATIONS = {"strong": "bold", "em": "italic", "s": "strikethrough"}
+_TASK = re.compile(r"\[([ xX])\] ")
+
+
+def _text_item(content: str, annotations: frozenset, link: Optional[str]) -> dict:
+    item = {"type": "text", "text": {"content": content}}
+    if link:
+        item["text"]["link"] = {"url": link}
+    if annotations:
+        item["annotations"] = {name: True for name in sorted(annotations)}
+    return item
+
+
+def _inline_items(node, annotations: frozenset = frozenset(), link=None) -> Iterator:
+    "Yield `(content, annotations, link)` for the text of an inline syntax tree node."
+    for child in node.children:
+        if child.type in ("text", "html_inline"):
+            yield child.content, annotations, link
+        elif child.type == "code_inline":
+            yield child.content, annotations | {"code"}, link
+        elif child.type == "softbreak":
+            yield " ", annotations, link
+        elif child.type == "hardbreak":
+            yield "\n", annotations, link
+        elif child.type in _ANNOTATIONS:
+            yield from _inline_items(
+                child, annotations | {_ANNOTATIONS[child.type]}, link
+            )
+        elif child.type == "link":
+            href = child.attrs.get("href", "")
+            # Notion only accepts absolute links.
+            yield from _inline_items(
+                child, annotations, href if re.match(r"[a-z]+:", href) else link
+            )
+        elif child.type == "image":
+            yield from _inline_items(child, annotations, link)
+
+
+def _rich_text(node) -> List[dict]:
+    "Rich text of an inline node, with runs of equally formatted text merged."
+    runs = []
+    for content, annotations, link in _inline_items(node):
+        if runs and runs[-1][1:] == [annotations, link]:
+            runs[-1][0] += content
+        elif content:
+            runs.append([content, annotations, link])
+    return split_rich_text([_text_item(*run) for run in runs])
+
+
+def _text_blocks(type_: str, rich_text: List[dict], **content) -> List[dict]:
+    "Blocks of a type with rich text, split into several if it has too many items."
+    chunks = [
+        rich_text[start : start + MAX_RICH_TEXT_ITEMS]
+        for start in range(0, len(rich_text), MAX_RICH_TEXT_ITEMS)
+    ] or [[]]
+    blocks = [{"type": type_, type_: {"rich_text": chunk}} for chunk in chunks]
+    # Further content, e.g. children, belongs to the last block.
+    blocks[-1][type_].update(content)
+    return blocks
+
+
+def _with_children(type_: str, nodes, **content) -> List[dict]:
+    """Blocks like list items and quotes, whose first paragraph is their text.
+
+    The rest of their content becomes children.
+    """
+    rich_text = []
+    if nodes and nodes[0].type == "paragraph":
+        rich_text = _rich_text(nodes[0].children[0])
+        nodes = nodes[1:]
+    children = [block for node in nodes for block in _convert(node)]
+    if type_ == "bulleted_list_item" and rich_text:
+        match = _TASK.match(rich_text[0]["text"]["content"])
+        if match:
+            type_ = "to_do"
+            content["checked"] = match.group(1) != " "
+            rich_text[0]["text"]["content"] = rich_text[0]["text"]["content"][
+                match.end() :
+            ]
+    if children:
+        content["children"] = children
+    return _text_blocks(type_, rich_text, **content)
+
+
+def _code_language(info: str) -> str:
+    language = info.split()[0].lower() if info.strip() else ""
+    language = LANGUAGE_ALIASES.get(language, language)
+    return language if language in CODE_BLOCK_LANGUAGES else "plain text"
+
+
+def _table_cells(row) -> List[List[dict]]:
+    return [
+        _rich_text(cell.children[0]) if cell.children else [] for cell in row.children
+    ]
+
+
+def _convert(node) -> List[dict]:
+    "Convert a node of the Markdown syntax tree into blocks."
+    if node.type == "heading":
+        level = min(int(node.tag[1]), 3)
+        return _text_blocks(f"heading_{level}", _rich_text(node.children[0]))
+    if node.type == "paragraph":
+        inline = node.children[0]
+        if len(inline.children) == 1 and inline.children[0].type == "image":
+            image = inline.children[0]
+            src = image.attrs.get("src", "")
+            if re.match(r"https?://", src):
+                caption = _rich_text(image)
+                return [
+                    {
+                        "type": "image",
+                        "image": {
+                            "type": "external",
+                            "external": {"url": src},
+                            "caption": caption,
+                        },
+                    }
+                ]
+        return _text_blocks("paragraph", _rich_text(inline))
+    if node.type in ("bullet_list", "ordered_list"):
+        type_ = (
+            "bulleted_list_item" if node.type == "bullet_list" else "numbered_list_item"
+        )
+        return [
+            block
+            for item in node.children
+            for block in _with_children(type_, item.children)
+        ]
+    if node.type == "blockquote":
+        return _with_children("quote", node.children)
+    if node.type in ("fence", "code_block"):
+        code = [_text_item(node.content.rstrip("\n"), frozenset(), None)]
+        return _text_blocks(
+            "code", split_rich_text(code), language=_code_language(node.info)
+        )
+    if node.type == "hr":
+        return [{"type": "divider", "divider": {}}]
+    if node.type == "table":
+        rows = [row for section in node.children for row in section.children]
+        cells = [_table_cells(row) for row in rows]
+        width = max(len(row) for row in cells)
+        children = [
+            {
+                "type": "table_row",
+                "table_row": {"cells": row + [[]] * (width - len(row))},
+            }
+            for row in cells
+        ]
+        return [
+            {
+                "type": "table",
+                "table": {
+                    "table_width": width,
+                    "has_column_header": node.children[0].type == "thead",
+                    "has_row_header": False,
+                    "children": children,
+                },
+            }
+        ]
+    if node.type == "html_block":
+        content = node.content.rstrip("\n")
+        return _text_blocks(
+            "paragraph", split_rich_text([_text_item(content, frozenset(), None)])
+        )
+    return []
+
+
+def markdown_to_blocks(text: str) -> List[dict]:
+    """Convert a CommonMark document with tables into blocks as `append_block_children`
+    takes them, nested children included.
+
+    Requires `pip install pythonic-notion-sdk[markdown]`.
+    """
+    if MarkdownIt is None:
+        raise ImportError(
+            "Importing Markdown requires `pip install pythonic-notion-sdk[markdown]`."
+        )
+    parser = MarkdownIt("commonmark").enable(["table", "strikethrough"])
+    tree = SyntaxTreeNode(parser.parse(text))
+    return [block for node in tree.children for block in _convert(node)]
+
+
+class _Budget:
+    def __init__(self, remaining: int):
+        self.remaining = remaining
+
+
+def _fits(block: dict, depth: int, budget: _Budget) -> bool:
+    "Whether a block, with the children it must be created with, fits into a request."
+    size = 1
+    while block["type"] in REQUIRED_CHILDREN_TYPES:
+        children = block[block["type"]].get("children")
+        if not children:
+            break
+        if depth >= MAX_NESTING:
+            return False
+        block, depth, size = children[0], depth + 1, size + 1
+    return size <= budget.remaining
+
+
+def _take(blocks: List[dict], depth: int, budget: _Budget):
+    """Take as many blocks as fit into a request, with as much of their content as fits.
+
+    Returns the payload, the children left out as `(path, children)` with the position of
+    their parent in the payload, and the number of blocks taken.
+    """
+    payload = []
+    pending = []
+    for index, block in enumerate(blocks):
+        if index == MAX_CHILDREN or not _fits(block, depth, budget):
+            return payload, pending, index
+        budget.remaining -= 1
+        type_ = block["type"]
+        content = dict(block[type_])
+        children = content.pop("children", None) or []
+        path = (len(payload),)
+        payload.append({"type": type_, type_: content})
+        if not children:
+            continue
+        if depth == MAX_NESTING:
+            pending.append((path, children))
+            continue
+        child_payload, child_pending, taken = _take(children, depth + 1, budget)
+        if child_payload:
+            content["children"] = child_payload
+        pending.extend((path + child_path, rest) for child_path, rest in child_pending)
+        if taken < len(children):
+            pending.append((path, children[taken:]))
+    return payload, pending, len(blocks)
+
+
+class MarkdownImporter:
+    """Uploads blocks, e.g. converted from Markdown, with as few requests as possible.
+
+    Each request carries up to 100 blocks with two levels of nested children, up to 1000
+    blocks in total. Deeper or longer lists of children are appended to their parents
+    afterwards, in as few requests as possible as well.
+
+    `writes` counts the requests creating blocks and `reads` those listing created blocks to
+    find the parents of deeper children.
+
+    Params:
+        client: The `NotionClient` to upload with.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.reads = 0
+        self.writes = 0
+
+    @property
+    def requests(self) -> int:
+        return self.reads + self.writes
+
+    def _block_id(self, root_id: str, path: tuple, listings: dict) -> str:
+        "The ID of the block created at `path` below `root_id`."
+        block_id = root_id
+        for position in path:
+            if block_id not in listings:
+                self.reads += 1
+                listings[block_id] = [
+                    block["id"]
+                    for block in self.client._iter_paginate(
+                        "get", f"blocks/{block_id}/children"
+                    )
+                ]
+            block_id = listings[block_id][position]
+        return block_id
+
+    def _append_pending(self, root_id: str, pending: list, listings: dict):
+        for path, children in pending:
+            self.append_blocks(self._block_id(root_id, path, listings), children)
+
+    def append_blocks(
+        self, parent_id: str, blocks: List[dict], after: Optional[str] = None
+    ) -> List[dict]:
+        """Append blocks with all their nested children, or insert them after the child
+        block `after`. Returns the top-level blocks created.
+        """
+        created = []
+        start = 0
+        while start < len(blocks):
+            payload, pending, taken = _take(
+                blocks[start : start + MAX_CHILDREN], 0, _Budget(MAX_BLOCKS_PER_REQUEST)
+            )
+            self.writes += 1
+            results = self.client.append_block_children(parent_id, payload, after)[
+                "results"
+            ]
+            created.extend(results)
+            start += taken
+            if after:
+                after = results[-1]["id"]
+            # The blocks of this request are known, not the other children of the parent.
+            self._append_pending(
+                parent_id, pending, {parent_id: [b["id"] for b in results]}
+            )
+        return created
+
+    def import_markdown(self, parent_id: str, text: str) -> List[dict]:
+        "Append a Markdown document to a page or block."
+        return self.append_blocks(parent_id, markdown_to_blocks(text))
+
+    def import_page(self, page_data: dict, text: str) -> dict:
+        """Create a page with a Markdown document as content.
+
+        `page_data` is passed on to `create_page`, e.g. `{"parent": ..., "properties": ...}`.
+        The first blocks are sent with the page itself, saving a request.
+        """
+        blocks = markdown_to_blocks(text)
+        payload, pending, taken = _take(blocks, 0, _Budget(MAX_BLOCKS_PER_REQUEST))
+        self.writes += 1
+        page = self.client.create_page({**page_data, "children": payload})
+        self._append_pending(page["id"], pending, {})
+        self.append_blocks(page["id"], blocks[taken:])
+        return page
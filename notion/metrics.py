@@ -0,0 +1,257 @@
+"""Request metrics for `NotionClient`, collected through its event hooks.
+
+    metrics = MetricsCollector().attach(client)
+    ...
+    print(metrics.snapshot()["endpoints"]["GET pages/{id}"]["latency"]["p99"])
+    print(metrics.to_prometheus())
+"""
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Callable, Dict, Iterable, List
+
+from notion.hooks import RequestEvent
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Summary:
+    """Count, sum and quantiles of observed values.
+
+    Quantiles are computed over a sliding window of the most recent `window` observations.
+    """
+
+    def __init__(self, window: int = 10_000):
+        self.count = 0
+        self.sum = 0.0
+        self.samples = deque(maxlen=window)
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        self.samples.append(value)
+
+    def quantiles(self, quantiles: Iterable[float] = QUANTILES) -> Dict[float, float]:
+        if not self.samples:
+            return {q: 0.0 for q in quantiles}
+        ordered = sorted(self.samples)
+        return {
+            q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] for q in quantiles
+        }
+
+    def to_json(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            **{f"p{int(q * 100)}": value for q, value in self.quantiles().items()},
+        }
+
+
+class Throughput:
+    "Number of events per second over the last `window` seconds."
+
+    def __init__(self, window: float = 10.0):
+        self.window = window
+        self.started = time.monotonic()
+        self.events = deque()
+
+    def mark(self):
+        now = time.monotonic()
+        self.events.append(now)
+        while self.events[0] < now - self.window:
+            self.events.popleft()
+
+    def per_second(self) -> float:
+        now = time.monotonic()
+        while self.events and self.events[0] < now - self.window:
+            self.events.popleft()
+        return len(self.events) / max(min(self.window, now - self.started), 1e-3)
+
+
+class EndpointMetrics:
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.errors = 0
+        self.statuses: Dict[int, int] = defaultdict(int)
+        self.latency = Summary()
+        self.request_bytes = Summary()
+        self.response_bytes = Summary()
+        self.rate_limit_wait = Summary()
+
+    def to_json(self) -> dict:
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "errors": self.errors,
+            "statuses": dict(self.statuses),
+            "latency": self.latency.to_json(),
+            "request_bytes": self.request_bytes.to_json(),
+            "response_bytes": self.response_bytes.to_json(),
+            "rate_limit_wait": self.rate_limit_wait.to_json(),
+        }
+
+
+class MetricsCollector:
+    """Collects per-endpoint request counts, latencies, payload sizes and rate limit waits.
+
+    Endpoints are identified by method and path with IDs replaced, e.g. `"GET pages/{id}"`.
+    Per priority class, the throughput of the last ten seconds and the current concurrency
+    limit and load of the attached clients' schedulers are reported as well.
+    """
+
+    def __init__(self):
+        self.endpoints: Dict[str, EndpointMetrics] = defaultdict(EndpointMetrics)
+        self.throughput: Dict[str, Throughput] = defaultdict(Throughput)
+        self._lock = threading.Lock()
+        self._clients = []
+
+    def attach(self, client) -> "MetricsCollector":
+        "Start collecting metrics of all requests made by `client`."
+        handlers = {
+            "after_response": self._on_response,
+            "retry": self._on_retry,
+            "throttle": self._on_throttle,
+            "error": self._on_error,
+        }
+        for event, handler in handlers.items():
+            client.hooks.register(event, handler)
+        self._clients.append((client, handlers))
+        return self
+
+    def detach(self):
+        for client, handlers in self._clients:
+            for event, handler in handlers.items():
+                client.hooks.unregister(event, handler)
+        self._clients = []
+
+    def _metrics(self, event: RequestEvent) -> EndpointMetrics:
+        return self.endpoints[f"{event.method} {event.endpoint}"]
+
+    def _on_response(self, event: RequestEvent):
+        with self._lock:
+            metrics = self._metrics(event)
+            metrics.requests += 1
+            metrics.statuses[event.status] += 1
+            metrics.latency.observe(event.elapsed)
+            metrics.request_bytes.observe(event.request_bytes)
+            metrics.response_bytes.observe(event.response_bytes)
+            if event.priority is not None:
+                self.throughput[event.priority].mark()
+
+    def _on_retry(self, event: RequestEvent):
+        with self._lock:
+            self._metrics(event).retries += 1
+
+    def _on_throttle(self, event: RequestEvent):
+        with self._lock:
+            self._metrics(event).rate_limit_wait.observe(event.wait)
+
+    def _on_error(self, event: RequestEvent):
+        with self._lock:
+            self._metrics(event).errors += 1
+
+    def reset(self):
+        with self._lock:
+            self.endpoints.clear()
+            self.throughput.clear()
+
+    def _priorities(self) -> Dict[str, dict]:
+        priorities = defaultdict(
+            lambda: {
+                "throughput": 0.0,
+                "concurrency_limit": None,
+                "in_flight": 0,
+                "queued": 0,
+            }
+        )
+        for name, throughput in self.throughput.items():
+            priorities[name]["throughput"] = throughput.per_second()
+        for client, _ in self._clients:
+            scheduler = client.scheduler
+            for name, priority_class in scheduler.classes.items():
+                metrics = priorities[name]
+                metrics["in_flight"] += scheduler.in_flight[name]
+                metrics["queued"] += scheduler.queued(name)
+                if priority_class.max_concurrency is not None:
+                    limit = metrics["concurrency_limit"] or 0
+                    metrics["concurrency_limit"] = (
+                        limit + priority_class.max_concurrency
+                    )
+        return dict(priorities)
+
+    def snapshot(self) -> dict:
+        "Get all metrics as a JSON-serializable dict."
+        with self._lock:
+            return {
+                "endpoints": {
+                    name: metrics.to_json() for name, metrics in self.endpoints.items()
+                },
+                "priorities": self._priorities(),
+            }
+
+    def export(self, callback: Callable[[dict], None]):
+        "Pass the current `snapshot()` to `callback`, e.g. to forward it to a metrics backend."
+        callback(self.snapshot())
+
+    def to_prometheus(self, prefix: str = "notion_client") -> str:
+        "Render all metrics in the Prometheus text exposition format."
+        lines: List[str] = []
+
+        def summary(name: str, help_text: str, attribute: str):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} summary")
+            for endpoint, metrics in sorted(self.endpoints.items()):
+                values = getattr(metrics, attribute)
+                labels = _labels(endpoint)
+                for q, value in values.quantiles().items():
+                    lines.append(
+                        f'{prefix}_{name}{{{labels},quantile="{q}"}} {value:.6g}'
+                    )
+                lines.append(f"{prefix}_{name}_sum{{{labels}}} {values.sum:.6g}")
+                lines.append(f"{prefix}_{name}_count{{{labels}}} {values.count}")
+
+        def counter(name: str, help_text: str, get_values):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            for endpoint, metrics in sorted(self.endpoints.items()):
+                for extra_labels, value in get_values(metrics):
+                    labels = ",".join(filter(None, [_labels(endpoint), extra_labels]))
+                    lines.append(f"{prefix}_{name}{{{labels}}} {value}")
+
+        with self._lock:
+            counter(
+                "requests_total",
+                "Requests by endpoint and HTTP status.",
+                lambda m: [(f'status="{s}"', n) for s, n in sorted(m.statuses.items())],
+            )
+            counter("retries_total", "Retried requests.", lambda m: [("", m.retries)])
+            counter("errors_total", "Failed requests.", lambda m: [("", m.errors)])
+            summary("request_duration_seconds", "Request latency.", "latency")
+            summary("request_size_bytes", "Request body size.", "request_bytes")
+            summary("response_size_bytes", "Response body size.", "response_bytes")
+            summary(
+                "rate_limit_wait_seconds",
+                "Time waited for rate limits.",
+                "rate_limit_wait",
+            )
+            priorities = sorted(self._priorities().items())
+        for name, help_text, key in (
+            ("throughput", "Requests per second over the last 10s.", "throughput"),
+            ("concurrency_limit", "Allowed concurrent requests.", "concurrency_limit"),
+            ("in_flight_requests", "Requests in flight.", "in_flight"),
+            ("queued_requests", "Requests waiting to be sent.", "queued"),
+        ):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} gauge")
+            for priority, metrics in priorities:
+                if metrics[key] is not None:
+                    lines.append(
+                        f'{prefix}_{name}{{priority="{priority}"}} {metrics[key]:.6g}'
+                    )
+        return "\n".join(lines) + "\n"
+
+
+def _labels(endpoint: str) -> str:
+    method, path = endpoint.split(" ", 1)
+    return f'method="{method}",endpoint="{path}"'
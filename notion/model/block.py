@@ -1,17 +1,85 @@
-from typing import List, Optional, Union
+import csv
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Type, Union
 
 from notion.model.common.notion_object_base import NotionObjectBase
 from notion.model.common.utils import UUIDv4
 
+# ---------------------------------------------------------------------------
+# Block Type Registry
+# ---------------------------------------------------------------------------
+
+# Maps Notion block type names (e.g. `"paragraph"`) to their `Block` subclass.
+BLOCK_TYPES: Dict[str, Type["Block"]] = {}
+
+# Notion accepts at most this many characters per rich text object.
+MAX_TEXT_LENGTH = 2000
+# And at most this many blocks per request.
+MAX_BATCH_SIZE = 100
+
+
+def split_rich_text(rich_text: List[dict], limit: int = MAX_TEXT_LENGTH) -> List[dict]:
+    "Split rich text items whose content is longer than Notion accepts."
+    result = []
+    for item in rich_text:
+        content = item["text"]["content"]
+        if len(content) <= limit:
+            result.append(item)
+            continue
+        for start in range(0, len(content), limit):
+            result.append(
+                {
+                    **item,
+                    "text": {**item["text"], "content": content[start : start + limit]},
+                }
+            )
+    return result
+
+
+def register_block_type(type_name: str, block_class: Optional[Type["Block"]] = None):
+    """Register a `Block` subclass for the given Notion block type name.
+
+    Can be used as a function or as a class decorator:
+
+        @register_block_type("audio")
+        class Audio(Block):
+            ...
+
+    Registering a type name twice replaces the previously registered class.
+    """
+
+    def register(block_class: Type["Block"]) -> Type["Block"]:
+        block_class.type = type_name
+        BLOCK_TYPES[type_name] = block_class
+        return block_class
+
+    if block_class is None:
+        return register
+    return register(block_class)
+
+
 # ---------------------------------------------------------------------------
 # Base Class
 # ---------------------------------------------------------------------------
 
 
 class Block(NotionObjectBase):
+    """Base class of all Notion blocks.
+
+    Subclasses representing a concrete block type pass its name as class keyword, e.g.
+    `class Paragraph(RichText, type_name="paragraph")`, which registers the class and
+    caches the type name as class attribute.
+    """
+
+    def __init_subclass__(cls, type_name: Optional[str] = None, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if type_name is not None:
+            register_block_type(type_name, cls)
+
     @property
     def type(self) -> str:
-        return type_name_from_object(self)
+        "Only used by unregistered classes; registered ones shadow it with a string."
+        return self._data["type"]
 
     @property
     def has_children(self) -> bool:
@@ -35,82 +103,28 @@ class Block(NotionObjectBase):
 
 
 def type_name_from_object(object) -> str:
-    type_name = {
-        ChildPage: "child_page",
-        ChildDatabase: "child_database",
-        Paragraph: "paragraph",
-        HeadingOne: "heading_1",
-        HeadingTwo: "heading_2",
-        HeadingThree: "heading_3",
-        Quote: "quote",
-        Callout: "callout",
-        Code: "code",
-        Divider: "divider",
-        Bookmark: "bookmark",
-        Image: "image",
-        BulletedListItem: "bulleted_list_item",
-        NumberedListItem: "numbered_list_item",
-        ToDo: "to_do",
-        Toggle: "toggle",
-        TableOfContents: "table_of_contents",
-        Breadcrumb: "breadcrumb",
-        Equation: "equation",
-        Video: "video",
-        File: "file",
-        PDF: "pdf",
-        LinkPreview: "link_preview",
-        Embed: "embed",
-        Template: "template",
-        LinkToPage: "link_to_page",
-        SyncedBlock: "synced_block",
-        Column: "column",
-        ColumnList: "column_list",
-        Table: "table",
-        TableRow: "table_row",
-    }.get(type(object))
-    if type_name is None:
-        raise TypeError(f"Block type {str(type(object))!r} is not supported by Notion.")
-    return type_name
-
-
-def block_class_from_type_name(type_name: str) -> Block:
-    type_class = {
-        "child_page": ChildPage,
-        "child_database": ChildDatabase,
-        "paragraph": Paragraph,
-        "heading_1": HeadingOne,
-        "heading_2": HeadingTwo,
-        "heading_3": HeadingThree,
-        "quote": Quote,
-        "callout": Callout,
-        "code": Code,
-        "divider": Divider,
-        "bookmark": Bookmark,
-        "image": Image,
-        "bulleted_list_item": BulletedListItem,
-        "numbered_list_item": NumberedListItem,
-        "to_do": ToDo,
-        "toggle": Toggle,
-        "table_of_contents": TableOfContents,
-        "breadcrumb": Breadcrumb,
-        "equation": Equation,
-        "video": Video,
-        "file": File,
-        "pdf": PDF,
-        "link_preview": LinkPreview,
-        "embed": Embed,
-        "template": Template,
-        "link_to_page": LinkToPage,
-        "synced_block": SyncedBlock,
-        "column": Column,
-        "column_list": ColumnList,
-        "table": Table,
-        "table_row": TableRow,
-    }.get(type_name)
-
-    if type_class is None:
-        raise TypeError(f"Block type {type_name!r} does not exist.")
-    return type_class
+    type_name = getattr(type(object), "type", None)
+    if isinstance(type_name, str):
+        return type_name
+    if isinstance(object, GenericBlock):
+        return object._data["type"]
+    raise TypeError(f"Block type {str(type(object))!r} is not supported by Notion.")
+
+
+def block_class_from_type_name(type_name: str) -> Type[Block]:
+    "Get the `Block` subclass for a type name, falling back to `GenericBlock`."
+    return BLOCK_TYPES.get(type_name, GenericBlock)
+
+
+def block_from_json(data: dict, client=None, trusted: bool = False) -> Block:
+    """Create the matching `Block` object for the given block data.
+
+    Pass `trusted=True` for data returned by the Notion API to skip `__init__` and validation.
+    """
+    block_class = block_class_from_type_name(data["type"])
+    if trusted:
+        return block_class._from_trusted_json(data, client)
+    return block_class(client=client, data=data)
 
 
 # ---------------------------------------------------------------------------
@@ -121,41 +135,89 @@ def block_class_from_type_name(type_name: str) -> Block:
 class ChildrenMixin:
     @property
     def children(self) -> list:
-        return [
-            block_class_from_type_name(data["type"])(client=self._client, data=data)
-            for data in self._client.retrieve_block_children(self.id)["results"]
-        ]
+        return list(self.iter_children())
+
+    def iter_children(self, page_size: Optional[int] = None) -> Iterator[Block]:
+        "Yield the children one by one, loading a page of them at a time."
+        trusted = not self._client.strict
+        for data in self._client.iter_block_children(self.id, page_size):
+            yield block_from_json(data, self._client, trusted)
+
+    def reconcile(self, desired_blocks: List[Union[Block, dict]]):
+        """Update the children to `desired_blocks` with as few writes as possible.
+
+        Unchanged blocks are left alone. See `notion.reconcile` for details.
+        """
+        from notion.reconcile import reconcile
+
+        return reconcile(self._client, self.id, desired_blocks)
+
+    def _validate_children(self, children: list):
+        "Raise a `TypeError` for children this block can't hold."
+
+    def _create_blocks(self, blocks: List[Block], after: Optional[str]) -> List[dict]:
+        "Create blocks in order, in batches as large as the API allows."
+        created = []
+        for start in range(0, len(blocks), MAX_BATCH_SIZE):
+            batch = blocks[start : start + MAX_BATCH_SIZE]
+            results = self._client.append_block_children(
+                self.id, [child.to_json() for child in batch], after
+            )["results"]
+            for child, new_block in zip(batch, results):
+                child._data = new_block
+                child._client = self._client
+            created.extend(results)
+            if after:
+                after = results[-1]["id"]
+        return created
 
     def append_children(self, children: Union[dict, List[dict]]) -> List[dict]:
         """Append blocks or pages to a parent.
 
-        TODO: Instead of appending items one by one, batch blocks to be more efficient.
+        Consecutive blocks are sent in batches of up to 100 per request.
         """
         if not isinstance(children, list):
             children = [children]
-
-        res = []
+        self._validate_children(children)
         for child in children:
             object_name = child._data["object"]
-            if object_name == "block":
-                append_results = self._client.append_block_children(
-                    self.id, [child.to_json()]
+            if object_name not in ("block", "page"):
+                raise TypeError(
+                    f"Appending objects of type {object_name} is not supported."
                 )
-                new_block = append_results["results"][0]
-                child._data = new_block
-                child._client = self._client
-                res.append(new_block)
-            elif object_name == "page":
+
+        res = []
+        blocks = []
+        for child in children + [None]:
+            if child is not None and child._data["object"] == "block":
+                blocks.append(child)
+                continue
+            if blocks:
+                res.extend(self._create_blocks(blocks, None))
+                blocks = []
+            if child is not None:
                 # TODO Also support database_id
                 child._data["parent"] = {"type": "page_id", "page_id": self.id}
                 res.append(self._client.create_page(child._data))
-            else:
-                raise TypeError(
-                    f"Appending objects of type {object_name} is not supported."
-                )
 
         return res
 
+    def insert_after(
+        self, block: Union[Block, str], new_children: Union[Block, List[Block]]
+    ) -> List[dict]:
+        """Insert blocks after the child `block` (or its ID) instead of at the end.
+
+        All new blocks are sent in a single request, or in batches of up to 100 following
+        each other.
+        """
+        if not isinstance(new_children, list):
+            new_children = [new_children]
+        self._validate_children(new_children)
+        if not all(child._data["object"] == "block" for child in new_children):
+            raise TypeError("Only blocks can be inserted at a position.")
+        after = block if isinstance(block, str) else block.id
+        return self._create_blocks(new_children, after)
+
     def delete(self):
         # Apparently all children must be deleted first, before the block itself can be deleted.
         for child in self.children:
@@ -271,7 +333,7 @@ class Child(Block):
         return full_page.parent
 
 
-class ChildPage(Child):
+class ChildPage(Child, type_name="child_page"):
     """A page contained in another page.
 
     From the Notion docs (https://developers.notion.com/docs/working-with-page-content#modeling-content-as-blocks):
@@ -288,7 +350,7 @@ class ChildPage(Child):
         self._data["archived"] = deletion_result["archived"]
 
 
-class ChildDatabase(Child):
+class ChildDatabase(Child, type_name="child_database"):
     "A database contained in another page."
 
     def delete(self):
@@ -312,32 +374,32 @@ class RichText(Block, RichTextMixin):
         super().__init__(data, client)
 
 
-class Paragraph(RichText):
+class Paragraph(RichText, type_name="paragraph"):
     def __init__(self, text: str = None, data=None, client=None) -> None:
         super().__init__(text, data, client)
 
 
-class HeadingOne(RichText):
+class HeadingOne(RichText, type_name="heading_1"):
     def __init__(self, text: str = None, data=None, client=None) -> None:
         super().__init__(text, data, client)
 
 
-class HeadingTwo(RichText):
+class HeadingTwo(RichText, type_name="heading_2"):
     def __init__(self, text: str = None, data=None, client=None) -> None:
         super().__init__(text, data, client)
 
 
-class HeadingThree(RichText):
+class HeadingThree(RichText, type_name="heading_3"):
     def __init__(self, text: str = None, data=None, client=None) -> None:
         super().__init__(text, data, client)
 
 
-class Quote(RichText):
+class Quote(RichText, type_name="quote"):
     def __init__(self, text: str = None, data=None, client=None) -> None:
         super().__init__(text, data, client)
 
 
-class Callout(RichText, IconMixin, ChildrenMixin, ColorMixin):
+class Callout(RichText, IconMixin, ChildrenMixin, ColorMixin, type_name="callout"):
     """A Notion Callout block.
 
     See docs: https://developers.notion.com/reference/block#callout-blocks
@@ -443,7 +505,7 @@ CODE_BLOCK_LANGUAGES = [
 ]
 
 
-class Code(RichText, CaptionMixin):
+class Code(RichText, CaptionMixin, type_name="code"):
     """A Notion Code block.
 
     See docs: https://developers.notion.com/reference/block#code-blocks
@@ -496,7 +558,7 @@ class Code(RichText, CaptionMixin):
         self._data = new_data
 
 
-class Divider(Block):
+class Divider(Block, type_name="divider"):
     def __init__(self, data: dict = None, client=None):
         if not data:
             data = {
@@ -508,7 +570,7 @@ class Divider(Block):
         super().__init__(data=data, client=client)
 
 
-class Bookmark(Block, UrlMixin, CaptionMixin):
+class Bookmark(Block, UrlMixin, CaptionMixin, type_name="bookmark"):
     def __init__(
         self, url: str = None, caption: str = None, data: dict = None, client=None
     ):
@@ -523,7 +585,7 @@ class Bookmark(Block, UrlMixin, CaptionMixin):
         super().__init__(data=data, client=client)
 
 
-class Image(Block, ExternalFileMixin):
+class Image(Block, ExternalFileMixin, type_name="image"):
     """A Notion Image block.
 
     See docs: https://developers.notion.com/reference/block#image-blocks
@@ -540,7 +602,9 @@ class Image(Block, ExternalFileMixin):
         super().__init__(data=data, client=client)
 
 
-class BulletedListItem(Block, RichTextMixin, ColorMixin, ChildrenMixin):
+class BulletedListItem(
+    Block, RichTextMixin, ColorMixin, ChildrenMixin, type_name="bulleted_list_item"
+):
     """A Notion BulletedListItem block.
 
     See docs: https://developers.notion.com/reference/block#bulleted-list-item-blocks
@@ -562,7 +626,9 @@ class BulletedListItem(Block, RichTextMixin, ColorMixin, ChildrenMixin):
         super().__init__(data=data, client=client)
 
 
-class NumberedListItem(Block, RichTextMixin, ColorMixin, ChildrenMixin):
+class NumberedListItem(
+    Block, RichTextMixin, ColorMixin, ChildrenMixin, type_name="numbered_list_item"
+):
     """A Notion NumberedListItem block.
 
     See docs: https://developers.notion.com/reference/block#numbered-list-item-blocks
@@ -584,7 +650,7 @@ class NumberedListItem(Block, RichTextMixin, ColorMixin, ChildrenMixin):
         super().__init__(data=data, client=client)
 
 
-class ToDo(Block, RichTextMixin, ColorMixin, ChildrenMixin):
+class ToDo(Block, RichTextMixin, ColorMixin, ChildrenMixin, type_name="to_do"):
     """A Notion ToDo block.
 
     See docs: https://developers.notion.com/reference/block#to-do-blocks
@@ -655,7 +721,7 @@ class ToDo(Block, RichTextMixin, ColorMixin, ChildrenMixin):
                 child.uncheck_all()
 
 
-class Toggle(Block, RichTextMixin, ColorMixin, ChildrenMixin):
+class Toggle(Block, RichTextMixin, ColorMixin, ChildrenMixin, type_name="toggle"):
     """A Notion Toggle block.
 
     See docs: https://developers.notion.com/reference/block#toggle-blocks
@@ -681,7 +747,7 @@ class Toggle(Block, RichTextMixin, ColorMixin, ChildrenMixin):
         super().__init__(data=data, client=client)
 
 
-class TableOfContents(Block, ColorMixin):
+class TableOfContents(Block, ColorMixin, type_name="table_of_contents"):
 
     """A Notion Table Of Contents block.
 
@@ -706,7 +772,7 @@ class TableOfContents(Block, ColorMixin):
         super().__init__(data=data, client=client)
 
 
-class Breadcrumb(Block):
+class Breadcrumb(Block, type_name="breadcrumb"):
 
     """A Notion Breadcrumb block.
 
@@ -728,7 +794,7 @@ class Breadcrumb(Block):
         super().__init__(data=data, client=client)
 
 
-class Equation(Block):
+class Equation(Block, type_name="equation"):
     """A Notion Equation block.
 
     See docs: https://developers.notion.com/reference/block#equation-blocks
@@ -761,7 +827,7 @@ class Equation(Block):
         self._data = new_data
 
 
-class Video(Block, ExternalFileMixin):
+class Video(Block, ExternalFileMixin, type_name="video"):
     """A Notion Video block.
 
     See docs: https://developers.notion.com/reference/block#video-blocks
@@ -778,7 +844,7 @@ class Video(Block, ExternalFileMixin):
         super().__init__(data=data, client=client)
 
 
-class File(Block, ExternalFileMixin, CaptionMixin):
+class File(Block, ExternalFileMixin, CaptionMixin, type_name="file"):
     """A Notion File block.
 
     See docs: https://developers.notion.com/reference/block#file-blocks
@@ -798,7 +864,7 @@ class File(Block, ExternalFileMixin, CaptionMixin):
         super().__init__(data=data, client=client)
 
 
-class PDF(Block, ExternalFileMixin):
+class PDF(Block, ExternalFileMixin, type_name="pdf"):
     """A Notion PDF block.
 
     See docs: https://developers.notion.com/reference/block#pdf-blocks
@@ -815,7 +881,7 @@ class PDF(Block, ExternalFileMixin):
         super().__init__(data=data, client=client)
 
 
-class LinkPreview(Block, UrlMixin):
+class LinkPreview(Block, UrlMixin, type_name="link_preview"):
     """A Notion LinkPreview block.
 
     NOTE: The link_preview block will only be returned as part of a response. It cannot be created via the API.
@@ -832,7 +898,7 @@ class LinkPreview(Block, UrlMixin):
         )
 
 
-class Embed(Block, UrlMixin):
+class Embed(Block, UrlMixin, type_name="embed"):
     """A Notion Embed block.
 
     See docs: https://developers.notion.com/reference/block#embed-blocks
@@ -849,7 +915,7 @@ class Embed(Block, UrlMixin):
         super().__init__(data=data, client=client)
 
 
-class Template(Block, RichTextMixin, ChildrenMixin):
+class Template(Block, RichTextMixin, ChildrenMixin, type_name="template"):
     """A Notion Template block.
 
     See docs: https://developers.notion.com/reference/block#template-blocks
@@ -868,7 +934,7 @@ class Template(Block, RichTextMixin, ChildrenMixin):
         super().__init__(data=data, client=client)
 
 
-class LinkToPage(Block):
+class LinkToPage(Block, type_name="link_to_page"):
     """A Notion LinkToPage block.
 
     NOTE: Once created, the `page_id` and `database_id` parameters are currently read-only.
@@ -912,7 +978,7 @@ class LinkToPage(Block):
         return self._data[self.type].get("database_id")
 
 
-class SyncedBlock(Block, ChildrenMixin):
+class SyncedBlock(Block, ChildrenMixin, type_name="synced_block"):
     """A Notion SyncedBlock block.
 
     Similar to the UI, there are two versions of a SyncedBlock:
@@ -949,13 +1015,12 @@ class SyncedBlock(Block, ChildrenMixin):
         else:
             return None
 
-    def append_children(self, children: Union[dict, List[dict]]):
+    def _validate_children(self, children: list):
         if self.synced_from is not None:
             raise TypeError("Only Original SyncedBlocks can hold children.")
-        return super().append_children(children)
 
 
-class Column(Block, ChildrenMixin):
+class Column(Block, ChildrenMixin, type_name="column"):
     """A Notion Column block.
 
     See docs: https://developers.notion.com/reference/block#column-list-and-column-blocks
@@ -977,7 +1042,7 @@ class Column(Block, ChildrenMixin):
         super().__init__(data=data, client=client)
 
 
-class ColumnList(Block, ChildrenMixin):
+class ColumnList(Block, ChildrenMixin, type_name="column_list"):
     """A Notion ColumnList block.
 
     See docs: https://developers.notion.com/reference/block#column-list-and-column-blocks
@@ -998,16 +1063,27 @@ class ColumnList(Block, ChildrenMixin):
             }
         super().__init__(data=data, client=client)
 
-    def append_children(self, children: Union[dict, List[dict]]):
+    def _validate_children(self, children: list):
         if not all(isinstance(child, Column) for child in children):
             raise TypeError("ColumnLists can only have Column objects as children.")
-        return super().append_children(children)
 
     def __getitem__(self, index: int) -> Column:
         return self.children[index]
 
 
-class TableRow(Block):
+def _cell_rich_text(text: str) -> List[dict]:
+    return split_rich_text([{"type": "text", "text": {"content": str(text)}}])
+
+
+def _fit_row(row: Sequence, width: int) -> list:
+    "Pad a row with empty cells to the width of its table."
+    row = list(row)
+    if len(row) > width:
+        raise ValueError(f"Row {row!r} has more than {width} cells.")
+    return row + [""] * (width - len(row))
+
+
+class TableRow(Block, type_name="table_row"):
     """A Notion TableRow block.
 
     See docs: https://developers.notion.com/reference/block#table-row-blocks
@@ -1024,21 +1100,22 @@ class TableRow(Block):
             data = {
                 "object": "block",
                 "type": self.type,
-                self.type: {
-                    "cells": [
-                        [{"type": "text", "text": {"content": cell_text}}]
-                        for cell_text in cells
-                    ]
-                },
+                self.type: {"cells": [_cell_rich_text(text) for text in cells]},
             }
         super().__init__(data=data, client=client)
 
     @property
     def cells(self) -> List[str]:
-        return [c[0]["text"]["content"] for c in self._data[self.type]["cells"]]
+        return [
+            "".join(
+                item.get("plain_text") or item.get("text", {}).get("content", "")
+                for item in cell
+            )
+            for cell in self._data[self.type]["cells"]
+        ]
 
 
-class Table(Block, ChildrenMixin):
+class Table(Block, ChildrenMixin, type_name="table"):
     """A Notion Table block.
 
     See docs: https://developers.notion.com/reference/block#table-blocks
@@ -1074,3 +1151,86 @@ class Table(Block, ChildrenMixin):
     @property
     def cells(self) -> List[List[str]]:
         return [row.cells for row in self.rows]
+
+    def iter_rows(self, page_size: Optional[int] = None) -> Iterator[TableRow]:
+        "Yield the rows one by one, loading a page of them at a time."
+        return self.iter_children(page_size)
+
+    def iter_cells(self, page_size: Optional[int] = None) -> Iterator[List[str]]:
+        "Yield the cells of each row, loading a page of rows at a time."
+        for row in self.iter_rows(page_size):
+            yield row.cells
+
+    def append_rows(self, rows: Iterable[Sequence]) -> int:
+        """Append rows of cell values, sending them in batches as large as the API allows.
+
+        `rows` is consumed lazily, e.g. from a `csv.reader` or a generator. Returns the
+        number of rows appended.
+        """
+        width = self._data[self.type]["table_width"]
+        rows = iter(rows)
+        count = 0
+        while True:
+            batch = [
+                TableRow(_fit_row(row, width)).to_json()
+                for row in islice(rows, MAX_BATCH_SIZE)
+            ]
+            if not batch:
+                return count
+            self._client.append_block_children(self.id, batch)
+            count += len(batch)
+
+    @staticmethod
+    def load(
+        parent,
+        rows: Iterable[Sequence],
+        has_column_header: bool = False,
+        has_row_header: bool = False,
+    ) -> "Table":
+        """Create a table at the end of `parent` (a page or block) and fill it with `rows`.
+
+        The first row determines the width of the table. All rows are read and checked
+        before the table is created, so a row that is too wide raises `ValueError` without
+        leaving a partial table behind. The table is created with the first batch of rows
+        and the rest is appended in further batches, see `append_rows()`.
+        """
+        rows = list(rows)
+        if not rows:
+            raise ValueError("A table needs at least one row.")
+        width = len(rows[0])
+        rows = [_fit_row(row, width) for row in rows]
+        table = Table(
+            table_width=width,
+            has_column_header=has_column_header,
+            has_row_header=has_row_header,
+            children=[TableRow(row) for row in rows[:MAX_BATCH_SIZE]],
+        )
+        response = parent._client.append_block_children(parent.id, [table.to_json()])
+        data = response["results"][0]
+        table = block_from_json(data, parent._client, trusted=not parent._client.strict)
+        table.append_rows(rows[MAX_BATCH_SIZE:])
+        return table
+
+    @staticmethod
+    def load_csv(parent, file, has_column_header: bool = True, **reader_kwargs):
+        "Create a table from a CSV file object, see `load()`."
+        return Table.load(
+            parent,
+            csv.reader(file, **reader_kwargs),
+            has_column_header=has_column_header,
+        )
+
+
+class GenericBlock(Block, ChildrenMixin):
+    """Fallback for block types that have no dedicated class (yet).
+
+    Gives access to the common block properties and children, while the type-specific
+    content is available as raw JSON through `content`.
+    """
+
+    def __init__(self, data: dict = None, client=None):
+        super().__init__(data=data, client=client)
+
+    @property
+    def content(self) -> dict:
+        return self._data[self.type]
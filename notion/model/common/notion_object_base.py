@@ -6,10 +6,25 @@ from notion.model.common.utils import parse_notion_datetime
 
 
 class NotionObjectBase:
+    # Set for objects decoded from Notion API responses, whose data needs no validation.
+    _trusted = False
+
     def __init__(self, data=None, client=None):
         self._data = data
         self._client = client
 
+    @classmethod
+    def _from_trusted_json(cls, data: dict, client=None) -> "NotionObjectBase":
+        """Create an object from data returned by the Notion API.
+
+        Skips `__init__` and all validation, since server-originated data is valid by definition.
+        """
+        new_object = cls.__new__(cls)
+        new_object._data = data
+        new_object._client = client
+        new_object._trusted = True
+        return new_object
+
     def with_client(self, client) -> "NotionObjectBase":
         self._client = client
         return self
@@ -28,7 +43,7 @@ class NotionObjectBase:
 
     @property
     def parent(self) -> Parent:
-        return Parent.from_json(self._data)
+        return Parent.from_json(self._data, trusted=self._trusted)
 
     @parent.setter
     def parent(self, new_parent: Union[ParentPage, str]):
@@ -22,13 +22,26 @@ class Parent:
 
     def from_json(
         data: dict,
+        trusted: bool = False,
     ) -> Union["ParentWorkspace", "ParentPage", "ParentDatabase", None]:
+        """Create the parent object of the given object data.
+
+        If `trusted` is set, e.g. for data returned by the Notion API, the parent is built
+        without validating its ID.
+        """
         if "parent" not in data:
             return None
 
         type_ = data["parent"]["type"]
         id_ = data["parent"][type_]
 
+        if trusted:
+            parent_class = PARENT_CLASSES.get(type_, Parent)
+            parent = parent_class.__new__(parent_class)
+            parent.type = type_
+            parent.id = id_ if type_ == "workspace" else UUIDv4.trusted(id_)
+            return parent
+
         if type_ == "workspace":
             return ParentWorkspace()
         elif type_ == "page_id":
@@ -56,3 +69,10 @@ class ParentPage(Parent):
 class ParentDatabase(Parent):
     def __init__(self, id_):
         super().__init__("database_id", id_)
+
+
+PARENT_CLASSES = {
+    "workspace": ParentWorkspace,
+    "page_id": ParentPage,
+    "database_id": ParentDatabase,
+}
@@ -1,10 +1,15 @@
 import re
 from datetime import datetime
+from typing import Any, List
+
+
+NOTION_ID_REGEX = re.compile(
+    r"^[0-9a-z]{8}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{12}$"
+)
 
 
 def is_valid_notion_id(id_str: str) -> bool:
-    id_regex = r"^[0-9a-z]{8}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{12}$"
-    match = re.search(id_regex, id_str)
+    match = NOTION_ID_REGEX.search(id_str)
     return bool(match)
 
 
@@ -13,6 +18,50 @@ def parse_notion_datetime(datetime_str: str) -> datetime:
     return datetime.strptime(datetime_str, "%Y-%m-%dT%H:%M:%S.%f%z")
 
 
+# Property types whose value is rich text.
+RICH_TEXT_TYPES = ("title", "rich_text")
+
+
+def text_runs(rich_text: List[dict]) -> list:
+    "Rich text as comparable runs of content with annotations and link."
+    runs = []
+    for item in rich_text or []:
+        text = item.get("text") or {}
+        content = item.get("plain_text")
+        if content is None:
+            content = text.get("content", "")
+        link = text.get("link") or item.get("href")
+        if isinstance(link, dict):
+            link = link.get("url")
+        annotations = sorted(
+            key
+            for key, value in (item.get("annotations") or {}).items()
+            if value and value != "default"
+        )
+        if runs and runs[-1][1:] == [annotations, link]:
+            runs[-1][0] += content
+        elif content:
+            runs.append([content, annotations, link])
+    return runs
+
+
+def comparable(type_: str, value: Any) -> Any:
+    "A property value, as the API returns or takes it, in the form values are compared in."
+    if type_ in RICH_TEXT_TYPES:
+        return text_runs(value)
+    if type_ in ("select", "status"):
+        return value["name"] if value else None
+    if type_ == "multi_select":
+        return [option["name"] for option in value or []]
+    if type_ in ("people", "relation"):
+        return sorted(item["id"] for item in value or [])
+    if type_ == "date":
+        return [value.get("start"), value.get("end")] if value else None
+    if type_ == "files":
+        return [item.get("name") for item in value or []]
+    return value
+
+
 class UUIDv4(str):
     def __new__(cls, value):
         if not is_valid_notion_id(value):
@@ -20,6 +69,11 @@ class UUIDv4(str):
 
         return str.__new__(cls, value)
 
+    @classmethod
+    def trusted(cls, value: str) -> "UUIDv4":
+        "Create a `UUIDv4` without validation, e.g. for IDs returned by the Notion API."
+        return str.__new__(cls, value)
+
 
 def class_name_as_snake_case(class_: object) -> str:
     """Returns the class name of an object as a snake case string.
@@ -1,4 +1,4 @@
-from typing import Any, Dict, List, Optional, Union
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Union
 
 import notion.model.databases.properties as props
 from notion.model.common.notion_object_base import NotionObjectBase
@@ -7,6 +7,9 @@ from notion.model.databases.properties import Cover, Icon, Title
 from notion.model.filters import Filter
 from notion.model.page import Page
 
+if TYPE_CHECKING:
+    from notion.upsert import KeyIndex, UpsertResult
+
 
 def foo_bar(property_class):
     if isinstance(property_class, type):
@@ -95,6 +98,33 @@ class Database(NotionObjectBase):
             )
         return self._client.query_database(self.id, filter_, sort)
 
+    def upsert_many(
+        self,
+        rows: Iterable[dict],
+        key: str = "External ID",
+        index: Optional["KeyIndex"] = None,
+    ) -> "UpsertResult":
+        """Create or update rows identified by the value of the `key` property.
+
+        Only rows that are new or whose properties changed are written, see
+        `notion.upsert`. Pass a `KeyIndex` to keep it between calls and only read the rows
+        edited in the meantime.
+        """
+        from notion.upsert import upsert_many
+
+        if not self._client:
+            raise Exception(
+                "Database has not been created. Run `your_database.create(...)` first."
+            )
+        return upsert_many(
+            self._client,
+            self.id,
+            rows,
+            key=key,
+            index=index,
+            schema=self._data.get("properties"),
+        )
+
     def delete(self):
         if self._client is None:
             raise Exception(
@@ -0,0 +1,171 @@
+"""Request accounting to find wasted requests, used through `NotionClient.profile()`:
+
+    with client.profile() as profile:
+        for child in page.children:
+            print(child.parent)
+    print(profile.summary())
+
+Every request is attributed to the model method that triggered it (e.g. `ChildPage.parent`)
+and the call site in user code. The profile flags repeated identical `GET` requests and
+N+1 patterns, i.e. loops issuing one request per item from the same call site.
+"""
+import logging
+import os
+import sys
+import threading
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from notion.hooks import RequestEvent
+
+logger = logging.getLogger(__name__)
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_DIR = os.path.join(PACKAGE_DIR, "model")
+CLIENT_FILE = os.path.join(PACKAGE_DIR, "client.py")
+
+
+@dataclass
+class ProfiledRequest:
+    method: str
+    url: str
+    endpoint: str
+    operation: str
+    call_site: str
+    attempts: int = 1
+    status: Optional[int] = None
+    elapsed: float = 0.0
+
+
+def find_origin() -> Tuple[str, str]:
+    """Find the operation and call site that caused the current request.
+
+    The operation is the outermost model method on the stack (e.g. `ToDo.check_all`) or, for
+    direct client calls, the outermost public `NotionClient` method. The call site is the
+    innermost frame outside of this package.
+    """
+    operation = None
+    model_operation = False
+    call_site = "<unknown>"
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        function = frame.f_code.co_name
+        if filename.startswith(MODEL_DIR):
+            instance = frame.f_locals.get("self")
+            owner = type(instance).__name__ if instance is not None else None
+            operation = f"{owner}.{function}" if owner else function
+            model_operation = True
+        elif filename == CLIENT_FILE:
+            if not model_operation and not function.startswith("_"):
+                operation = f"NotionClient.{function}"
+        elif not filename.startswith(PACKAGE_DIR):
+            call_site = f"{frame.f_code.co_filename}:{frame.f_lineno} in {function}"
+            break
+        frame = frame.f_back
+    return operation or "<unknown>", call_site
+
+
+class RequestProfile:
+    """Requests made during a `NotionClient.profile()` block, grouped by their origin.
+
+    Params:
+        n_plus_one_threshold (optional): Minimum number of requests to the same endpoint from
+                                         the same operation and call site to report an N+1.
+    """
+
+    def __init__(self, n_plus_one_threshold: int = 5):
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.requests: List[ProfiledRequest] = []
+        self._pending = threading.local()
+        self._lock = threading.Lock()
+
+    def _on_before_request(self, event: RequestEvent):
+        pending = getattr(self._pending, "request", None)
+        # A retry of a request that started before profiling is recorded as a new request.
+        if event.attempt > 0 and pending is not None and pending.url == event.url:
+            pending.attempts += 1
+            return
+        operation, call_site = find_origin()
+        request = ProfiledRequest(
+            event.method, event.url, event.endpoint, operation, call_site
+        )
+        self._pending.request = request
+        with self._lock:
+            self.requests.append(request)
+
+    def _on_after_response(self, event: RequestEvent):
+        request = getattr(self._pending, "request", None)
+        if request is not None:
+            request.status = event.status
+            request.elapsed += event.elapsed
+
+    def by_operation(self) -> Dict[Tuple[str, str], List[ProfiledRequest]]:
+        "Group all requests by the operation and call site that triggered them."
+        groups = defaultdict(list)
+        for request in self.requests:
+            groups[(request.operation, request.call_site)].append(request)
+        return dict(groups)
+
+    def repeated_requests(self) -> List[Tuple[str, int]]:
+        "Identical `GET` requests that were sent more than once, with their count."
+        counts = Counter(r.url for r in self.requests if r.method == "GET")
+        return [(url, count) for url, count in counts.most_common() if count > 1]
+
+    def n_plus_one(self) -> List[Tuple[str, str, str, int]]:
+        """Find N+1 patterns: many requests to one endpoint for different objects.
+
+        Returns `(operation, call_site, endpoint, count)` tuples.
+        """
+        findings = []
+        for (operation, call_site), requests in self.by_operation().items():
+            by_endpoint = defaultdict(set)
+            counts = Counter()
+            for request in requests:
+                key = f"{request.method} {request.endpoint}"
+                by_endpoint[key].add(request.url)
+                counts[key] += 1
+            for endpoint, urls in by_endpoint.items():
+                if len(urls) >= self.n_plus_one_threshold:
+                    findings.append((operation, call_site, endpoint, counts[endpoint]))
+        return sorted(findings, key=lambda finding: -finding[3])
+
+    @property
+    def total_time(self) -> float:
+        return sum(request.elapsed for request in self.requests)
+
+    def summary(self) -> str:
+        "A human-readable report of all requests and detected problems."
+        lines = [
+            f"{len(self.requests)} requests in {self.total_time:.3f}s "
+            f"({sum(r.attempts - 1 for r in self.requests)} retries)"
+        ]
+        groups = sorted(self.by_operation().items(), key=lambda item: -len(item[1]))
+        for (operation, call_site), requests in groups:
+            elapsed = sum(request.elapsed for request in requests)
+            lines.append(
+                f"  {len(requests):>5}  {elapsed:8.3f}s  {operation}  ({call_site})"
+            )
+
+        repeated = self.repeated_requests()
+        if repeated:
+            lines.append("Repeated identical GET requests:")
+            lines.extend(f"  {count:>5}x  {url}" for url, count in repeated)
+        n_plus_one = self.n_plus_one()
+        if n_plus_one:
+            lines.append("Possible N+1 request patterns:")
+            lines.extend(
+                f"  {count:>5}x  {endpoint} from {operation}  ({call_site})"
+                for operation, call_site, endpoint, count in n_plus_one
+            )
+        return "\n".join(lines)
+
+    def log(self):
+        "Log the summary, as a warning if repeated requests or N+1 patterns were found."
+        level = (
+            logging.WARNING
+            if self.repeated_requests() or self.n_plus_one()
+            else logging.INFO
+        )
+        logger.log(level, "Notion request profile:\n%s", self.summary())
@@ -0,0 +1,69 @@
+"""Client-side rate limiting, to stay below the request rate allowed by the Notion API.
+
+Notion allows an average of three requests per second per integration, with short bursts.
+"""
+import math
+import threading
+import time
+from typing import Optional
+
+DEFAULT_RATE_LIMIT = 3.0
+
+
+class RateLimiter:
+    """Token bucket allowing `rate` requests per second with bursts of up to `burst` requests.
+
+    Requests reserve a slot with `reserve()` and then wait for the returned number of seconds,
+    so concurrent callers are spaced out instead of racing for the next free slot.
+
+    Params:
+        rate (optional): Sustained requests per second.
+        burst (optional): Bucket size. Defaults to `rate`, rounded up.
+    """
+
+    def __init__(self, rate: float = DEFAULT_RATE_LIMIT, burst: Optional[int] = None):
+        self.rate = rate
+        self.capacity = burst or max(1, int(math.ceil(rate)))
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self) -> float:
+        "Seconds until a request could be sent, without reserving it."
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            wait = max(0.0, (1 - self.tokens) / self.rate)
+            return max(wait, self.paused_until - now)
+
+    def available(self) -> float:
+        "Number of requests that could be sent right away."
+        with self._lock:
+            self._refill(time.monotonic())
+            return max(0.0, self.tokens)
+
+    def reserve(self) -> float:
+        "Reserve a request slot. Returns the seconds to wait before sending the request."
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1
+            wait = max(0.0, -self.tokens / self.rate)
+            return max(wait, self.paused_until - now)
+
+    def acquire(self) -> float:
+        "Block until a request may be sent. Returns the seconds waited."
+        wait = self.reserve()
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    def pause(self, seconds: float):
+        "Hold back all requests for `seconds`, e.g. after the API answered with a 429."
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
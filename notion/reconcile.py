@@ -0,0 +1,267 @@
+"""Update the content of a page or block to a desired block tree with as few writes as possible.
+
+    page.reconcile([HeadingOne("Report"), Paragraph(f"Updated {today}"), table])
+
+The current children are diffed against the desired ones by type, content and position:
+
+- Blocks equal to a desired block (a longest common subsequence) are left alone, so their
+  IDs, comments and anything else attached to them survive.
+- Remaining blocks between them are updated in place if a desired block of the same type is
+  at the corresponding position.
+- Other desired blocks are inserted at their position, using the `after` parameter of the
+  API, with consecutive ones in a single request.
+- Other current blocks are archived.
+
+The children of kept and updated blocks are reconciled the same way. Content fields the
+desired block doesn't set, e.g. `color`, are not compared. Child pages and databases are
+not touched. Since the API can only insert after an existing block, a kept block that new
+blocks have to be inserted in front of at the start of the list is created again.
+"""
+import json
+from dataclasses import dataclass
+from typing import List, Sequence
+
+from notion.markdown import PAGE_TYPES, MarkdownImporter
+from notion.model.common.utils import text_runs
+
+KEEP = "keep"
+UPDATE = "update"
+INSERT = "insert"
+ARCHIVE = "archive"
+
+
+@dataclass
+class ReconcileResult:
+    "Number of blocks per action taken, and the number of write requests sent."
+
+    kept: int = 0
+    updated: int = 0
+    inserted: int = 0
+    archived: int = 0
+    writes: int = 0
+
+    def add(self, other: "ReconcileResult"):
+        self.kept += other.kept
+        self.updated += other.updated
+        self.inserted += other.inserted
+        self.archived += other.archived
+        self.writes += other.writes
+
+
+# ---------------------------------------------------------------------------
+# Comparison
+# ---------------------------------------------------------------------------
+
+
+def _comparable(content: dict) -> dict:
+    result = {}
+    for key, value in content.items():
+        if key == "children":
+            continue
+        if key in ("rich_text", "caption"):
+            value = text_runs(value)
+        elif key == "cells":
+            value = [text_runs(cell) for cell in value]
+        result[key] = value
+    return result
+
+
+class _Block:
+    "A current or desired block with what's needed to compare it."
+
+    def __init__(self, data: dict):
+        self.data = data
+        self.type = data["type"]
+        self.content = data.get(self.type) or {}
+        self.comparable = {
+            key: json.dumps(value, sort_keys=True)
+            for key, value in _comparable(self.content).items()
+        }
+
+    @property
+    def id(self) -> str:
+        return self.data["id"]
+
+    def children(self) -> list:
+        return self.content.get("children") or []
+
+    def matches(self, current: "_Block") -> bool:
+        "Whether a desired block equals a current one in the fields it sets."
+        return self.type == current.type and all(
+            current.comparable.get(key) == value
+            for key, value in self.comparable.items()
+        )
+
+    def can_update(self, current: "_Block") -> bool:
+        if self.type != current.type:
+            return False
+        # The width of a table can't be changed.
+        return self.type != "table" or self.content.get(
+            "table_width"
+        ) == current.content.get("table_width")
+
+
+def _to_json(block) -> dict:
+    return block.to_json() if hasattr(block, "to_json") else block
+
+
+# ---------------------------------------------------------------------------
+# Diff
+# ---------------------------------------------------------------------------
+
+
+def _common_subsequence(current: List[_Block], desired: List[_Block]) -> list:
+    "Index pairs of a longest common subsequence of matching blocks."
+    # Reports mostly change in the middle, so matching ends are paired without the table.
+    start = 0
+    while start < min(len(current), len(desired)) and desired[start].matches(
+        current[start]
+    ):
+        start += 1
+    end = 0
+    while end < min(len(current), len(desired)) - start and desired[-end - 1].matches(
+        current[-end - 1]
+    ):
+        end += 1
+
+    middle_current = current[start : len(current) - end]
+    middle_desired = desired[start : len(desired) - end]
+    n, m = len(middle_current), len(middle_desired)
+    lengths = [[0] * (m + 1) for _ in range(n + 1)]
+    for i in range(n - 1, -1, -1):
+        for j in range(m - 1, -1, -1):
+            if middle_desired[j].matches(middle_current[i]):
+                lengths[i][j] = lengths[i + 1][j + 1] + 1
+            else:
+                lengths[i][j] = max(lengths[i + 1][j], lengths[i][j + 1])
+
+    pairs = [(i, i) for i in range(start)]
+    i = j = 0
+    while i < n and j < m:
+        if middle_desired[j].matches(middle_current[i]):
+            pairs.append((start + i, start + j))
+            i += 1
+            j += 1
+        elif lengths[i + 1][j] >= lengths[i][j + 1]:
+            i += 1
+        else:
+            j += 1
+    pairs.extend((len(current) - end + k, len(desired) - end + k) for k in range(end))
+    return pairs
+
+
+def diff(current: List[_Block], desired: List[_Block]) -> list:
+    """The actions turning `current` into `desired`, as `(action, current, desired)`.
+
+    Actions are ordered by position in both lists.
+    """
+    actions = []
+    previous_i = previous_j = 0
+    for i, j in _common_subsequence(current, desired) + [(len(current), len(desired))]:
+        gap_current = current[previous_i:i]
+        gap_desired = desired[previous_j:j]
+        position = 0
+        for wanted in gap_desired:
+            match = next(
+                (
+                    k
+                    for k in range(position, len(gap_current))
+                    if wanted.can_update(gap_current[k])
+                ),
+                None,
+            )
+            if match is None:
+                actions.append((INSERT, None, wanted))
+                continue
+            actions.extend(
+                (ARCHIVE, block, None) for block in gap_current[position:match]
+            )
+            actions.append((UPDATE, gap_current[match], wanted))
+            position = match + 1
+        actions.extend((ARCHIVE, block, None) for block in gap_current[position:])
+        if i < len(current):
+            actions.append((KEEP, current[i], desired[j]))
+        previous_i, previous_j = i + 1, j + 1
+    return actions
+
+
+# ---------------------------------------------------------------------------
+# Reconciliation
+# ---------------------------------------------------------------------------
+
+
+def reconcile(client, parent_id: str, desired: Sequence) -> ReconcileResult:
+    """Make the children of a page or block equal `desired`, a list of `Block` objects or
+    block data as `append_block_children` takes it.
+    """
+    current = [
+        _Block(data)
+        for data in client.iter_block_children(parent_id)
+        if data["type"] not in PAGE_TYPES
+    ]
+    desired = [_Block(_to_json(block)) for block in desired]
+    desired = [block for block in desired if block.type not in PAGE_TYPES]
+    actions = diff(current, desired)
+
+    # New blocks in front of all others can only be inserted after the first block, which
+    # then has to be created again behind them.
+    first_current = next((k for k, a in enumerate(actions) if a[1] is not None), None)
+    if first_current is not None and any(
+        action == INSERT for action, _, _ in actions[:first_current]
+    ):
+        action, block, wanted = actions[first_current]
+        if action != ARCHIVE:
+            actions[first_current : first_current + 1] = [
+                (ARCHIVE, block, None),
+                (INSERT, None, wanted),
+            ]
+        # The archived block goes first, so the inserts are anchored after it.
+        actions.insert(0, actions.pop(first_current))
+
+    result = ReconcileResult()
+    # Blocks paired for an update may turn out to be equal already.
+    updates = [
+        (block, wanted)
+        for action, block, wanted in actions
+        if action == UPDATE and not wanted.matches(block)
+    ]
+    archives = [block for action, block, _ in actions if action == ARCHIVE]
+
+    def update(item):
+        block, wanted = item
+        content = {k: v for k, v in wanted.content.items() if k != "children"}
+        client.update_block(block.id, {block.type: content})
+
+    client.bulk_map(update, updates)
+    result.updated = len(updates)
+    result.writes += len(updates)
+
+    # Runs of inserts go after the last current block before them.
+    importer = MarkdownImporter(client)
+    anchor = None
+    run = []
+    for action, block, wanted in actions + [(KEEP, None, None)]:
+        if action == INSERT:
+            run.append(wanted.data)
+            continue
+        if run:
+            importer.append_blocks(parent_id, run, anchor)
+            result.inserted += len(run)
+            run = []
+        if block is not None:
+            anchor = block.id
+    result.writes += importer.writes
+
+    client.bulk_map(lambda block: client.delete_block(block.id), archives)
+    result.archived = len(archives)
+    result.writes += len(archives)
+
+    result.kept = sum(action in (KEEP, UPDATE) for action, _, _ in actions) - len(
+        updates
+    )
+    for action, block, wanted in actions:
+        if action in (KEEP, UPDATE) and (
+            wanted.children() or block.data.get("has_children")
+        ):
+            result.add(reconcile(client, block.id, wanted.children()))
+    return result
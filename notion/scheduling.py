@@ -0,0 +1,183 @@
+"""Priority scheduling of the requests of `NotionClient`.
+
+Every request belongs to a priority class, `"interactive"`, `"normal"` (the default) or
+`"bulk"`. Requests waiting for the rate limit are dispatched by weighted fair queuing, so a
+class gets a share of the request rate proportional to its weight while it has requests
+waiting, and a class may be limited to a number of concurrent requests. Interactive lookups
+thus only wait for a few requests, even while a batch job keeps thousands queued, and the
+batch job keeps going at its share of the rate.
+
+The priority applies to all requests made inside a `with` block, including those made by
+model objects:
+
+    with client.priority(BULK):
+        for row in rows:
+            database += Page(row)
+
+It is stored in a context variable, so it does not carry over to newly started threads.
+"""
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Deque, Dict, Optional
+
+from notion.errors import DeadlineExceeded
+from notion.rate_limit import RateLimiter
+
+INTERACTIVE = "interactive"
+NORMAL = "normal"
+BULK = "bulk"
+
+_current_priority: ContextVar[str] = ContextVar("notion_priority", default=NORMAL)
+
+
+def current_priority() -> str:
+    "The priority class of requests made in the current context."
+    return _current_priority.get()
+
+
+@contextmanager
+def priority(priority_class: str):
+    "Make all requests inside the `with` block with the given priority class."
+    reset_token = _current_priority.set(priority_class)
+    try:
+        yield
+    finally:
+        _current_priority.reset(reset_token)
+
+
+class PriorityClass:
+    """Scheduling parameters of a priority class.
+
+    Params:
+        weight: Share of the request rate, relative to the other classes with waiting requests.
+        max_concurrency (optional): Maximum number of requests of the class in flight at once.
+    """
+
+    def __init__(self, weight: float, max_concurrency: Optional[int] = None):
+        self.weight = weight
+        self.max_concurrency = max_concurrency
+
+
+DEFAULT_PRIORITY_CLASSES = {
+    INTERACTIVE: PriorityClass(weight=8),
+    NORMAL: PriorityClass(weight=4),
+    BULK: PriorityClass(weight=1, max_concurrency=4),
+}
+
+
+class _Ticket:
+    __slots__ = ("priority", "start", "finish")
+
+    def __init__(self, priority: str, start: float, finish: float):
+        self.priority = priority
+        self.start = start
+        self.finish = finish
+
+
+class Scheduler:
+    """Dispatches requests by priority class, within the limits of a rate limiter.
+
+    Params:
+        limiter (optional): Rate limiter shared by all classes. If not set, requests are only
+                            held back by the concurrency limits of their class.
+        classes (optional): `PriorityClass` by name. Defaults to `DEFAULT_PRIORITY_CLASSES`.
+    """
+
+    def __init__(
+        self,
+        limiter: Optional[RateLimiter] = None,
+        classes: Optional[Dict[str, PriorityClass]] = None,
+    ):
+        self.limiter = limiter
+        self.classes = {
+            name: PriorityClass(params.weight, params.max_concurrency)
+            for name, params in (classes or DEFAULT_PRIORITY_CLASSES).items()
+        }
+        self.in_flight: Dict[str, int] = {name: 0 for name in self.classes}
+        self._queues: Dict[str, Deque[_Ticket]] = {
+            name: deque() for name in self.classes
+        }
+        self._last_finish: Dict[str, float] = {name: 0.0 for name in self.classes}
+        self._virtual_time = 0.0
+        self._condition = threading.Condition()
+
+    def set_max_concurrency(self, priority_class: str, max_concurrency: Optional[int]):
+        "Change the concurrency limit of a class, e.g. to adapt it to the API's load."
+        with self._condition:
+            self.classes[priority_class].max_concurrency = max_concurrency
+            self._condition.notify_all()
+
+    def queued(self, priority_class: Optional[str] = None) -> int:
+        "Number of waiting requests, of one priority class or in total."
+        if priority_class is not None:
+            return len(self._queues[priority_class])
+        return sum(len(queue) for queue in self._queues.values())
+
+    def _next(self) -> Optional[_Ticket]:
+        "The waiting request with the earliest virtual finish time that may be sent."
+        candidates = [
+            queue[0]
+            for name, queue in self._queues.items()
+            if queue
+            and (
+                self.classes[name].max_concurrency is None
+                or self.in_flight[name] < self.classes[name].max_concurrency
+            )
+        ]
+        return min(candidates, key=lambda ticket: ticket.finish, default=None)
+
+    def acquire(
+        self, priority_class: str = NORMAL, deadline: Optional[float] = None
+    ) -> float:
+        """Block until a request of the class may be sent. Returns the seconds waited.
+
+        Raises `DeadlineExceeded` if the request could not be sent before `deadline`, a
+        `time.monotonic()` value.
+        """
+        if priority_class not in self.classes:
+            raise ValueError(f"Priority class {priority_class!r} is not supported.")
+        start_time = time.perf_counter()
+        waited = False
+        with self._condition:
+            start = max(self._virtual_time, self._last_finish[priority_class])
+            finish = start + 1 / self.classes[priority_class].weight
+            self._last_finish[priority_class] = finish
+            ticket = _Ticket(priority_class, start, finish)
+            self._queues[priority_class].append(ticket)
+
+            while True:
+                if self._next() is ticket:
+                    delay = self.limiter.delay() if self.limiter else 0.0
+                    if delay <= 0:
+                        break
+                else:
+                    delay = None
+                if deadline is not None:
+                    left = deadline - time.monotonic()
+                    if left <= 0 or (delay is not None and delay > left):
+                        self._queues[priority_class].remove(ticket)
+                        self._condition.notify_all()
+                        raise DeadlineExceeded(
+                            "Deadline exceeded while waiting for the rate limit."
+                        )
+                    delay = left if delay is None else delay
+                # Check again afterwards, a more urgent request might have arrived.
+                self._condition.wait(delay)
+                waited = True
+
+            self._queues[priority_class].popleft()
+            self.in_flight[priority_class] += 1
+            self._virtual_time = ticket.start
+            if self.limiter:
+                self.limiter.reserve()
+            self._condition.notify_all()
+        return time.perf_counter() - start_time if waited else 0.0
+
+    def release(self, priority_class: str = NORMAL):
+        "Mark a request of the class as finished."
+        with self._condition:
+            self.in_flight[priority_class] -= 1
+            self._condition.notify_all()
@@ -0,0 +1,117 @@
+"""Spread requests across several integration tokens.
+
+Notion rate limits each integration separately, so integrations sharing access to the same
+pages can together send more requests than a single one:
+
+    client = ShardedNotionClient(["secret_a", "secret_b", "secret_c"])
+    page = client.get_page(page_id)
+
+Each token has its own `RateLimiter`. Requests go to the token that can send soonest and has
+the fewest requests in flight, or else the fewest requests so far. A throttled token is held
+back until its `Retry-After` has passed and a revoked token is not used anymore, while the
+request is repeated with another token.
+"""
+import threading
+import time
+from typing import List, Optional, Sequence
+
+from notion.client import NotionClient
+from notion.errors import NotionAPIError
+from notion.rate_limit import DEFAULT_RATE_LIMIT, RateLimiter
+
+
+class Shard:
+    def __init__(self, token: str, limiter: RateLimiter):
+        self.token = token
+        self.limiter = limiter
+        self.in_flight = 0
+        self.requests = 0
+        self.throttled = 0
+        self.revoked = False
+
+    def __repr__(self) -> str:
+        return (
+            f"<Shard ...{self.token[-4:]} requests={self.requests} "
+            f"in_flight={self.in_flight} revoked={self.revoked}>"
+        )
+
+
+class ShardedNotionClient(NotionClient):
+    """A `NotionClient` distributing its requests across several integration tokens.
+
+    All tokens need access to the same pages and databases.
+
+    Params:
+        tokens: Secrets of the Notion integrations.
+        rate_limit (optional): Requests per second allowed for each token.
+        burst (optional): Requests each token may send at once before being rate limited.
+        **kwargs: Passed on to `NotionClient`.
+    """
+
+    def __init__(
+        self,
+        tokens: Sequence[str],
+        rate_limit: float = DEFAULT_RATE_LIMIT,
+        burst: Optional[int] = None,
+        **kwargs,
+    ):
+        if not tokens:
+            raise ValueError("At least one token is required.")
+        # The client-wide limit lets the scheduler order requests by priority before they
+        # are assigned to a token.
+        super().__init__(tokens[0], rate_limit=rate_limit * len(tokens), **kwargs)
+        self.shards: List[Shard] = [
+            Shard(token, RateLimiter(rate_limit, burst)) for token in tokens
+        ]
+        self._by_token = {shard.token: shard for shard in self.shards}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _load(shard: Shard):
+        """Sort key preferring shards that can send soonest, with the fewest open requests.
+
+        Remaining ties go to the shard that sent the fewest requests so far, which keeps the
+        selection deterministic; the refilling rate limit budget would favor the first shard.
+        """
+        return (shard.limiter.delay(), shard.in_flight, shard.requests)
+
+    def _checkout_token(self, attempt: int, event_info: dict) -> str:
+        with self._lock:
+            shards = [shard for shard in self.shards if not shard.revoked]
+            if not shards:
+                raise NotionAPIError(
+                    "All tokens of the client have been revoked.",
+                    status=401,
+                    code="unauthorized",
+                )
+            shard = min(shards, key=self._load)
+            wait = shard.limiter.reserve()
+            shard.in_flight += 1
+            shard.requests += 1
+
+        if wait:
+            try:
+                self.hooks.emit("throttle", attempt=attempt, wait=wait, **event_info)
+                time.sleep(wait)
+            except BaseException:
+                self._checkin_token(shard.token)
+                raise
+        return shard.token
+
+    def _checkin_token(
+        self, token: str, error: Optional[NotionAPIError] = None
+    ) -> bool:
+        shard = self._by_token[token]
+        with self._lock:
+            shard.in_flight -= 1
+            if error is None:
+                return False
+            others = [s for s in self.shards if s is not shard and not s.revoked]
+            if error.status == 429:
+                shard.throttled += 1
+                shard.limiter.pause(error.retry_after or 1.0)
+                return any(s.limiter.delay() == 0 for s in others)
+            if error.status == 401:
+                shard.revoked = True
+                return bool(others)
+            return False
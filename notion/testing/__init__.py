@@ -0,0 +1,3 @@
+from .emulator import NotionEmulator
+
+__all__ = ["NotionEmulator"]
@@ -0,0 +1,982 @@
+"""An in-process emulator of the Notion API for offline integration and load testing.
+
+The emulator runs a local HTTP server in a background thread and keeps all pages,
+databases and blocks in memory. It implements the endpoints used by `NotionClient`:
+
+- `GET/PATCH /pages/{id}`, `POST /pages`
+- `GET/PATCH /databases/{id}`, `POST /databases`, `POST /databases/{id}/query`
+- `GET/PATCH/DELETE /blocks/{id}`, `GET/PATCH /blocks/{id}/children`
+- `POST /search`
+
+Latency, rate limits and 429/5xx faults can be configured to test client behavior:
+
+    with NotionEmulator(latency=0.01, rate_limit=3) as emulator:
+        client = emulator.client()
+        client.search("Meeting Notes")
+"""
+import copy
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+from urllib.parse import parse_qs, urlsplit
+
+from notion.client import NotionClient
+
+MAX_PAGE_SIZE = 100
+# Limits of a single request creating blocks.
+MAX_NESTING = 2
+MAX_BLOCKS_PER_REQUEST = 1000
+MAX_TEXT_LENGTH = 2000
+
+RICH_TEXT_TYPES = ("title", "rich_text")
+FILTER_CONDITIONS = {
+    "equals",
+    "does_not_equal",
+    "contains",
+    "does_not_contain",
+    "starts_with",
+    "ends_with",
+    "is_empty",
+    "is_not_empty",
+    "greater_than",
+    "less_than",
+    "greater_than_or_equal_to",
+    "less_than_or_equal_to",
+    "before",
+    "after",
+    "on_or_before",
+    "on_or_after",
+    "past_week",
+    "past_month",
+    "past_year",
+    "next_week",
+    "next_month",
+    "next_year",
+}
+RELATIVE_DATE_CONDITIONS = {
+    "past_week": (-7, 0),
+    "past_month": (-30, 0),
+    "past_year": (-365, 0),
+    "next_week": (0, 7),
+    "next_month": (0, 30),
+    "next_year": (0, 365),
+}
+
+
+class EmulatorError(Exception):
+    "An error response of the emulated API."
+
+    def __init__(self, status: int, code: str, message: str, headers: dict = None):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+        self.message = message
+        self.headers = headers or {}
+
+    def to_json(self) -> dict:
+        return {
+            "object": "error",
+            "status": self.status,
+            "code": self.code,
+            "message": self.message,
+        }
+
+
+FAULT_CODES = {
+    429: "rate_limited",
+    500: "internal_server_error",
+    502: "bad_gateway",
+    503: "service_unavailable",
+    504: "gateway_timeout",
+}
+
+
+def now_iso() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+
+
+def new_id() -> str:
+    return str(uuid.uuid4())
+
+
+def plain_text(rich_text: List[dict]) -> str:
+    return "".join(item.get("plain_text", "") for item in rich_text or [])
+
+
+def normalize_rich_text(rich_text: List[dict]) -> List[dict]:
+    "Complete rich text objects the way the Notion API returns them."
+    result = []
+    for item in rich_text or []:
+        text = item.get("text", {})
+        content = text.get("content") or ""
+        result.append(
+            {
+                "type": "text",
+                "text": {"content": content, "link": text.get("link")},
+                "annotations": {
+                    "bold": False,
+                    "italic": False,
+                    "strikethrough": False,
+                    "underline": False,
+                    "code": False,
+                    "color": "default",
+                    **item.get("annotations", {}),
+                },
+                "plain_text": content,
+                "href": None,
+            }
+        )
+    return result
+
+
+class TokenBucket:
+    "Token bucket allowing `rate` requests per second with bursts of up to `burst` requests."
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = rate
+        self.capacity = burst or max(1, int(math.ceil(rate)))
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        "Take a token. Returns 0 on success or the seconds until a token is available."
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class NotionEmulator:
+    """In-memory stand-in for the Notion API served over HTTP on localhost.
+
+    Params:
+        latency (optional): Seconds added to every response; either a number or a
+                            `(min, max)` tuple to draw uniformly from.
+        rate_limit (optional): Allowed requests per second and token. Exceeding it
+                               results in 429 responses with a `Retry-After` header.
+        burst (optional): Bucket size of the rate limiter. Defaults to `rate_limit`.
+        fault_rate (optional): Probability of answering a request with a random fault.
+        fault_statuses (optional): HTTP status codes used for random faults.
+        tokens (optional): Accepted integration tokens. If not set, every token is accepted.
+        seed (optional): Seed for the random fault injection and latency.
+    """
+
+    def __init__(
+        self,
+        latency: Union[float, Tuple[float, float]] = 0.0,
+        rate_limit: Optional[float] = None,
+        burst: Optional[int] = None,
+        fault_rate: float = 0.0,
+        fault_statuses: Iterable[int] = (429, 500, 502, 503),
+        tokens: Optional[Iterable[str]] = None,
+        seed: Optional[int] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.burst = burst
+        self.fault_rate = fault_rate
+        self.fault_statuses = tuple(fault_statuses)
+        self.tokens = set(tokens) if tokens is not None else None
+        self.revoked_tokens = set()
+        self.random = random.Random(seed)
+
+        self.objects: Dict[str, dict] = {}
+        self.children: Dict[str, List[str]] = {}
+        self.request_log: List[Tuple[str, str, int]] = []
+        self.user = {"object": "user", "id": new_id()}
+
+        self._scripted_faults: List[int] = []
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.RLock()
+        self._server = ThreadingHTTPServer((host, port), _make_handler(self))
+        self._server.daemon_threads = True
+        self._thread = None
+
+    # -----------------------------------------------------------------------
+    # Server Lifecycle
+    # -----------------------------------------------------------------------
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1/"
+
+    def start(self) -> "NotionEmulator":
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            kwargs={"poll_interval": 0.05},
+            daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self) -> "NotionEmulator":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def client(self, token: str = "secret_emulator", **kwargs) -> NotionClient:
+        "Create a `NotionClient` talking to this emulator."
+        return NotionClient(token, base_url=self.url, **kwargs)
+
+    # -----------------------------------------------------------------------
+    # Fault Injection
+    # -----------------------------------------------------------------------
+
+    def fail_next(self, *statuses: int):
+        "Answer the next requests with the given HTTP statuses, in order."
+        with self._lock:
+            self._scripted_faults.extend(statuses)
+
+    def revoke(self, token: str):
+        "Reject all further requests using `token` with 401 responses."
+        with self._lock:
+            self.revoked_tokens.add(token)
+
+    def _check_token(self, token: str):
+        if token in self.revoked_tokens or (
+            self.tokens is not None and token not in self.tokens
+        ):
+            raise EmulatorError(401, "unauthorized", "API token is invalid.")
+
+    def _delay(self):
+        if isinstance(self.latency, tuple):
+            delay = self.random.uniform(*self.latency)
+        else:
+            delay = self.latency
+        if delay:
+            time.sleep(delay)
+
+    def _inject_fault(self, token: str):
+        with self._lock:
+            status = None
+            if self._scripted_faults:
+                status = self._scripted_faults.pop(0)
+            elif self.fault_rate and self.random.random() < self.fault_rate:
+                status = self.random.choice(self.fault_statuses)
+
+            if status is None and self.rate_limit:
+                bucket = self._buckets.get(token)
+                if bucket is None:
+                    bucket = TokenBucket(self.rate_limit, self.burst)
+                    self._buckets[token] = bucket
+                wait = bucket.take()
+                if wait:
+                    raise EmulatorError(
+                        429,
+                        "rate_limited",
+                        "You have been rate limited. Please try again in a few minutes.",
+                        {"Retry-After": str(max(1, math.ceil(wait)))},
+                    )
+
+        if status is not None:
+            headers = {"Retry-After": "1"} if status == 429 else {}
+            raise EmulatorError(
+                status, FAULT_CODES.get(status, "error"), "Injected fault.", headers
+            )
+
+    # -----------------------------------------------------------------------
+    # Request Dispatching
+    # -----------------------------------------------------------------------
+
+    def handle(
+        self, method: str, path: str, query: dict, body: Any, token: str
+    ) -> Tuple[int, dict, dict]:
+        "Handle a single API request and return `(status, headers, response body)`."
+        self._delay()
+        try:
+            self._check_token(token)
+            self._inject_fault(token)
+            for route_method, pattern, handler_name in ROUTES:
+                match = pattern.fullmatch(path)
+                if route_method == method and match:
+                    with self._lock:
+                        handler = getattr(self, handler_name)
+                        result = handler(*match.groups(), query=query, body=body or {})
+                        # Copy the result so it can be serialized outside of the lock.
+                        result = copy.deepcopy(result)
+                    status, headers = 200, {}
+                    break
+            else:
+                raise EmulatorError(
+                    400, "invalid_request_url", f"Invalid request URL: {path}"
+                )
+        except EmulatorError as e:
+            status, headers, result = e.status, e.headers, e.to_json()
+        except Exception as e:
+            error = EmulatorError(500, "internal_server_error", repr(e))
+            status, headers, result = error.status, {}, error.to_json()
+
+        with self._lock:
+            self.request_log.append((method, path, status))
+        return status, headers, result
+
+    def _get(self, object_id: str, object_type: Optional[str] = None) -> dict:
+        obj = self.objects.get(object_id)
+        if obj is None or (object_type and obj["object"] != object_type):
+            raise EmulatorError(
+                404,
+                "object_not_found",
+                f"Could not find {object_type or 'object'} with ID: {object_id}.",
+            )
+        return obj
+
+    def _paginate(self, items: List[dict], start_cursor, page_size) -> dict:
+        page_size = min(int(page_size or MAX_PAGE_SIZE), MAX_PAGE_SIZE)
+        start = 0
+        if start_cursor:
+            # Cursors carry the position of the next item, so reading a long list page by
+            # page isn't quadratic. The item is only searched for if the list changed.
+            item_id, _, position = str(start_cursor).rpartition(":")
+            if (
+                position.isdigit()
+                and int(position) < len(items)
+                and items[int(position)]["id"] == item_id
+            ):
+                start = int(position)
+            else:
+                start = next(
+                    (i for i, item in enumerate(items) if item["id"] == item_id), None
+                )
+                if start is None:
+                    raise EmulatorError(
+                        400, "validation_error", "Invalid start_cursor."
+                    )
+        end = start + page_size
+        has_more = end < len(items)
+        return {
+            "object": "list",
+            "results": items[start:end],
+            "next_cursor": f"{items[end]['id']}:{end}" if has_more else None,
+            "has_more": has_more,
+        }
+
+    def _touch(self, obj: dict):
+        obj["last_edited_time"] = now_iso()
+        obj["last_edited_by"] = self.user
+
+    def _base_object(self, object_type: str, parent: Optional[dict]) -> dict:
+        timestamp = now_iso()
+        return {
+            "object": object_type,
+            "id": new_id(),
+            "created_time": timestamp,
+            "last_edited_time": timestamp,
+            "created_by": self.user,
+            "last_edited_by": self.user,
+            "parent": parent or {"type": "workspace", "workspace": True},
+            "archived": False,
+        }
+
+    # -----------------------------------------------------------------------
+    # Pages
+    # -----------------------------------------------------------------------
+
+    def add_page(
+        self,
+        title: str,
+        parent_id: Optional[str] = None,
+        properties: Optional[dict] = None,
+    ) -> dict:
+        "Directly seed a page, e.g. at the workspace level, which the API does not allow."
+        parent = None
+        if parent_id:
+            parent_type = self._get(parent_id)["object"]
+            parent = {"type": f"{parent_type}_id", f"{parent_type}_id": parent_id}
+        with self._lock:
+            return self._create_page(
+                parent,
+                {
+                    "title": {"title": [{"text": {"content": title}}]},
+                    **(properties or {}),
+                },
+            )
+
+    def _create_page(self, parent: Optional[dict], properties: dict, body=None) -> dict:
+        body = body or {}
+        page = self._base_object("page", parent)
+        page.update({"icon": body.get("icon"), "cover": body.get("cover")})
+
+        schema = {}
+        if parent and parent["type"] == "database_id":
+            schema = self._get(parent["database_id"], "database")["properties"]
+        page["properties"] = self._normalize_page_properties(properties, schema)
+
+        title = plain_text(self._title_property(page)["title"])
+        slug = re.sub(r"[^0-9A-Za-z]+", "-", title).strip("-")
+        page["url"] = f"https://www.notion.so/{slug}-{page['id'].replace('-', '')}"
+
+        self.objects[page["id"]] = page
+        self.children[page["id"]] = []
+        if parent and parent["type"] == "page_id":
+            self._add_child_reference(parent["page_id"], page, "child_page", title)
+
+        for child in body.get("children", []):
+            self._create_block(page["id"], child)
+        return page
+
+    def _add_child_reference(self, parent_id: str, obj: dict, type_: str, title: str):
+        "Pages and databases with a page parent also show up as block in their parent."
+        block = self._base_object("block", {"type": "page_id", "page_id": parent_id})
+        block.update(
+            {
+                "id": obj["id"],
+                "created_time": obj["created_time"],
+                "has_children": False,
+                "type": type_,
+                type_: {"title": title},
+            }
+        )
+        self.children[parent_id].append(block["id"])
+        # Child pages are stored by their page ID, so their block is kept separately.
+        self.objects.setdefault(f"block:{block['id']}", block)
+
+    def _normalize_page_properties(self, properties: dict, schema: dict) -> dict:
+        result = {}
+        for name, value in properties.items():
+            if "type" in value:
+                type_ = value["type"]
+            elif name in schema:
+                type_ = schema[name]["type"]
+            else:
+                type_ = next(iter(value))
+            prop_value = value.get(type_)
+            if type_ in RICH_TEXT_TYPES:
+                prop_value = normalize_rich_text(prop_value)
+            property_id = schema.get(name, {}).get(
+                "id", "title" if type_ == "title" else name
+            )
+            result[name] = {"id": property_id, "type": type_, type_: prop_value}
+
+        for name, definition in schema.items():
+            if name not in result:
+                type_ = definition["type"]
+                empty = (
+                    []
+                    if type_
+                    in RICH_TEXT_TYPES + ("multi_select", "people", "relation", "files")
+                    else None
+                )
+                if type_ == "checkbox":
+                    empty = False
+                result[name] = {"id": definition["id"], "type": type_, type_: empty}
+        if schema:
+            # Rename the title property to the name defined by the database.
+            title_name = next(n for n, d in schema.items() if d["type"] == "title")
+            for name, value in list(result.items()):
+                if value["type"] == "title" and name != title_name:
+                    result[title_name] = result.pop(name)
+        return result
+
+    def _title_property(self, page: dict) -> dict:
+        for value in page["properties"].values():
+            if value["type"] == "title":
+                return value
+        return {"title": []}
+
+    def create_page(self, query: dict, body: dict) -> dict:
+        if "parent" not in body:
+            raise EmulatorError(
+                400, "validation_error", "body.parent should be defined."
+            )
+        parent = body["parent"]
+        parent_type = parent.get("type") or next(iter(parent))
+        if parent_type not in ("page_id", "database_id", "workspace"):
+            raise EmulatorError(400, "validation_error", "Invalid parent.")
+        parent = {"type": parent_type, parent_type: parent[parent_type]}
+        if parent_type != "workspace":
+            self._get(parent[parent_type], parent_type[:-3])
+        self._check_children(body.get("children") or [])
+        return self._create_page(parent, body.get("properties", {}), body)
+
+    def get_page(self, page_id: str, query: dict, body: dict) -> dict:
+        return self._get(page_id, "page")
+
+    def update_page(self, page_id: str, query: dict, body: dict) -> dict:
+        page = self._get(page_id, "page")
+        for name, value in (body.get("properties") or {}).items():
+            if name not in page["properties"]:
+                page["properties"].update(
+                    self._normalize_page_properties({name: value}, {})
+                )
+                continue
+            prop = page["properties"][name]
+            type_ = prop["type"]
+            new_value = value[type_] if type_ in value else next(iter(value.values()))
+            if type_ in RICH_TEXT_TYPES:
+                new_value = normalize_rich_text(new_value)
+            prop[type_] = new_value
+        for key in ("icon", "cover"):
+            if key in body:
+                page[key] = body[key]
+        if "archived" in body:
+            self._set_archived(page, body["archived"])
+        self._touch(page)
+        return page
+
+    def _set_archived(self, obj: dict, archived: bool):
+        obj["archived"] = archived
+        reference = self.objects.get(f"block:{obj['id']}")
+        if reference:
+            reference["archived"] = archived
+
+    # -----------------------------------------------------------------------
+    # Databases
+    # -----------------------------------------------------------------------
+
+    def create_database(self, query: dict, body: dict) -> dict:
+        parent = body.get("parent") or {}
+        parent_id = parent.get("page_id")
+        if not parent_id:
+            raise EmulatorError(
+                400, "validation_error", "body.parent.page_id should be defined."
+            )
+        self._get(parent_id, "page")
+
+        database = self._base_object(
+            "database", {"type": "page_id", "page_id": parent_id}
+        )
+        title = normalize_rich_text(body.get("title", []))
+        database.update(
+            {
+                "title": title,
+                "icon": body.get("icon"),
+                "cover": body.get("cover"),
+                "properties": {},
+                "url": f"https://www.notion.so/{database['id'].replace('-', '')}",
+            }
+        )
+        properties = body.get("properties") or {}
+        if not any("title" in definition for definition in properties.values()):
+            raise EmulatorError(400, "validation_error", "Title property is missing.")
+        for name, definition in properties.items():
+            type_ = definition.get("type") or next(iter(definition))
+            database["properties"][name] = {
+                "id": "title" if type_ == "title" else new_id()[:4],
+                "name": name,
+                "type": type_,
+                type_: definition.get(type_) or {},
+            }
+
+        self.objects[database["id"]] = database
+        self.children[database["id"]] = []
+        self._add_child_reference(
+            parent_id, database, "child_database", plain_text(title)
+        )
+        return database
+
+    def get_database(self, database_id: str, query: dict, body: dict) -> dict:
+        return self._get(database_id, "database")
+
+    def update_database(self, database_id: str, query: dict, body: dict) -> dict:
+        database = self._get(database_id, "database")
+        if "title" in body:
+            database["title"] = normalize_rich_text(body["title"])
+        for key in ("icon", "cover"):
+            if key in body:
+                database[key] = body[key]
+        for name, definition in (body.get("properties") or {}).items():
+            if definition is None:
+                database["properties"].pop(name, None)
+                continue
+            type_ = definition.get("type") or next(iter(definition))
+            database["properties"][name] = {
+                "id": database["properties"].get(name, {}).get("id", new_id()[:4]),
+                "name": name,
+                "type": type_,
+                type_: definition.get(type_) or {},
+            }
+        if "archived" in body:
+            self._set_archived(database, body["archived"])
+        self._touch(database)
+        return database
+
+    def query_database(self, database_id: str, query: dict, body: dict) -> dict:
+        self._get(database_id, "database")
+        pages = [
+            page
+            for page in self.objects.values()
+            if page["object"] == "page"
+            and not page["archived"]
+            and page["parent"].get("database_id") == database_id
+        ]
+        if body.get("filter"):
+            pages = [page for page in pages if self._matches(page, body["filter"])]
+        pages = self._sort(pages, body.get("sorts") or [])
+        return {
+            **self._paginate(pages, body.get("start_cursor"), body.get("page_size")),
+            "type": "page",
+            "page": {},
+        }
+
+    # -----------------------------------------------------------------------
+    # Filters & Sorts
+    # -----------------------------------------------------------------------
+
+    def _property_value(self, page: dict, name: str) -> Any:
+        prop = page["properties"].get(name)
+        if prop is None:
+            raise EmulatorError(
+                400, "validation_error", f"Could not find property with name: {name}."
+            )
+        type_ = prop["type"]
+        value = prop.get(type_)
+        if type_ in RICH_TEXT_TYPES:
+            return plain_text(value)
+        if type_ == "select" or type_ == "status":
+            return value["name"] if value else None
+        if type_ == "multi_select":
+            return [option["name"] for option in value or []]
+        if type_ in ("people", "relation"):
+            return [item["id"] for item in value or []]
+        if type_ == "date":
+            return value["start"] if value else None
+        return value
+
+    def _matches(self, page: dict, filter_: dict) -> bool:
+        if "and" in filter_:
+            return all(self._matches(page, sub_filter) for sub_filter in filter_["and"])
+        if "or" in filter_:
+            return any(self._matches(page, sub_filter) for sub_filter in filter_["or"])
+        if "timestamp" in filter_:
+            timestamp = filter_["timestamp"]
+            return _check_condition(page[timestamp][:10], filter_[timestamp])
+        if "property" in filter_:
+            value = self._property_value(page, filter_["property"])
+            conditions = {k: v for k, v in filter_.items() if k != "property"}
+            if len(conditions) == 1:
+                key, condition = next(iter(conditions.items()))
+                if key in ("rollup", "formula"):
+                    raise EmulatorError(
+                        400, "validation_error", f"{key} filters are not emulated."
+                    )
+                if key not in FILTER_CONDITIONS:
+                    conditions = condition
+            return _check_condition(value, conditions)
+        raise EmulatorError(400, "validation_error", "Invalid filter.")
+
+    def _sort(self, objects: List[dict], sorts: List[dict]) -> List[dict]:
+        # Python's sort is stable, so applying the sorts in reverse order gives priority
+        # to the first sort.
+        for sort in reversed(sorts):
+            if "timestamp" in sort:
+                key = lambda obj, sort=sort: obj[sort["timestamp"]]
+            else:
+                key = lambda obj, sort=sort: self._property_value(obj, sort["property"])
+            descending = sort.get("direction") == "descending"
+            present = [obj for obj in objects if key(obj) not in (None, "", [])]
+            missing = [obj for obj in objects if key(obj) in (None, "", [])]
+            objects = sorted(present, key=key, reverse=descending) + missing
+        return objects
+
+    # -----------------------------------------------------------------------
+    # Blocks
+    # -----------------------------------------------------------------------
+
+    def _get_block(self, block_id: str) -> dict:
+        block = self.objects.get(f"block:{block_id}") or self.objects.get(block_id)
+        if block is None or block["object"] != "block":
+            raise EmulatorError(
+                404, "object_not_found", f"Could not find block with ID: {block_id}."
+            )
+        return block
+
+    def _create_block(self, parent_id: str, data: dict, after: str = None) -> dict:
+        parent_object = self.objects.get(parent_id) or self._get_block(parent_id)
+        parent_type = "page_id" if parent_object["object"] == "page" else "block_id"
+        type_ = data.get("type") or next(k for k in data if k != "object")
+        if type_ in ("child_page", "child_database", "link_preview"):
+            raise EmulatorError(
+                400, "validation_error", f"Blocks of type {type_} cannot be created."
+            )
+        content = dict(data.get(type_) or {})
+        children = content.pop("children", None) or []
+        for key in ("rich_text", "caption"):
+            if key in content:
+                content[key] = normalize_rich_text(content[key])
+        if type_ == "table_row":
+            content["cells"] = [normalize_rich_text(cell) for cell in content["cells"]]
+
+        block = self._base_object(
+            "block", {"type": parent_type, parent_type: parent_id}
+        )
+        block.update({"has_children": False, "type": type_, type_: content})
+        self.objects[block["id"]] = block
+        self.children[block["id"]] = []
+
+        siblings = self.children.setdefault(parent_id, [])
+        if after:
+            siblings.insert(siblings.index(after) + 1, block["id"])
+        else:
+            siblings.append(block["id"])
+        if parent_object["object"] == "block":
+            parent_object["has_children"] = True
+
+        for child in children:
+            self._create_block(block["id"], child)
+        return block
+
+    def get_block(self, block_id: str, query: dict, body: dict) -> dict:
+        return self._get_block(block_id)
+
+    def update_block(self, block_id: str, query: dict, body: dict) -> dict:
+        block = self._get_block(block_id)
+        type_ = block["type"]
+        if type_ in body:
+            for key, value in body[type_].items():
+                if key in ("rich_text", "caption"):
+                    value = normalize_rich_text(value)
+                elif key == "cells":
+                    value = [normalize_rich_text(cell) for cell in value]
+                block[type_][key] = value
+        if "archived" in body:
+            block["archived"] = body["archived"]
+            if block["id"] in self.objects and block["type"] in (
+                "child_page",
+                "child_database",
+            ):
+                self.objects[block["id"]]["archived"] = body["archived"]
+        self._touch(block)
+        return block
+
+    def delete_block(self, block_id: str, query: dict, body: dict) -> dict:
+        return self.update_block(block_id, query, {"archived": True})
+
+    def _children_of(self, block_id: str) -> List[dict]:
+        if block_id not in self.objects:
+            self._get_block(block_id)
+        blocks = [
+            self._get_block(child_id) for child_id in self.children.get(block_id, [])
+        ]
+        return [block for block in blocks if not block["archived"]]
+
+    def retrieve_block_children(self, block_id: str, query: dict, body: dict) -> dict:
+        blocks = self._children_of(block_id)
+        return {
+            **self._paginate(blocks, query.get("start_cursor"), query.get("page_size")),
+            "type": "block",
+            "block": {},
+        }
+
+    def _check_children(self, children: List[dict], depth: int = 0) -> int:
+        "Validate blocks to be created like the API does. Returns the number of blocks."
+        if len(children) > MAX_PAGE_SIZE:
+            raise EmulatorError(
+                400,
+                "validation_error",
+                f"children should be at most {MAX_PAGE_SIZE} items long.",
+            )
+        count = len(children)
+        for child in children:
+            type_ = child.get("type") or next(k for k in child if k != "object")
+            content = child.get(type_) or {}
+            for item in content.get("rich_text") or []:
+                if len(item.get("text", {}).get("content") or "") > MAX_TEXT_LENGTH:
+                    raise EmulatorError(
+                        400,
+                        "validation_error",
+                        f"text.content.length should be ≤ {MAX_TEXT_LENGTH}.",
+                    )
+            if content.get("children"):
+                if depth >= MAX_NESTING:
+                    raise EmulatorError(
+                        400,
+                        "validation_error",
+                        f"Children can only be nested {MAX_NESTING} levels deep.",
+                    )
+                count += self._check_children(content["children"], depth + 1)
+        if depth == 0 and count > MAX_BLOCKS_PER_REQUEST:
+            raise EmulatorError(
+                400,
+                "validation_error",
+                f"At most {MAX_BLOCKS_PER_REQUEST} blocks can be created at once.",
+            )
+        return count
+
+    def append_block_children(self, block_id: str, query: dict, body: dict) -> dict:
+        children = body.get("children")
+        if not children or len(children) > MAX_PAGE_SIZE:
+            raise EmulatorError(
+                400,
+                "validation_error",
+                f"body.children should be between 1 and {MAX_PAGE_SIZE} items long.",
+            )
+        self._check_children(children)
+        after = body.get("after")
+        if after and after not in self.children.get(block_id, []):
+            raise EmulatorError(400, "validation_error", "Invalid `after` block ID.")
+
+        created = []
+        for child in children:
+            created.append(self._create_block(block_id, child, after))
+            after = created[-1]["id"] if after else None
+        return {
+            "object": "list",
+            "results": created,
+            "next_cursor": None,
+            "has_more": False,
+            "type": "block",
+            "block": {},
+        }
+
+    # -----------------------------------------------------------------------
+    # Search
+    # -----------------------------------------------------------------------
+
+    def search(self, query: dict, body: dict) -> dict:
+        text = (body.get("query") or "").lower()
+        object_type = (body.get("filter") or {}).get("value")
+        results = []
+        for obj in self.objects.values():
+            if obj["object"] not in ("page", "database") or obj["archived"]:
+                continue
+            if object_type and obj["object"] != object_type:
+                continue
+            if obj["object"] == "page":
+                title = plain_text(self._title_property(obj)["title"])
+            else:
+                title = plain_text(obj["title"])
+            if text in title.lower():
+                results.append(obj)
+
+        sort = body.get("sort") or {
+            "timestamp": "last_edited_time",
+            "direction": "descending",
+        }
+        results = self._sort(results, [sort])
+        return {
+            **self._paginate(results, body.get("start_cursor"), body.get("page_size")),
+            "type": "page_or_database",
+            "page_or_database": {},
+        }
+
+
+def _check_condition(value: Any, conditions: dict) -> bool:
+    "Check whether a simple property value satisfies a filter condition."
+    for condition, expected in conditions.items():
+        if condition == "equals":
+            ok = value == expected
+        elif condition == "does_not_equal":
+            ok = value != expected
+        elif condition == "contains":
+            ok = value is not None and expected in value
+        elif condition == "does_not_contain":
+            ok = value is None or expected not in value
+        elif condition == "starts_with":
+            ok = (value or "").startswith(expected)
+        elif condition == "ends_with":
+            ok = (value or "").endswith(expected)
+        elif condition == "is_empty":
+            ok = value in (None, "", [])
+        elif condition == "is_not_empty":
+            ok = value not in (None, "", [])
+        elif value is None:
+            ok = False
+        elif condition in ("greater_than", "after"):
+            ok = value > expected
+        elif condition in ("less_than", "before"):
+            ok = value < expected
+        elif condition in ("greater_than_or_equal_to", "on_or_after"):
+            ok = value >= expected
+        elif condition in ("less_than_or_equal_to", "on_or_before"):
+            ok = value <= expected
+        elif condition in RELATIVE_DATE_CONDITIONS:
+            start, end = RELATIVE_DATE_CONDITIONS[condition]
+            today = datetime.now(timezone.utc).date()
+            ok = (
+                str(today + timedelta(start))
+                <= value[:10]
+                <= str(today + timedelta(end))
+            )
+        else:
+            raise EmulatorError(
+                400,
+                "validation_error",
+                f"Filter condition {condition!r} is not supported.",
+            )
+        if not ok:
+            return False
+    return True
+
+
+ID = r"([0-9a-f-]{32,36})"
+ROUTES = [
+    ("POST", re.compile(r"pages"), "create_page"),
+    ("GET", re.compile(rf"pages/{ID}"), "get_page"),
+    ("PATCH", re.compile(rf"pages/{ID}"), "update_page"),
+    ("POST", re.compile(r"databases"), "create_database"),
+    ("GET", re.compile(rf"databases/{ID}"), "get_database"),
+    ("PATCH", re.compile(rf"databases/{ID}"), "update_database"),
+    ("POST", re.compile(rf"databases/{ID}/query"), "query_database"),
+    ("GET", re.compile(rf"blocks/{ID}"), "get_block"),
+    ("PATCH", re.compile(rf"blocks/{ID}"), "update_block"),
+    ("DELETE", re.compile(rf"blocks/{ID}"), "delete_block"),
+    ("GET", re.compile(rf"blocks/{ID}/children"), "retrieve_block_children"),
+    ("PATCH", re.compile(rf"blocks/{ID}/children"), "append_block_children"),
+    ("POST", re.compile(r"search"), "search"),
+]
+
+
+def _make_handler(emulator: NotionEmulator):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body are written separately, which stalls keep-alive connections
+        # on delayed ACKs unless Nagle's algorithm is disabled.
+        disable_nagle_algorithm = True
+
+        def _handle(self):
+            url = urlsplit(self.path)
+            path = url.path.strip("/")
+            if path.startswith("v1/"):
+                path = path[len("v1/") :]
+            query = {key: values[0] for key, values in parse_qs(url.query).items()}
+
+            length = int(self.headers.get("Content-Length") or 0)
+            raw_body = self.rfile.read(length) if length else b""
+            token = self.headers.get("Authorization", "")
+            token = token[len("Bearer ") :] if token.startswith("Bearer ") else token
+
+            try:
+                body = json.loads(raw_body) if raw_body else None
+            except ValueError:
+                status, headers = 400, {}
+                result = EmulatorError(400, "invalid_json", "Invalid JSON.").to_json()
+            else:
+                status, headers, result = emulator.handle(
+                    self.command, path, query, body, token
+                )
+
+            response = json.dumps(result).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(response)))
+            for key, value in headers.items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(response)
+
+        do_GET = do_POST = do_PATCH = do_DELETE = _handle
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
@@ -0,0 +1,245 @@
+"""A local index of the titles of all pages and databases shared with an integration.
+
+Resolving names to IDs through the search endpoint costs at least one request per lookup.
+`TitleIndex` loads all titles once and then answers exact, prefix and fuzzy lookups from
+memory:
+
+    index = TitleIndex(client)
+    index.refresh()
+    page_id = index.resolve("Roadmap")
+
+`refresh()` only fetches what changed since the previous refresh: it searches by
+`last_edited_time`, newest first, and stops at the first result older than the last one it
+has seen. Archived pages don't show up in search results, so they are only dropped from the
+index by `refresh(full=True)`.
+"""
+import json
+import threading
+from bisect import bisect_left, insort
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from datetime import timedelta
+from typing import Dict, List, Optional, Set
+
+from notion.model.common.utils import parse_notion_datetime
+
+# Notion rounds `last_edited_time` to the minute, so results of the last minute are re-read.
+REFRESH_OVERLAP = timedelta(minutes=1)
+
+
+@dataclass
+class IndexedTitle:
+    id: str
+    object: str
+    title: str
+    last_edited_time: str
+    url: Optional[str] = None
+
+
+def normalize_title(title: str) -> str:
+    "The form titles are compared in: case-folded, with collapsed whitespace."
+    return " ".join(title.casefold().split())
+
+
+def trigrams(key: str) -> Set[str]:
+    padded = f"  {key} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def title_of(data: dict) -> str:
+    "The plain text title of page or database data returned by the API."
+    if data["object"] == "database":
+        rich_text = data.get("title") or []
+    else:
+        rich_text = next(
+            (
+                value["title"]
+                for value in data.get("properties", {}).values()
+                if value.get("type") == "title"
+            ),
+            [],
+        )
+    return "".join(item.get("plain_text", "") for item in rich_text)
+
+
+class TitleIndex:
+    """In-memory title index of the pages and databases visible to a client.
+
+    Params:
+        client: The `NotionClient` to search with.
+        object_type (optional): Only index `"page"`s or `"database"`s instead of both.
+    """
+
+    def __init__(self, client, object_type: Optional[str] = None):
+        self.client = client
+        self.object_type = object_type
+        self.entries: Dict[str, IndexedTitle] = {}
+        self.last_edited_time: Optional[str] = None
+        self._ids_by_key: Dict[str, Set[str]] = defaultdict(set)
+        self._sorted_keys: List[str] = []
+        self._keys_by_trigram: Dict[str, Set[str]] = defaultdict(set)
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    # ---------------------------------------------------------------------------
+    # Maintenance
+    # ---------------------------------------------------------------------------
+
+    def _add(self, entry: IndexedTitle):
+        self._remove(entry.id)
+        key = normalize_title(entry.title)
+        self.entries[entry.id] = entry
+        if not self._ids_by_key[key]:
+            insort(self._sorted_keys, key)
+            for trigram in trigrams(key):
+                self._keys_by_trigram[trigram].add(key)
+        self._ids_by_key[key].add(entry.id)
+
+    def _remove(self, object_id: str):
+        entry = self.entries.pop(object_id, None)
+        if entry is None:
+            return
+        key = normalize_title(entry.title)
+        ids = self._ids_by_key[key]
+        ids.discard(object_id)
+        if not ids:
+            del self._ids_by_key[key]
+            del self._sorted_keys[bisect_left(self._sorted_keys, key)]
+            for trigram in trigrams(key):
+                self._keys_by_trigram[trigram].discard(key)
+
+    def update(self, data: dict):
+        "Add or update a page or database from data returned by the API."
+        with self._lock:
+            if data.get("archived"):
+                self._remove(data["id"])
+                return
+            self._add(
+                IndexedTitle(
+                    data["id"],
+                    data["object"],
+                    title_of(data),
+                    data["last_edited_time"],
+                    data.get("url"),
+                )
+            )
+            if (
+                self.last_edited_time is None
+                or data["last_edited_time"] > self.last_edited_time
+            ):
+                self.last_edited_time = data["last_edited_time"]
+
+    def refresh(self, full: bool = False) -> int:
+        """Fetch titles changed since the last refresh, or all titles if `full` is set.
+
+        Returns the number of search results processed.
+        """
+        since = None
+        if self.last_edited_time and not full:
+            since = parse_notion_datetime(self.last_edited_time) - REFRESH_OVERLAP
+
+        payload = {
+            "query": "",
+            "sort": {"timestamp": "last_edited_time", "direction": "descending"},
+        }
+        if self.object_type:
+            payload["filter"] = {"property": "object", "value": self.object_type}
+
+        seen = {}
+        for data in self.client._iter_paginate("post", "search", payload):
+            if since and parse_notion_datetime(data["last_edited_time"]) < since:
+                break
+            seen[data["id"]] = data
+
+        with self._lock:
+            if full:
+                for object_id in set(self.entries) - set(seen):
+                    self._remove(object_id)
+            for data in seen.values():
+                self.update(data)
+        return len(seen)
+
+    # ---------------------------------------------------------------------------
+    # Lookups
+    # ---------------------------------------------------------------------------
+
+    def exact(self, title: str) -> List[IndexedTitle]:
+        "Entries whose title equals `title`, ignoring case and whitespace differences."
+        with self._lock:
+            ids = self._ids_by_key.get(normalize_title(title), ())
+            return [self.entries[object_id] for object_id in ids]
+
+    def resolve(self, title: str) -> Optional[str]:
+        "The ID of the most recently edited entry titled `title`, if there is one."
+        matches = self.exact(title)
+        if not matches:
+            return None
+        return max(matches, key=lambda entry: entry.last_edited_time).id
+
+    def prefix(self, prefix: str, limit: int = 10) -> List[IndexedTitle]:
+        "Entries whose title starts with `prefix`, in alphabetical order."
+        prefix = normalize_title(prefix)
+        results = []
+        with self._lock:
+            position = bisect_left(self._sorted_keys, prefix)
+            while position < len(self._sorted_keys) and len(results) < limit:
+                key = self._sorted_keys[position]
+                if not key.startswith(prefix):
+                    break
+                results.extend(self.entries[i] for i in self._ids_by_key[key])
+                position += 1
+        return results[:limit]
+
+    def fuzzy(
+        self, title: str, limit: int = 10, min_similarity: float = 0.3
+    ) -> List[IndexedTitle]:
+        """Entries with titles similar to `title`, most similar first.
+
+        Similarity is the Jaccard index of the titles' character trigrams, which tolerates
+        typos and reordered words.
+        """
+        query = trigrams(normalize_title(title))
+        shared = defaultdict(int)
+        with self._lock:
+            for trigram in query:
+                for key in self._keys_by_trigram.get(trigram, ()):
+                    shared[key] += 1
+            scored = []
+            for key, count in shared.items():
+                similarity = count / (len(query) + len(trigrams(key)) - count)
+                if similarity >= min_similarity:
+                    scored.append((similarity, key))
+            scored.sort(reverse=True)
+            results = [
+                self.entries[object_id]
+                for _, key in scored
+                for object_id in self._ids_by_key[key]
+            ]
+        return results[:limit]
+
+    # ---------------------------------------------------------------------------
+    # Persistence
+    # ---------------------------------------------------------------------------
+
+    def save(self, path: str):
+        "Store the index as JSON, so a later process can continue with `refresh()`."
+        with self._lock:
+            data = {
+                "last_edited_time": self.last_edited_time,
+                "entries": [asdict(entry) for entry in self.entries.values()],
+            }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+
+    @staticmethod
+    def load(client, path: str, object_type: Optional[str] = None) -> "TitleIndex":
+        "Load an index stored with `save()`."
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        index = TitleIndex(client, object_type)
+        for entry in data["entries"]:
+            index._add(IndexedTitle(**entry))
+        index.last_edited_time = data["last_edited_time"]
+        return index
@@ -0,0 +1,138 @@
+"""Transports send the HTTP requests of `NotionClient`.
+
+A transport implements `request(method, url, headers, body, timeout)` and returns a response
+object with `status_code`, `headers`, `content` and `text` attributes, like
+`requests.Response`. `timeout` is the number of seconds to wait for the server, or `None` to
+wait indefinitely. Exceptions listed in its `errors` attribute, including timeouts, are
+treated as (retryable) connection problems.
+
+Besides the default `RequestsTransport`, `HttpxTransport` can multiplex many concurrent
+requests over a single HTTP/2 connection. It requires `pip install httpx[http2]`.
+"""
+from abc import ABC, abstractmethod
+from typing import Optional, Tuple, Type, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+
+class Transport(ABC):
+    errors: Tuple[Type[Exception], ...] = ()
+
+    @abstractmethod
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: dict,
+        body: Optional[bytes],
+        timeout: Optional[float] = None,
+    ):
+        pass
+
+    def close(self):
+        pass
+
+
+class RequestsTransport(Transport):
+    """Sends requests through a `requests.Session`, reusing connections between requests.
+
+    Params:
+        pool_maxsize (optional): Maximum number of connections kept open per host, which
+                                 should be at least the number of concurrent requests.
+        session (optional): A preconfigured session, e.g. with custom adapters or proxies.
+    """
+
+    errors = (requests.RequestException,)
+
+    def __init__(
+        self, pool_maxsize: int = 32, session: Optional[requests.Session] = None
+    ):
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        self.session = session
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: dict,
+        body: Optional[bytes],
+        timeout: Optional[float] = None,
+    ):
+        return self.session.request(
+            method, url, headers=headers, data=body, timeout=timeout
+        )
+
+    def close(self):
+        self.session.close()
+
+
+class HttpxTransport(Transport):
+    """Sends requests with `httpx`, using HTTP/2 if available.
+
+    With HTTP/2, concurrent requests from many threads share one multiplexed connection
+    instead of opening a socket each.
+
+    Params:
+        http2 (optional): Negotiate HTTP/2 with the server. Requires the `h2` package.
+        max_connections (optional): Maximum number of open connections.
+        client (optional): A preconfigured `httpx.Client`.
+    """
+
+    def __init__(
+        self,
+        http2: bool = True,
+        max_connections: int = 32,
+        client: Optional["httpx.Client"] = None,
+    ):
+        if httpx is None:
+            raise ImportError("`HttpxTransport` requires `pip install httpx[http2]`.")
+        self.errors = (httpx.TransportError,)
+        self.client = client or httpx.Client(
+            http2=http2, limits=httpx.Limits(max_connections=max_connections)
+        )
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: dict,
+        body: Optional[bytes],
+        timeout: Optional[float] = None,
+    ):
+        return self.client.request(
+            method, url, headers=headers, content=body, timeout=timeout
+        )
+
+    def close(self):
+        self.client.close()
+
+
+TRANSPORTS = {
+    "requests": RequestsTransport,
+    "httpx": HttpxTransport,
+}
+
+
+def get_transport(transport: Union[str, Transport, None] = None) -> Transport:
+    """Resolve `transport` to a transport instance.
+
+    `transport` can be `None` (use `RequestsTransport`), the name of a built-in transport
+    (`"requests"` or `"httpx"`) or a `Transport` instance.
+    """
+    if transport is None:
+        return RequestsTransport()
+    if isinstance(transport, str):
+        if transport not in TRANSPORTS:
+            raise ValueError(f"Transport {transport!r} is not supported.")
+        return TRANSPORTS[transport]()
+    return transport
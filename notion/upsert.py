@@ -0,0 +1,312 @@
+"""Create or update database rows by a natural key, e.g. the ID of a record in another system.
+
+Looking up every key with a database query costs a request per row before it is even
+written. `KeyIndex` instead reads the whole database once, keeping the page ID and property
+values per key in memory, and `upsert_many` only sends the requests that change something:
+
+    index = KeyIndex(client, database_id, key="External ID")
+    result = upsert_many(client, database_id, rows, index=index)
+    print(result.created, result.updated, result.unchanged)
+
+Rows whose properties already have the given values are skipped, and updates only carry the
+properties that changed. Creates and updates are sent concurrently with `bulk_map()`.
+
+`refresh()` only reads pages edited since the previous refresh: it queries the database by
+`last_edited_time`, newest first, and stops at the first page older than the last one it has
+seen. Pages written by `upsert_many` are added to the index from the responses. Archived
+pages don't show up in queries, so they are only dropped by `refresh(full=True)`.
+"""
+import json
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterable, Optional
+
+from notion.model.common.utils import (
+    RICH_TEXT_TYPES,
+    comparable,
+    parse_notion_datetime,
+)
+from notion.title_index import REFRESH_OVERLAP
+
+
+@dataclass
+class IndexedRow:
+    page_id: str
+    last_edited_time: str
+    values: Dict[str, Any]
+
+
+@dataclass
+class UpsertResult:
+    "Number of rows created, updated and left alone because nothing changed."
+
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+
+
+# ---------------------------------------------------------------------------
+# Property values
+# ---------------------------------------------------------------------------
+
+
+def _plain_text(rich_text: list) -> str:
+    return "".join(
+        item.get("plain_text", (item.get("text") or {}).get("content", ""))
+        for item in rich_text or []
+    )
+
+
+def key_of(type_: str, value: Any) -> Optional[str]:
+    "The plain value of a key property, or `None` if it is empty."
+    if type_ in RICH_TEXT_TYPES:
+        key = _plain_text(value)
+    elif type_ in ("select", "status"):
+        key = value["name"] if value else None
+    elif type_ == "unique_id":
+        key = f"{value.get('prefix') or ''}{value['number']}" if value else None
+    elif type_ == "formula":
+        key = value.get(value.get("type")) if value else None
+    else:
+        key = value
+    return None if key in (None, "") else str(key)
+
+
+def property_value(type_: str, value: Any) -> dict:
+    """The API value of a property of type `type_` set to `value`.
+
+    Dicts are taken as API values already, e.g. `{"rich_text": [...]}`. Strings, numbers,
+    booleans and lists are converted to the property's type.
+    """
+    if isinstance(value, dict):
+        return value
+    if hasattr(value, "to_json"):
+        value = value.to_json()
+        return value if isinstance(value, dict) else {type_: value}
+    if type_ in RICH_TEXT_TYPES:
+        text = "" if value is None else str(value)
+        return {type_: [{"type": "text", "text": {"content": text}}] if text else []}
+    if type_ in ("select", "status"):
+        return {type_: {"name": str(value)} if value not in (None, "") else None}
+    if type_ == "multi_select":
+        return {type_: [{"name": str(name)} for name in value or []]}
+    if type_ in ("people", "relation"):
+        return {type_: [{"id": item_id} for item_id in value or []]}
+    if type_ == "date":
+        return {type_: {"start": str(value)} if value else None}
+    return {type_: value}
+
+
+def _inner(type_: str, value: dict) -> Any:
+    return value[type_] if type_ in value else next(iter(value.values()))
+
+
+# ---------------------------------------------------------------------------
+# Index
+# ---------------------------------------------------------------------------
+
+
+class KeyIndex:
+    """In-memory index of the rows of a database by the value of a key property.
+
+    Params:
+        client: The `NotionClient` to query with.
+        database_id: The database to index.
+        key (optional): Name of the property identifying rows, e.g. a rich text property
+            holding IDs of another system. Empty keys are not indexed. If several rows
+            share a key, the most recently edited one is used.
+    """
+
+    def __init__(self, client, database_id: str, key: str = "External ID"):
+        self.client = client
+        self.database_id = database_id
+        self.key = key
+        self.entries: Dict[str, IndexedRow] = {}
+        self.last_edited_time: Optional[str] = None
+        self._keys_by_page: Dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, key) -> bool:
+        return str(key) in self.entries
+
+    def get(self, key) -> Optional[IndexedRow]:
+        return self.entries.get(str(key))
+
+    def _remove(self, page_id: str):
+        key = self._keys_by_page.pop(page_id, None)
+        if key is not None and self.entries[key].page_id == page_id:
+            del self.entries[key]
+
+    def update(self, data: dict):
+        "Add or update a row from page data returned by the API."
+        self._remove(data["id"])
+        if data.get("archived"):
+            return
+        if (
+            self.last_edited_time is None
+            or data["last_edited_time"] > self.last_edited_time
+        ):
+            self.last_edited_time = data["last_edited_time"]
+        prop = data["properties"].get(self.key)
+        key = key_of(prop["type"], prop.get(prop["type"])) if prop else None
+        if key is None:
+            return
+        current = self.entries.get(key)
+        if current and current.last_edited_time > data["last_edited_time"]:
+            return
+        if current:
+            self._keys_by_page.pop(current.page_id, None)
+        self.entries[key] = IndexedRow(
+            data["id"],
+            data["last_edited_time"],
+            {
+                name: comparable(value["type"], value.get(value["type"]))
+                for name, value in data["properties"].items()
+            },
+        )
+        self._keys_by_page[data["id"]] = key
+
+    def refresh(self, full: bool = False) -> int:
+        """Read rows edited since the last refresh, or all rows if `full` is set.
+
+        Returns the number of rows read.
+        """
+        since = None
+        if self.last_edited_time and not full:
+            since = parse_notion_datetime(self.last_edited_time) - REFRESH_OVERLAP
+
+        payload = {
+            "sorts": [{"timestamp": "last_edited_time", "direction": "descending"}]
+        }
+        seen = {}
+        for data in self.client._iter_paginate(
+            "post", f"databases/{self.database_id}/query", payload
+        ):
+            if since and parse_notion_datetime(data["last_edited_time"]) < since:
+                break
+            seen[data["id"]] = data
+
+        if full:
+            for page_id in set(self._keys_by_page) - set(seen):
+                self._remove(page_id)
+        # Oldest first, so the most recently edited of rows sharing a key wins.
+        for data in reversed(list(seen.values())):
+            self.update(data)
+        return len(seen)
+
+    # ---------------------------------------------------------------------------
+    # Persistence
+    # ---------------------------------------------------------------------------
+
+    def save(self, path: str):
+        "Store the index as JSON, so a later process can continue with `refresh()`."
+        data = {
+            "database_id": self.database_id,
+            "key": self.key,
+            "last_edited_time": self.last_edited_time,
+            "entries": {key: asdict(entry) for key, entry in self.entries.items()},
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+
+    @staticmethod
+    def load(client, path: str) -> "KeyIndex":
+        "Load an index stored with `save()`."
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        index = KeyIndex(client, data["database_id"], data["key"])
+        for key, entry in data["entries"].items():
+            index.entries[key] = IndexedRow(**entry)
+            index._keys_by_page[entry["page_id"]] = key
+        index.last_edited_time = data["last_edited_time"]
+        return index
+
+
+# ---------------------------------------------------------------------------
+# Upsert
+# ---------------------------------------------------------------------------
+
+
+def upsert_many(
+    client,
+    database_id: str,
+    rows: Iterable[dict],
+    key: str = "External ID",
+    index: Optional[KeyIndex] = None,
+    schema: Optional[dict] = None,
+) -> UpsertResult:
+    """Create a page for every row whose key isn't in the database yet and update the
+    properties that changed of the others.
+
+    Params:
+        rows: Dicts of property names to values, see `property_value()`. Every row needs a
+            value for `key`; if several rows share a key, the last one wins.
+        key (optional): Name of the property identifying rows.
+        index (optional): A `KeyIndex` kept between calls, which is refreshed instead of
+            reading the whole database again.
+        schema (optional): The database's `properties`, fetched if not given.
+    """
+    if index is None:
+        index = KeyIndex(client, database_id, key)
+    elif index.key != key:
+        raise ValueError(f"The index is keyed by {index.key!r}, not {key!r}.")
+    if schema is None:
+        schema = client._make_request("get", f"databases/{database_id}")["properties"]
+    index.refresh()
+
+    def types_of(row: dict) -> Dict[str, str]:
+        types = {}
+        for name, value in row.items():
+            if name in schema:
+                definition = schema[name]
+                types[name] = definition.get("type") or next(iter(definition))
+            elif isinstance(value, dict):
+                types[name] = value.get("type") or next(iter(value))
+            else:
+                raise ValueError(f"The database has no property {name!r}.")
+        return types
+
+    desired = {}
+    for row in rows:
+        types = types_of(row)
+        properties = {
+            name: property_value(types[name], value) for name, value in row.items()
+        }
+        row_key = (
+            key_of(types[key], _inner(types[key], properties[key]))
+            if key in properties
+            else None
+        )
+        if row_key is None:
+            raise ValueError(f"Row has no value for the key {key!r}: {row!r}")
+        desired[row_key] = (properties, types)
+
+    result = UpsertResult()
+    creates = []
+    updates = {}
+    for row_key, (properties, types) in desired.items():
+        entry = index.get(row_key)
+        if entry is None:
+            creates.append(
+                {"parent": {"database_id": database_id}, "properties": properties}
+            )
+            continue
+        changed = {
+            name: value
+            for name, value in properties.items()
+            if comparable(types[name], _inner(types[name], value))
+            != entry.values.get(name)
+        }
+        if changed:
+            updates[entry.page_id] = {"properties": changed}
+        else:
+            result.unchanged += 1
+
+    for data in client.create_pages(creates):
+        index.update(data)
+    for data in client.update_pages(updates):
+        index.update(data)
+    result.created = len(creates)
+    result.updated = len(updates)
+    return result
@@ -0,0 +1,260 @@
+"""Share work like crawling or exporting a workspace between several worker processes.
+
+A `WorkQueue` holds items identified by a key, e.g. the IDs of pages to visit. Workers lease
+items, process them with their own `NotionClient` (and token), and report them as completed
+or failed:
+
+    queue = SQLiteWorkQueue("work.db")
+    queue.put([(page_id, {"type": "page"})])
+    for lease in queue.lease("worker-1", count=10):
+        ...
+        queue.complete(lease)
+
+Items are added at most once, so many workers can report the same discovered pages without
+processing them twice. A lease expires after `lease_duration` seconds unless it is renewed,
+and items of expired leases are stolen by the next worker asking for work, so the items of
+a crashed or stuck worker are processed by the others. A worker that lost its lease can't
+complete the item anymore. Failed items are leased again until they failed `max_attempts`
+times, and so are items whose lease expired: an item that crashes or stalls every worker
+counts as failed once its last lease expires.
+
+`SQLiteWorkQueue` coordinates processes through a SQLite database, on one host or on hosts
+sharing storage whose file locking works reliably with SQLite. Lease expiry compares wall
+clock times, so the clocks of different hosts should be synchronized.
+"""
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+STATES = (PENDING, LEASED, DONE, FAILED)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    key TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    state TEXT NOT NULL,
+    worker TEXT,
+    lease_token TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    position INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS items_state ON items (state, position);
+-- Lets `put` find the next position without scanning the table.
+CREATE INDEX IF NOT EXISTS items_position ON items (position);
+"""
+
+
+@dataclass
+class Lease:
+    key: str
+    data: dict
+    worker: str
+    token: str
+    expires: float
+    attempts: int
+
+
+class WorkQueue(ABC):
+    "Interface of work queues, see the module docs."
+
+    @abstractmethod
+    def put(self, items: Iterable[Tuple[str, dict]]) -> int:
+        "Add `(key, data)` items that weren't added before. Returns the number added."
+        pass
+
+    @abstractmethod
+    def lease(
+        self, worker: str, count: int = 1, duration: Optional[float] = None
+    ) -> List[Lease]:
+        "Lease up to `count` pending items, or items whose lease expired, oldest first."
+        pass
+
+    @abstractmethod
+    def renew(self, lease: Lease, duration: Optional[float] = None) -> bool:
+        "Extend a lease. Returns `False` if it expired and was stolen by another worker."
+        pass
+
+    @abstractmethod
+    def complete(self, lease: Lease) -> bool:
+        "Mark a leased item as done. Returns `False` if the lease was lost."
+        pass
+
+    @abstractmethod
+    def fail(self, lease: Lease, error: str) -> bool:
+        "Give a leased item back to be retried, or mark it as failed after too many attempts."
+        pass
+
+    @abstractmethod
+    def counts(self) -> Dict[str, int]:
+        "Number of items per state."
+        pass
+
+    def finished(self) -> bool:
+        "Whether no item is pending or leased anymore."
+        counts = self.counts()
+        return counts[PENDING] == counts[LEASED] == 0
+
+
+class SQLiteWorkQueue(WorkQueue):
+    """Work queue stored in a SQLite database shared by all workers.
+
+    Params:
+        path: SQLite database file, created if it doesn't exist.
+        lease_duration (optional): Seconds until a lease expires unless it is renewed.
+        max_attempts (optional): Times an item is leased before it counts as failed.
+        busy_timeout (optional): Seconds to wait for other workers holding the database lock.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        lease_duration: float = 300.0,
+        max_attempts: int = 3,
+        busy_timeout: float = 30.0,
+    ):
+        self.path = str(path)
+        self.lease_duration = lease_duration
+        self.max_attempts = max_attempts
+        # Transactions are managed explicitly, so a lease can take the write lock up front.
+        self.connection = sqlite3.connect(
+            self.path,
+            timeout=busy_timeout,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        if self.path != ":memory:":
+            self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self):
+        self.connection.close()
+
+    def _write(self, func, *args):
+        "Run `func(*args)` in a transaction holding the database's write lock."
+        with self._lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                result = func(*args)
+            except BaseException:
+                self.connection.execute("ROLLBACK")
+                raise
+            self.connection.execute("COMMIT")
+            return result
+
+    def put(self, items: Iterable[Tuple[str, dict]]) -> int:
+        rows = [(key, json.dumps(data)) for key, data in items]
+        if not rows:
+            return 0
+
+        def insert():
+            before = self.connection.total_changes
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO items (key, data, state, position) "
+                "VALUES (?, ?, 'pending', "
+                "(SELECT coalesce(max(position), 0) + 1 FROM items))",
+                rows,
+            )
+            return self.connection.total_changes - before
+
+        return self._write(insert)
+
+    def lease(
+        self, worker: str, count: int = 1, duration: Optional[float] = None
+    ) -> List[Lease]:
+        now = time.time()
+        expires = now + (duration if duration is not None else self.lease_duration)
+
+        def take():
+            # Items that were leased too often without being reported are given up on.
+            self.connection.execute(
+                "UPDATE items SET state = 'failed', error = 'Lease expired.', "
+                "lease_token = NULL, lease_expires = NULL "
+                "WHERE state = 'leased' AND lease_expires <= ? AND attempts >= ?",
+                (now, self.max_attempts),
+            )
+            rows = self.connection.execute(
+                "SELECT key, data, attempts FROM items "
+                "WHERE state = 'pending' OR (state = 'leased' AND lease_expires <= ?) "
+                "ORDER BY position LIMIT ?",
+                (now, count),
+            ).fetchall()
+            leases = []
+            for key, data, attempts in rows:
+                lease = Lease(
+                    key,
+                    json.loads(data),
+                    worker,
+                    uuid.uuid4().hex,
+                    expires,
+                    attempts + 1,
+                )
+                self.connection.execute(
+                    "UPDATE items SET state = 'leased', worker = ?, lease_token = ?, "
+                    "lease_expires = ?, attempts = ? WHERE key = ?",
+                    (worker, lease.token, expires, lease.attempts, key),
+                )
+                leases.append(lease)
+            return leases
+
+        return self._write(take)
+
+    def _update_lease(self, lease: Lease, assignments: str, parameters: tuple) -> bool:
+        def update():
+            cursor = self.connection.execute(
+                f"UPDATE items SET {assignments} "
+                "WHERE key = ? AND state = 'leased' AND lease_token = ?",
+                parameters + (lease.key, lease.token),
+            )
+            return cursor.rowcount == 1
+
+        return self._write(update)
+
+    def renew(self, lease: Lease, duration: Optional[float] = None) -> bool:
+        expires = time.time() + (
+            duration if duration is not None else self.lease_duration
+        )
+        if not self._update_lease(lease, "lease_expires = ?", (expires,)):
+            return False
+        lease.expires = expires
+        return True
+
+    def complete(self, lease: Lease) -> bool:
+        return self._update_lease(
+            lease, "state = 'done', lease_token = NULL, lease_expires = NULL", ()
+        )
+
+    def fail(self, lease: Lease, error: str) -> bool:
+        state = FAILED if lease.attempts >= self.max_attempts else PENDING
+        return self._update_lease(
+            lease,
+            "state = ?, error = ?, lease_token = NULL, lease_expires = NULL",
+            (state, error),
+        )
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT state, count(*) FROM items GROUP BY state"
+            ).fetchall()
+        return {**dict.fromkeys(STATES, 0), **dict(rows)}
+
+    def failures(self) -> List[Tuple[str, dict, str]]:
+        "Key, data and last error of the items that failed too often."
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT key, data, error FROM items WHERE state = 'failed' "
+                "ORDER BY position"
+            ).fetchall()
+        return [(key, json.loads(data), error) for key, data, error in rows]
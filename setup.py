@@ -10,4 +10,10 @@ setup(
     license="MIT",
     packages=["notion"],
     install_requires=["requests==2.28.0"],
+    extras_require={
+        "orjson": ["orjson>=3.6"],
+        "msgspec": ["msgspec>=0.9"],
+        "httpx": ["httpx[http2]>=0.23"],
+        "markdown": ["markdown-it-py>=2.0"],
+    },
 )
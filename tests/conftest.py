@@ -0,0 +1,19 @@
+import pytest
+
+from notion.testing import NotionEmulator
+
+
+@pytest.fixture
+def emulator():
+    with NotionEmulator() as emulator:
+        yield emulator
+
+
+@pytest.fixture
+def client(emulator):
+    return emulator.client()
+
+
+@pytest.fixture
+def page(emulator, client):
+    return client.get_page(emulator.add_page("Playground")["id"])
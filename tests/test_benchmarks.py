@@ -0,0 +1,17 @@
+from benchmarks.model import build_benchmarks, compare
+
+
+def test_benchmarks_run():
+    "Every benchmark must keep running against the recorded payloads."
+    for name, benchmark in build_benchmarks().items():
+        assert benchmark() is not None, name
+
+
+def test_compare_flags_regressions():
+    baseline = {"decode_pages": {"time_us": 10.0, "peak_kib": 10.0}}
+    results = {"decode_pages": {"time_us": 16.0, "peak_kib": 10.5}}
+
+    regressions = compare(results, baseline, time_tolerance=0.5, memory_tolerance=0.1)
+
+    assert len(regressions) == 1
+    assert regressions[0].startswith("decode_pages: time_us")
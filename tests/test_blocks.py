@@ -0,0 +1,46 @@
+from notion.model import block as blocks
+
+
+def test_block_types_are_cached_on_the_class():
+    assert blocks.Paragraph.type == "paragraph"
+    assert blocks.HeadingOne("Heading").type == "heading_1"
+    assert blocks.Paragraph("Text").to_json()["type"] == "paragraph"
+
+
+def test_block_class_from_type_name():
+    assert blocks.block_class_from_type_name("to_do") is blocks.ToDo
+    assert blocks.block_class_from_type_name("table_row") is blocks.TableRow
+
+
+def test_unknown_block_type_falls_back_to_generic_block():
+    data = {"object": "block", "id": "1", "type": "audio", "audio": {"caption": []}}
+
+    block_class = blocks.block_class_from_type_name("audio")
+    block = block_class(data=data)
+
+    assert block_class is blocks.GenericBlock
+    assert block.type == "audio"
+    assert block.content == {"caption": []}
+
+
+def test_registering_a_new_block_type():
+    @blocks.register_block_type("test_only_block")
+    class TestOnlyBlock(blocks.Block):
+        pass
+
+    try:
+        assert blocks.block_class_from_type_name("test_only_block") is TestOnlyBlock
+        assert TestOnlyBlock.type == "test_only_block"
+    finally:
+        del blocks.BLOCK_TYPES["test_only_block"]
+
+
+def test_table_row_cells():
+    row = blocks.TableRow(["x" * 2500, ""])
+    assert [len(cell) for cell in row.to_json()["table_row"]["cells"]] == [2, 1]
+
+    row._data["table_row"]["cells"][1] = [
+        {"type": "mention", "mention": {"type": "user"}, "plain_text": ""},
+        {"type": "equation", "equation": {"expression": "x"}, "plain_text": "x"},
+    ]
+    assert row.cells == ["x" * 2500, "x"]
@@ -0,0 +1,47 @@
+import pytest
+
+from notion import NotionClient
+from notion.cassette import CassetteMismatchError, ReplayTransport
+from notion.model import block as blocks
+from notion.testing import NotionEmulator
+
+
+def record_workload(client, page_id):
+    page = client.get_page(page_id)
+    page.append_children([blocks.Paragraph("First"), blocks.Paragraph("Second")])
+    return [result.title for result in client.search("")], [
+        child.text for child in page.children
+    ]
+
+
+def test_recording_and_replaying(tmp_path):
+    path = tmp_path / "workload.jsonl.gz"
+    with NotionEmulator() as emulator:
+        page_id = emulator.add_page("Playground")["id"]
+        for i in range(120):
+            emulator.add_page(f"Page {i}")
+        client = emulator.client()
+        with client.record(path) as cassette:
+            recorded = record_workload(client, page_id)
+
+    replay = ReplayTransport(path, speed=100)
+    replayed = record_workload(NotionClient("", transport=replay), page_id)
+
+    # The search results span two pages, so the recording has to follow the cursor.
+    assert len(recorded[0]) == 121
+    assert replayed == recorded
+    assert replay.remaining == 0
+    assert all("secret" not in str(i) for i in cassette.interactions)
+
+
+def test_replaying_unknown_request(tmp_path):
+    path = tmp_path / "empty.jsonl"
+    with NotionEmulator() as emulator:
+        client = emulator.client()
+        with client.record(path):
+            client.search("")
+
+    client = NotionClient("", transport=ReplayTransport(path))
+    client.search("")
+    with pytest.raises(CassetteMismatchError):
+        client.search("")
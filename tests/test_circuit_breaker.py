@@ -0,0 +1,61 @@
+import time
+
+import pytest
+
+from notion.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from notion.errors import CircuitOpenError, NotionAPIError
+from notion.testing import NotionEmulator
+
+
+def test_circuit_opens_probes_and_closes():
+    breaker = CircuitBreaker(minimum_requests=4, open_duration=0.05, half_open_probes=2)
+    for success in (True, True, False):
+        breaker.allow("pages")
+        assert breaker.record("pages", success) is None
+    breaker.allow("pages")
+    assert breaker.record("pages", False) == OPEN
+
+    with pytest.raises(CircuitOpenError) as error:
+        breaker.allow("pages")
+    assert error.value.family == "pages"
+    assert breaker.state("blocks") == CLOSED
+
+    time.sleep(0.05)
+    assert breaker.allow("pages") == HALF_OPEN
+    breaker.allow("pages")
+    with pytest.raises(CircuitOpenError):
+        breaker.allow("pages")
+    assert breaker.record("pages", True) is None
+    assert breaker.record("pages", True) == CLOSED
+
+
+def test_failed_probe_reopens_the_circuit():
+    breaker = CircuitBreaker(minimum_requests=1, open_duration=0.05)
+    breaker.allow("search")
+    breaker.record("search", False)
+    time.sleep(0.05)
+
+    breaker.allow("search")
+    assert breaker.record("search", False) == OPEN
+    assert breaker.state("search") == OPEN
+
+
+def test_client_fails_fast_while_the_circuit_is_open():
+    with NotionEmulator() as emulator:
+        page_id = emulator.add_page("Playground")["id"]
+        breaker = CircuitBreaker(minimum_requests=3, open_duration=60)
+        client = emulator.client(circuit_breaker=breaker, max_retries=0)
+        states = []
+        client.hooks.register("circuit", lambda e: states.append((e.endpoint, e.state)))
+
+        emulator.fail_next(500, 500, 500)
+        for _ in range(3):
+            with pytest.raises(NotionAPIError):
+                client.get_page(page_id)
+        sent_requests = len(emulator.request_log)
+
+        with pytest.raises(CircuitOpenError):
+            client.get_page(page_id)
+        assert len(emulator.request_log) == sent_requests
+        assert states == [("pages", OPEN)]
+        assert client.search("Playground")
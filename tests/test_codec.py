@@ -0,0 +1,38 @@
+import pytest
+
+from notion.codec import JSONCodec, get_codec
+from notion.model.common.utils import UUIDv4
+
+PAYLOAD = {
+    "parent": {
+        "type": "page_id",
+        "page_id": UUIDv4("a1b2c3d4-1234-5678-9abc-def012345678"),
+    },
+    "properties": {"title": {"title": [{"text": {"content": "Grüße ⭐"}}]}},
+    "archived": False,
+    "count": 3,
+}
+
+
+@pytest.mark.parametrize("name", ["json", "orjson", "msgspec"])
+def test_codec_round_trip(name):
+    try:
+        codec = get_codec(name)
+    except ImportError:
+        pytest.skip(f"{name} is not installed")
+
+    encoded = codec.dumps(PAYLOAD)
+
+    assert isinstance(encoded, bytes)
+    assert codec.loads(encoded) == PAYLOAD
+
+
+def test_get_codec_accepts_custom_codec():
+    codec = JSONCodec()
+
+    assert get_codec(codec) is codec
+
+
+def test_get_codec_rejects_unknown_name():
+    with pytest.raises(ValueError):
+        get_codec("yaml")
@@ -0,0 +1,77 @@
+import pytest
+
+from notion.concurrency import AdaptiveConcurrency
+from notion.metrics import MetricsCollector
+from notion.scheduling import BULK, Scheduler
+
+
+def test_limit_grows_while_healthy_and_halves_on_congestion():
+    scheduler = Scheduler()
+    concurrency = AdaptiveConcurrency(scheduler, initial_limit=4, max_limit=8)
+
+    for _ in range(20):
+        concurrency.observe(0.1)
+    assert concurrency.limit > 6
+    assert scheduler.classes[BULK].max_concurrency == int(concurrency.limit)
+
+    limit = concurrency.limit
+    concurrency.decrease()
+    assert concurrency.limit == pytest.approx(limit / 2)
+
+    concurrency._last_decrease = 0
+    concurrency.observe(1.0)
+    assert concurrency.limit == pytest.approx(limit / 4)
+
+
+def text_block(type_, text, children=()):
+    content = {"rich_text": [{"type": "text", "text": {"content": text}}]}
+    if children:
+        content["children"] = list(children)
+    return {"object": "block", "type": type_, type_: content}
+
+
+def test_bulk_operations(emulator, client):
+    parent_id = emulator.add_page("Playground")["id"]
+    metrics = MetricsCollector().attach(client)
+
+    pages = client.create_pages(
+        {
+            "parent": {"page_id": parent_id},
+            "properties": {"title": {"title": [{"text": {"content": f"Page {i}"}}]}},
+        }
+        for i in range(10)
+    )
+    client.delete_pages(page["id"] for page in pages[:5])
+
+    assert all(emulator.objects[page["id"]]["archived"] for page in pages[:5])
+    assert not any(emulator.objects[page["id"]]["archived"] for page in pages[5:])
+    bulk = metrics.snapshot()["priorities"][BULK]
+    assert bulk["throughput"] > 0
+    assert bulk["concurrency_limit"] >= 1
+    assert 'notion_client_concurrency_limit{priority="bulk"}' in metrics.to_prometheus()
+
+
+def test_retrieve_block_tree(emulator, client):
+    page_id = emulator.add_page("Playground")["id"]
+    client.append_block_children(
+        page_id,
+        [
+            text_block(
+                "toggle",
+                "Outer",
+                [text_block("toggle", "Inner", [text_block("paragraph", "Leaf")])],
+            ),
+            text_block("paragraph", "Sibling"),
+        ],
+    )
+
+    tree = client.retrieve_block_tree(page_id)
+
+    outer, sibling = tree
+    inner = outer["toggle"]["children"][0]
+    assert inner["toggle"]["children"][0]["paragraph"]["rich_text"][0][
+        "plain_text"
+    ] == ("Leaf")
+    assert "children" not in sibling["paragraph"]
+    shallow_tree = client.retrieve_block_tree(page_id, max_depth=1)
+    assert "children" not in shallow_tree[0]["toggle"]
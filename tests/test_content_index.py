@@ -0,0 +1,86 @@
+import pytest
+
+from notion.content_index import ContentIndex
+
+
+def rich_text_block(type_, text, children=()):
+    content = {"rich_text": [{"type": "text", "text": {"content": text}}]}
+    if children:
+        content["children"] = list(children)
+    return {"type": type_, type_: content}
+
+
+def table_row(*cells):
+    return {
+        "type": "table_row",
+        "table_row": {
+            "cells": [[{"type": "text", "text": {"content": c}}] for c in cells]
+        },
+    }
+
+
+@pytest.fixture
+def page(page, client):
+    client.append_block_children(
+        page.id,
+        [
+            rich_text_block("heading_1", "Quarterly planning"),
+            rich_text_block("paragraph", "We plan the next quarter together."),
+            rich_text_block(
+                "toggle",
+                "Details",
+                [rich_text_block("to_do", "Book the meeting room for planning")],
+            ),
+            {
+                "type": "table",
+                "table": {
+                    "table_width": 2,
+                    "children": [table_row("Budget", "Approved")],
+                },
+            },
+        ],
+    )
+    return page
+
+
+def test_index_and_search(page):
+    index = ContentIndex()
+    assert index.index_page(page) == 6
+
+    matches = index.search("planning")
+    assert {match.type for match in matches} == {"heading_1", "to_do"}
+    assert matches[0].page_id == page.id
+    assert "[planning]" in matches[0].snippet.lower()
+    assert [match.type for match in index.search("budget approved")] == ["table_row"]
+    assert index.search("plan*", raw=True)
+    assert index.search("nonexistent") == []
+
+
+def test_incremental_updates(page):
+    index = ContentIndex()
+    index.index_page(page)
+    paragraph = page.children[1]
+
+    assert not index.index_block(paragraph, page.id)
+    paragraph.text = "Retrospective notes"
+    assert index.index_block(page.children[1], page.id)
+    assert index.search("retrospective")
+    assert not index.search("quarter")
+
+    page.children[0].delete()
+    assert index.index_page(page) == 5
+    assert len(index) == 5
+    assert [match.type for match in index.search("planning")] == ["to_do"]
+
+
+def test_edits_within_the_same_minute_are_indexed(page):
+    index = ContentIndex()
+    index.index_page(page)
+    paragraph = page.children[1]
+
+    # Edited within the same minute, so `last_edited_time` stays the same.
+    paragraph._data["paragraph"]["rich_text"] = [
+        {"type": "text", "text": {"content": "Retrospective notes"}}
+    ]
+    assert index.index_block(paragraph, page.id)
+    assert index.search("retrospective")
@@ -0,0 +1,164 @@
+import json
+import threading
+import time
+
+import pytest
+
+from notion.crawler import Crawler
+from notion.work_queue import SQLiteWorkQueue
+
+
+@pytest.fixture
+def workspace(emulator):
+    "A root page with a child page, a database with two rows, and a toggle linking out."
+    client = emulator.client()
+    root_id = emulator.add_page("Root")["id"]
+    other_id = emulator.add_page("Other")["id"]
+    child_id = emulator.add_page("Child", parent_id=root_id)["id"]
+    database = client._make_request(
+        "post",
+        "databases",
+        {
+            "parent": {"page_id": root_id},
+            "title": [{"text": {"content": "Tasks"}}],
+            "properties": {"Name": {"title": {}}},
+        },
+    )
+    row_ids = [
+        emulator.add_page(f"Task {i}", parent_id=database["id"])["id"] for i in range(2)
+    ]
+    grandchild_id = emulator.add_page("Grandchild", parent_id=child_id)["id"]
+    client.append_block_children(
+        child_id,
+        [
+            {
+                "toggle": {
+                    "rich_text": [{"text": {"content": "Links"}}],
+                    "children": [
+                        {"link_to_page": {"type": "page_id", "page_id": other_id}},
+                        {"link_to_page": {"type": "page_id", "page_id": root_id}},
+                    ],
+                }
+            }
+        ],
+    )
+    return {
+        "root": root_id,
+        "other": other_id,
+        "child": child_id,
+        "database": database["id"],
+        "rows": row_ids,
+        "grandchild": grandchild_id,
+    }
+
+
+def test_crawl_from_page(emulator, workspace):
+    crawled = list(Crawler(emulator.client(), roots=[workspace["root"]]).crawl())
+
+    depths = {obj.id: obj.depth for obj in crawled}
+    assert len(crawled) == len(depths) == 7
+    assert depths[workspace["root"]] == 0
+    assert depths[workspace["child"]] == depths[workspace["database"]] == 1
+    assert depths[workspace["other"]] == depths[workspace["grandchild"]] == 2
+    assert all(depths[row_id] == 2 for row_id in workspace["rows"])
+    assert [obj.depth for obj in crawled] == sorted(obj.depth for obj in crawled)
+
+
+def test_crawl_from_workspace_root(emulator, workspace):
+    crawler = Crawler(emulator.client())
+    roots = {obj.id for obj in crawler.crawl() if obj.depth == 0}
+    assert roots == {workspace["root"], workspace["other"]}
+    assert len(crawler.seen) == 7
+
+
+def test_limits(emulator, workspace):
+    client = emulator.client()
+    crawled = Crawler(client, roots=[workspace["root"]], max_depth=1).crawl()
+    assert {obj.id for obj in crawled} == {
+        workspace["root"],
+        workspace["child"],
+        workspace["database"],
+    }
+
+    crawled = Crawler(client, roots=[workspace["root"]], types=["page"]).crawl()
+    assert {obj.type for obj in crawled} == {"page"}
+
+
+def test_resume_from_checkpoint(emulator, workspace, tmp_path):
+    checkpoint = tmp_path / "crawl.json"
+    crawler = Crawler(
+        emulator.client(),
+        roots=[workspace["root"]],
+        batch_size=1,
+        checkpoint=checkpoint,
+    )
+    crawl = crawler.crawl()
+    first = [next(crawl), next(crawl)]
+    crawl.close()
+
+    state = json.loads(checkpoint.read_text())
+    assert state["frontier"] and state["seen"] > len(first)
+
+    resumed = Crawler(emulator.client(), roots=[], checkpoint=checkpoint)
+    rest = list(resumed.crawl())
+    assert not {obj.id for obj in first} & {obj.id for obj in rest}
+    assert len({obj.id for obj in first + rest}) == 7
+    assert not json.loads(checkpoint.read_text())["frontier"]
+
+
+def test_resume_in_the_middle_of_a_batch(emulator, tmp_path):
+    root_id = emulator.add_page("Root")["id"]
+    for i in range(5):
+        emulator.add_page(f"Child {i}", parent_id=root_id)
+    checkpoint = tmp_path / "crawl.json"
+
+    crawl = Crawler(emulator.client(), roots=[root_id], checkpoint=checkpoint).crawl()
+    first = [next(crawl), next(crawl)]
+    crawl.close()
+
+    resumed = Crawler(emulator.client(), roots=[], checkpoint=checkpoint)
+    rest = [obj.id for obj in resumed.crawl()]
+    assert len(rest) == len(set(rest)) == 4
+    assert not {obj.id for obj in first} & set(rest)
+
+
+def test_distributed_crawl(emulator, workspace, tmp_path):
+    def work(worker):
+        queue = SQLiteWorkQueue(tmp_path / "crawl.db")
+        crawler = Crawler(emulator.client(), roots=[workspace["root"]], batch_size=2)
+        results[worker] = [obj.id for obj in crawler.work(queue, worker, 0.01)]
+        queue.close()
+
+    results = {}
+    workers = [threading.Thread(target=work, args=(f"w{i}",)) for i in range(3)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+
+    crawled = [object_id for ids in results.values() for object_id in ids]
+    assert len(crawled) == len(set(crawled)) == 7
+
+
+def test_slow_batches_keep_their_leases(emulator, workspace, tmp_path):
+    visited = []
+
+    class SlowCrawler(Crawler):
+        def _visit(self, task):
+            visited.append(task.key)
+            time.sleep(0.2)
+            return super()._visit(task)
+
+    def work(worker):
+        queue = SQLiteWorkQueue(tmp_path / "crawl.db", lease_duration=0.1)
+        crawler = SlowCrawler(emulator.client(), roots=[workspace["root"]])
+        list(crawler.work(queue, worker, 0.01))
+        queue.close()
+
+    workers = [threading.Thread(target=work, args=(f"w{i}",)) for i in range(2)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+
+    assert len(visited) == len(set(visited)) == 7
@@ -0,0 +1,44 @@
+import time
+
+import pytest
+
+from notion.errors import DeadlineExceeded
+from notion.testing import NotionEmulator
+from notion.transport import RequestsTransport
+
+
+def test_stalled_requests_time_out():
+    with NotionEmulator(latency=0.5) as emulator:
+        page_id = emulator.add_page("Playground")["id"]
+        client = emulator.client(timeout=0.05, max_retries=0)
+        start_time = time.monotonic()
+
+        with pytest.raises(RequestsTransport.errors):
+            client.get_page(page_id)
+        assert time.monotonic() - start_time < 0.4
+
+
+def test_deadline_cuts_requests_in_flight_short():
+    with NotionEmulator(latency=0.5) as emulator:
+        page_id = emulator.add_page("Playground")["id"]
+        client = emulator.client()
+        start_time = time.monotonic()
+
+        with pytest.raises(DeadlineExceeded):
+            with client.deadline(0.1):
+                client.get_page(page_id)
+        assert time.monotonic() - start_time < 0.4
+
+
+def test_deadline_stops_bulk_operations():
+    with NotionEmulator(latency=0.02) as emulator:
+        page_ids = [emulator.add_page(f"Page {i}")["id"] for i in range(40)]
+        client = emulator.client()
+        client.concurrency.max_limit = 1
+
+        with pytest.raises(DeadlineExceeded):
+            with client.deadline(0.1):
+                client.delete_pages(page_ids)
+
+        archived = sum(emulator.objects[page_id]["archived"] for page_id in page_ids)
+        assert 0 < archived < 20
@@ -0,0 +1,51 @@
+import pytest
+
+from notion.model import block as blocks
+from notion.model.common.parent import Parent, ParentPage
+from notion.model.common.utils import UUIDv4
+from notion.model.page import Page
+
+PAGE_ID = "a1b2c3d4-1234-5678-9abc-def012345678"
+PAGE_DATA = {
+    "object": "page",
+    "id": "b2c3d4e5-2345-6789-abcd-ef0123456789",
+    "parent": {"type": "page_id", "page_id": PAGE_ID},
+    "properties": {"title": {"type": "title", "title": [{"plain_text": "Page"}]}},
+}
+
+
+def test_trusted_page_skips_init():
+    page = Page._from_trusted_json(PAGE_DATA, client="client")
+
+    assert page._data is PAGE_DATA
+    assert page._client == "client"
+    assert page.title == "Page"
+
+
+def test_trusted_parent_is_not_validated():
+    data = {"parent": {"type": "block_id", "block_id": "not-a-notion-id"}}
+
+    assert Parent.from_json(data, trusted=True).id == "not-a-notion-id"
+    with pytest.raises(ValueError):
+        Parent.from_json({"parent": {"type": "page_id", "page_id": "not-an-id"}})
+
+
+def test_trusted_parent_matches_strict_parent():
+    trusted_parent = Page._from_trusted_json(PAGE_DATA).parent
+
+    assert isinstance(trusted_parent, ParentPage)
+    assert isinstance(trusted_parent.id, UUIDv4)
+    assert trusted_parent.to_json() == Page.from_json(PAGE_DATA).parent.to_json()
+
+
+def test_block_from_json():
+    data = {
+        "object": "block",
+        "type": "code",
+        "code": {"rich_text": [{"text": {"content": "x"}}], "language": "python"},
+    }
+
+    for trusted in (True, False):
+        block = blocks.block_from_json(data, trusted=trusted)
+        assert isinstance(block, blocks.Code)
+        assert block.language == "python"
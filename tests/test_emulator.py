@@ -0,0 +1,135 @@
+import io
+
+import pytest
+
+import notion.model.databases.properties as prop
+from notion.model import block as blocks
+from notion.model import filters
+from notion.model.databases.database import Database
+from notion.model.page import Page
+
+
+def test_getting_a_page(page):
+    assert page.title == "Playground"
+    assert page.archived is False
+
+
+def test_querying_a_database(client, page):
+    todo_db = Database(title="ToDo List", properties={"Done": prop.Checkbox}).create(
+        client, page.id
+    )
+    todo_db += Page("Item 1")
+    todo_db += Page("Item 2", properties={"Done": prop.Checkbox(True)})
+    todo_db += Page("Item 3")
+
+    open_tasks = todo_db.query(filters.Checkbox("Done").equals(False))
+    sorted_tasks = client.query_database(
+        todo_db.id, sort={"sorts": [{"property": "Name", "direction": "descending"}]}
+    )
+
+    assert sorted(task.title for task in open_tasks) == ["Item 1", "Item 3"]
+    assert [task.title for task in sorted_tasks] == ["Item 3", "Item 2", "Item 1"]
+
+
+def test_block_children_are_paginated(emulator, page):
+    page.append_children([blocks.Paragraph(f"Paragraph {i}") for i in range(3)])
+
+    path = f"blocks/{page.id}/children"
+    _, _, first = emulator.handle("GET", path, {"page_size": "2"}, None, "token")
+    _, _, rest = emulator.handle(
+        "GET", path, {"start_cursor": first["next_cursor"]}, None, "token"
+    )
+
+    assert first["has_more"] is True
+    assert len(first["results"]) == 2
+    assert rest["has_more"] is False
+    assert (
+        rest["results"][0]["paragraph"]["rich_text"][0]["plain_text"] == "Paragraph 2"
+    )
+
+    # Cursors stay valid when the list shifts between pages.
+    page.children[0].delete()
+    _, _, shifted = emulator.handle(
+        "GET", path, {"start_cursor": first["next_cursor"]}, None, "token"
+    )
+    assert shifted["results"] == rest["results"]
+
+
+def test_batched_and_positional_inserts(emulator, page):
+    emulator.request_log.clear()
+    first, last = page.append_children(
+        [blocks.Paragraph("First"), blocks.Paragraph("Last")]
+    )
+    assert len(emulator.request_log) == 1
+
+    emulator.request_log.clear()
+    page.insert_after(
+        first["id"], [blocks.Paragraph(f"Middle {i}") for i in range(150)]
+    )
+    assert len(emulator.request_log) == 2
+
+    texts = [child.text for child in page.children]
+    assert texts == ["First"] + [f"Middle {i}" for i in range(150)] + ["Last"]
+
+
+def test_streaming_tables(emulator, page):
+    csv_file = io.StringIO(
+        "Name,Value\n" + "".join(f"row {i},{i}\n" for i in range(249)) + "short\n"
+    )
+    emulator.request_log.clear()
+    table = blocks.Table.load_csv(page, csv_file)
+
+    assert len(emulator.request_log) == 3
+    assert table._data["table"]["has_column_header"]
+    assert len(page.children) == 1
+
+    emulator.request_log.clear()
+    rows = table.iter_cells(page_size=50)
+    assert next(rows) == ["Name", "Value"]
+    assert len(emulator.request_log) == 1
+    cells = [["Name", "Value"]] + list(rows)
+    assert len(emulator.request_log) == 6
+    assert cells[1] == ["row 0", "0"]
+    assert cells[-1] == ["short", ""]
+    assert len(table.cells) == 251
+
+
+def test_table_with_too_wide_row_is_not_created(emulator, page):
+    rows = [["Name", "Value"]] + [[f"row {i}", i] for i in range(150)] + [[1, 2, 3]]
+    emulator.request_log.clear()
+    with pytest.raises(ValueError):
+        blocks.Table.load(page, iter(rows))
+
+    assert emulator.request_log == []
+    assert page.children == []
+
+
+def test_search_and_archive(client, page):
+    page.append_children(Page("Meeting Notes"))
+    child_page = page.children[0]
+
+    assert [result.title for result in client.search("meeting")] == ["Meeting Notes"]
+
+    child_page.delete()
+
+    assert client.search("meeting") == []
+    assert page.children == []
+
+
+def test_fault_injection(emulator):
+    client = emulator.client(max_retries=0)
+    emulator.fail_next(503)
+
+    with pytest.raises(ValueError, match="service_unavailable"):
+        client.search("")
+    assert client.search("") == []
+
+
+def test_rate_limit(emulator):
+    client = emulator.client(max_retries=0)
+    emulator.rate_limit = 1
+
+    client.search("")
+    with pytest.raises(ValueError, match="rate_limited"):
+        client.search("")
+    assert emulator.request_log[-1] == ("POST", "search", 429)
@@ -0,0 +1,144 @@
+import pytest
+import requests
+
+import notion.model.databases.properties as prop
+from notion.model.databases.database import Database
+from notion.transport import RequestsTransport
+
+
+class LosingTransport(RequestsTransport):
+    "Sends requests, but loses the next `lose` responses after the server applied them."
+
+    lose = 0
+    on_lose = None
+
+    def request(self, method, url, headers, body, timeout=None):
+        response = super().request(method, url, headers, body, timeout)
+        if self.lose:
+            self.lose -= 1
+            if self.on_lose:
+                self.on_lose()
+            raise requests.ConnectionError("Connection reset by peer.")
+        return response
+
+
+@pytest.fixture
+def transport():
+    return LosingTransport()
+
+
+@pytest.fixture
+def client(emulator, transport):
+    return emulator.client(transport=transport, retry_backoff=0)
+
+
+def page_data(parent: dict, title: str) -> dict:
+    return {
+        "parent": parent,
+        "properties": {"title": {"title": [{"text": {"content": title}}]}},
+    }
+
+
+def paragraph(text: str) -> dict:
+    return {
+        "type": "paragraph",
+        "paragraph": {"rich_text": [{"type": "text", "text": {"content": text}}]},
+    }
+
+
+def live_children(emulator, block_id):
+    _, _, result = emulator.handle(
+        "GET", f"blocks/{block_id}/children", {}, None, "token"
+    )
+    return result["results"]
+
+
+def test_retried_create_page_returns_the_applied_page(emulator, transport, client):
+    parent_id = emulator.add_page("Playground")["id"]
+    client.create_page(page_data({"page_id": parent_id}, "Duplicate"))
+    transport.lose = 1
+
+    page = client.create_page(page_data({"page_id": parent_id}, "Duplicate"))
+
+    children = live_children(emulator, parent_id)
+    assert len(children) == 2
+    assert page["id"] == children[1]["id"]
+
+
+def test_retried_create_page_in_database(emulator, transport, client):
+    parent_id = emulator.add_page("Playground")["id"]
+    database = Database(title="Tasks", properties={"Done": prop.Checkbox}).create(
+        client, parent_id
+    )
+    transport.lose = 1
+
+    page = client.create_page(page_data({"database_id": database.id}, "Task"))
+
+    pages = client.query_database(database.id)
+    assert [p.id for p in pages] == [page["id"]]
+
+
+def test_retried_create_page_ignores_rows_with_other_properties(
+    emulator, transport, client
+):
+    parent_id = emulator.add_page("Playground")["id"]
+    database = Database(title="Tasks", properties={"Done": prop.Checkbox}).create(
+        client, parent_id
+    )
+
+    def row(done: bool) -> dict:
+        data = page_data({"database_id": database.id}, "Task")
+        data["properties"]["Done"] = {"checkbox": done}
+        return data
+
+    # A concurrent create of a row with the same title, whose response isn't in yet.
+    transport.on_lose = lambda: emulator.client().create_page(row(False))
+    transport.lose = 1
+
+    page = client.create_page(row(True))
+
+    assert page["properties"]["Done"]["checkbox"] is True
+    assert len(client.query_database(database.id)) == 2
+
+
+def test_retried_create_database(emulator, transport, client):
+    parent_id = emulator.add_page("Playground")["id"]
+    transport.lose = 1
+
+    database = Database(title="Tasks", properties={"Done": prop.Checkbox}).create(
+        client, parent_id
+    )
+
+    children = live_children(emulator, parent_id)
+    assert [child["id"] for child in children] == [database.id]
+
+
+def test_retried_append_block_children(emulator, transport, client):
+    page_id = emulator.add_page("Playground")["id"]
+    transport.lose = 1
+
+    result = client.append_block_children(page_id, [paragraph("a"), paragraph("b")])
+
+    children = live_children(emulator, page_id)
+    assert [block["id"] for block in result["results"]] == [
+        block["id"] for block in children
+    ]
+    assert len(children) == 2
+
+
+def test_failed_write_is_retried(emulator, client):
+    parent_id = emulator.add_page("Playground")["id"]
+    emulator.fail_next(502)
+
+    client.create_page(page_data({"page_id": parent_id}, "Created once"))
+
+    assert len(live_children(emulator, parent_id)) == 1
+
+
+def test_writes_are_not_retried_without_idempotency(emulator, transport):
+    client = emulator.client(transport=transport, idempotent_writes=False)
+    parent_id = emulator.add_page("Playground")["id"]
+    transport.lose = 1
+
+    with pytest.raises(requests.ConnectionError):
+        client.create_page(page_data({"page_id": parent_id}, "Lost"))
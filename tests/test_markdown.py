@@ -0,0 +1,204 @@
+import io
+
+from notion.markdown import (
+    RENDERERS,
+    MarkdownExporter,
+    MarkdownImporter,
+    markdown_to_blocks,
+    rich_text_to_markdown,
+)
+from notion.model.block import BLOCK_TYPES
+
+
+def rich_text(text, **annotations):
+    return [{"type": "text", "text": {"content": text}, "annotations": annotations}]
+
+
+def block(type_, text=None, children=(), **content):
+    if text is not None:
+        content["rich_text"] = rich_text(text)
+    if children:
+        content["children"] = list(children)
+    return {"type": type_, type_: content}
+
+
+def test_all_block_types_have_renderers():
+    assert set(BLOCK_TYPES) <= set(RENDERERS)
+
+
+def test_rich_text():
+    text = (
+        rich_text("Plain *text* ")
+        + rich_text("bold ", bold=True)
+        + rich_text("x*y", code=True)
+    )
+    assert rich_text_to_markdown(text) == r"Plain \*text\* **bold** `x*y`"
+
+
+def test_export_page(emulator):
+    client = emulator.client()
+    page_id = emulator.add_page("Doc")["id"]
+    client.append_block_children(
+        page_id,
+        [
+            block("heading_1", "Title"),
+            block("bulleted_list_item", "a", [block("bulleted_list_item", "a1")]),
+            block("bulleted_list_item", "b"),
+            block("numbered_list_item", "one"),
+            block("numbered_list_item", "two"),
+            block("to_do", "done", checked=True),
+            block("quote", "q", [block("paragraph", "inner")]),
+            block("code", "print(1)", language="python"),
+            block("toggle", "More", [block("paragraph", "hidden")]),
+            block(
+                "table",
+                table_width=2,
+                has_column_header=True,
+                children=[
+                    {"table_row": {"cells": [rich_text("h1"), rich_text("h2")]}},
+                    {"table_row": {"cells": [rich_text("1"), rich_text("2")]}},
+                ],
+            ),
+            block("equation", expression="e=mc^2"),
+            block("divider"),
+            block("image", external={"url": "https://example.com/a.png"}),
+        ],
+    )
+
+    out = io.StringIO()
+    MarkdownExporter(client).export_page(client.get_page(page_id), out)
+    assert out.getvalue() == (
+        "# Doc\n\n# Title\n\n- a\n    - a1\n- b\n\n1. one\n2. two\n\n- [x] done\n\n"
+        "> q\n>\n> inner\n\n```python\nprint(1)\n```\n\n"
+        "<details>\n<summary>More</summary>\n\nhidden\n\n</details>\n\n"
+        "| h1 | h2 |\n| --- | --- |\n| 1 | 2 |\n\n$$\ne=mc^2\n$$\n\n---\n\n"
+        "![](https://example.com/a.png)\n"
+    )
+
+
+def test_export_streams_while_loading(emulator):
+    client = emulator.client()
+    page_id = emulator.add_page("Doc")["id"]
+    client.append_block_children(
+        page_id,
+        [block("toggle", f"Toggle {i}", [block("paragraph", "x")]) for i in range(20)],
+    )
+    requests_at_first_write = []
+
+    class Output(io.StringIO):
+        def write(self, text):
+            if not requests_at_first_write:
+                requests_at_first_write.append(len(emulator.request_log))
+            return super().write(text)
+
+    out = Output()
+    emulator.request_log.clear()
+    MarkdownExporter(client, prefetch=2).export(page_id, out)
+
+    assert out.getvalue().count("<details>") == 20
+    assert len(emulator.request_log) == 21
+    assert requests_at_first_write[0] <= 3
+
+
+DOCUMENT = """# Title
+
+Some **bold** and [linked](https://example.com) text.
+
+- [x] done
+- item
+    - nested
+
+1. one
+2. two
+
+> quote
+
+```py
+print(1)
+```
+
+| a | b |
+| --- | --- |
+| 1 | 2 |
+
+---
+"""
+
+
+def test_markdown_to_blocks():
+    blocks = markdown_to_blocks(DOCUMENT)
+    assert [block["type"] for block in blocks] == [
+        "heading_1",
+        "paragraph",
+        "to_do",
+        "bulleted_list_item",
+        "numbered_list_item",
+        "numbered_list_item",
+        "quote",
+        "code",
+        "table",
+        "divider",
+    ]
+    assert blocks[1]["paragraph"]["rich_text"][1] == {
+        "type": "text",
+        "text": {"content": "bold"},
+        "annotations": {"bold": True},
+    }
+    assert blocks[2]["to_do"]["checked"]
+    assert (
+        blocks[3]["bulleted_list_item"]["children"][0]["type"] == "bulleted_list_item"
+    )
+    assert blocks[7]["code"]["language"] == "python"
+    assert len(blocks[8]["table"]["children"]) == 2
+
+
+def test_long_text_is_split():
+    (block,) = markdown_to_blocks("x" * 4500)
+    assert [
+        len(item["text"]["content"]) for item in block["paragraph"]["rich_text"]
+    ] == [
+        2000,
+        2000,
+        500,
+    ]
+
+
+def test_import_round_trip(emulator):
+    client = emulator.client()
+    page_id = emulator.add_page("Doc")["id"]
+    importer = MarkdownImporter(client)
+    importer.import_markdown(page_id, DOCUMENT)
+
+    assert importer.requests == 1
+    exported = MarkdownExporter(client).to_markdown(page_id)
+    assert exported == DOCUMENT.replace("```py", "```python")
+
+
+def test_import_batches_requests(emulator):
+    client = emulator.client()
+    page_id = emulator.add_page("Doc")["id"]
+    deep_list = "\n".join("    " * depth + f"- level {depth}" for depth in range(5))
+    text = "\n\n".join([f"Paragraph {i}" for i in range(250)] + [deep_list])
+
+    importer = MarkdownImporter(client)
+    importer.import_markdown(page_id, text)
+
+    # Three batches of top-level blocks, then finding the IDs of the first two list levels
+    # to append the levels below the nesting limit to.
+    assert importer.requests == 3 + 2 + 1
+    exported = MarkdownExporter(client).to_markdown(page_id)
+    assert exported.startswith("Paragraph 0\n\nParagraph 1\n")
+    assert exported.endswith(deep_list + "\n")
+
+
+def test_import_page(emulator):
+    client = emulator.client()
+    parent_id = emulator.add_page("Parent")["id"]
+    page = MarkdownImporter(client).import_page(
+        {
+            "parent": {"page_id": parent_id},
+            "properties": {"title": {"title": [{"text": {"content": "Imported"}}]}},
+        },
+        DOCUMENT,
+    )
+    assert MarkdownExporter(client).to_markdown(page["id"]).startswith("# Title\n")
@@ -0,0 +1,66 @@
+import pytest
+
+from notion.errors import NotionAPIError
+from notion.hooks import endpoint_template
+from notion.metrics import MetricsCollector
+
+
+def test_endpoint_template():
+    assert (
+        endpoint_template("pages/a1b2c3d4-1234-5678-9abc-def012345678") == "pages/{id}"
+    )
+    assert (
+        endpoint_template("blocks/a1b2c3d4123456789abcdef012345678/children")
+        == "blocks/{id}/children"
+    )
+
+
+def test_hooks_see_retries(emulator):
+    client = emulator.client(retry_backoff=0)
+    events = []
+    for event in ("before_request", "after_response", "retry", "error"):
+        client.hooks.register(event, lambda e: events.append((e.event, e.status)))
+    emulator.fail_next(503)
+
+    client.search("")
+
+    assert events == [
+        ("before_request", None),
+        ("after_response", 503),
+        ("retry", None),
+        ("before_request", None),
+        ("after_response", 200),
+    ]
+
+
+def test_writes_are_not_retried_after_server_errors(emulator):
+    client = emulator.client(retry_backoff=0)
+    page_id = emulator.add_page("Page")["id"]
+    emulator.fail_next(500)
+
+    with pytest.raises(NotionAPIError) as error:
+        client.update_page(page_id, {"archived": True})
+    assert error.value.status == 500
+    assert error.value.code == "internal_server_error"
+
+
+def test_metrics_collector(emulator):
+    client = emulator.client(retry_backoff=0)
+    metrics = MetricsCollector().attach(client)
+    page_id = emulator.add_page("Page")["id"]
+    emulator.fail_next(429)
+
+    client.get_page(page_id)
+    client.get_page(page_id)
+
+    page_metrics = metrics.snapshot()["endpoints"]["GET pages/{id}"]
+    assert page_metrics["requests"] == 3
+    assert page_metrics["retries"] == 1
+    assert page_metrics["statuses"] == {429: 1, 200: 2}
+    assert page_metrics["rate_limit_wait"]["count"] == 1
+    assert page_metrics["latency"]["p99"] > 0
+    prometheus = metrics.to_prometheus()
+    assert (
+        'notion_client_requests_total{method="GET",endpoint="pages/{id}",status="200"} 2'
+        in prometheus
+    )
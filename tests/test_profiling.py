@@ -0,0 +1,59 @@
+from notion.model import block as blocks
+from notion.model.page import Page
+from notion.testing import NotionEmulator
+
+
+def test_profile_detects_n_plus_one_and_repeated_requests():
+    with NotionEmulator() as emulator:
+        client = emulator.client()
+        page = client.get_page(emulator.add_page("Playground")["id"])
+        page.append_children([Page(f"Sub Page {i}") for i in range(5)])
+
+        with client.profile(log=False) as profile:
+            children = page.children
+            parents = [child.parent for child in children]
+            page.children
+
+    assert len(parents) == 5
+    assert len(profile.requests) == 7
+    operations = {operation for operation, _ in profile.by_operation()}
+    assert operations == {"Page.children", "ChildPage.parent"}
+    assert profile.repeated_requests() == [
+        (f"{emulator.url}blocks/{page.id}/children/", 2)
+    ]
+    [(operation, call_site, endpoint, count)] = profile.n_plus_one()
+    assert operation == "ChildPage.parent"
+    assert endpoint == "GET pages/{id}"
+    assert count == 5
+    assert "test_profiling.py" in call_site
+    assert "Possible N+1 request patterns" in profile.summary()
+
+
+def test_profile_attributes_direct_client_calls():
+    with NotionEmulator() as emulator:
+        client = emulator.client()
+        with client.profile(log=False) as profile:
+            client.search("")
+
+    [request] = profile.requests
+    assert request.operation == "NotionClient.search"
+    assert request.status == 200
+
+
+def test_profile_started_during_a_retry():
+    with NotionEmulator() as emulator:
+        page_id = emulator.add_page("Playground")["id"]
+        client = emulator.client(retry_backoff=0)
+        profiling = client.profile(log=False)
+        client.hooks.register(
+            "retry", lambda event: profiles.append(profiling.__enter__())
+        )
+        profiles = []
+        emulator.fail_next(503)
+
+        client.get_page(page_id)
+        profiling.__exit__(None, None, None)
+
+    [request] = profiles[0].requests
+    assert (request.method, request.endpoint) == ("GET", "pages/{id}")
+    assert request.status == 200
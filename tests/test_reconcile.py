@@ -0,0 +1,91 @@
+from notion.model.block import BulletedListItem, HeadingOne, Paragraph, Toggle
+
+
+def texts(page):
+    return [(block.type, block.text) for block in page.children]
+
+
+def test_unchanged_content_is_left_alone(emulator, page):
+    desired = [HeadingOne("Report"), Paragraph("Intro"), Paragraph("Outro")]
+    assert page.reconcile(desired).inserted == 3
+    ids = [block.id for block in page.children]
+
+    emulator.request_log.clear()
+    result = page.reconcile(
+        [HeadingOne("Report"), Paragraph("Intro"), Paragraph("Outro")]
+    )
+
+    assert (result.kept, result.writes) == (3, 0)
+    assert len(emulator.request_log) == 1
+    assert [block.id for block in page.children] == ids
+
+
+def test_minimal_changes(page):
+    page.reconcile(
+        [HeadingOne("Report"), Paragraph("Old"), Paragraph("Keep"), Paragraph("Gone")]
+    )
+    kept_id = page.children[2].id
+
+    result = page.reconcile(
+        [
+            HeadingOne("Report"),
+            Paragraph("New"),
+            BulletedListItem("Added"),
+            Paragraph("Keep"),
+        ]
+    )
+
+    assert (result.kept, result.updated, result.inserted, result.archived) == (
+        2,
+        1,
+        1,
+        1,
+    )
+    assert texts(page) == [
+        ("heading_1", "Report"),
+        ("paragraph", "New"),
+        ("bulleted_list_item", "Added"),
+        ("paragraph", "Keep"),
+    ]
+    assert page.children[3].id == kept_id
+
+
+def test_insert_at_start(page):
+    page.reconcile([Paragraph("B"), Paragraph("C")])
+    page.reconcile([Paragraph("A"), Paragraph("B"), Paragraph("C")])
+    assert [text for _, text in texts(page)] == ["A", "B", "C"]
+
+
+def toggle(text, children):
+    data = Toggle(text).to_json()
+    data["toggle"]["children"] = [child.to_json() for child in children]
+    return data
+
+
+def test_nested_children(page):
+    page.reconcile([toggle("Details", [Paragraph("One")])])
+    toggle_id = page.children[0].id
+
+    result = page.reconcile([toggle("Details", [Paragraph("One"), Paragraph("Two")])])
+
+    assert (result.kept, result.inserted) == (2, 1)
+    (block,) = page.children
+    assert block.id == toggle_id
+    assert [child.text for child in block.children] == ["One", "Two"]
+
+
+def test_writes_exclude_reads_of_inserted_subtrees(emulator, page):
+    emulator.request_log.clear()
+
+    deep = toggle("C", [Paragraph("Deep")])
+    middle = toggle("B", [])
+    middle["toggle"]["children"] = [deep]
+    top = toggle("A", [])
+    top["toggle"]["children"] = [middle]
+
+    result = page.reconcile([top])
+
+    methods = [method for method, _, _ in emulator.request_log]
+    assert result.inserted == 1
+    assert result.writes == methods.count("PATCH") == 2
+    assert methods.count("GET") > 1
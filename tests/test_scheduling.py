@@ -0,0 +1,83 @@
+import threading
+import time
+
+from notion.rate_limit import RateLimiter
+from notion.scheduling import BULK, INTERACTIVE, NORMAL, Scheduler
+from notion.testing import NotionEmulator
+
+
+def test_interactive_requests_overtake_queued_bulk_requests():
+    scheduler = Scheduler(RateLimiter(rate=100, burst=1))
+    order = []
+
+    def send(priority_class):
+        scheduler.acquire(priority_class)
+        order.append(priority_class)
+        scheduler.release(priority_class)
+
+    bulk = [threading.Thread(target=send, args=(BULK,)) for _ in range(20)]
+    for thread in bulk:
+        thread.start()
+    while scheduler.queued(BULK) < 15:
+        time.sleep(0.001)
+    send(INTERACTIVE)
+    for thread in bulk:
+        thread.join()
+
+    assert order.index(INTERACTIVE) < len(order) - 10
+    assert order.count(BULK) == 20
+
+
+def test_concurrency_limit_of_a_class():
+    scheduler = Scheduler()
+    scheduler.acquire(BULK)
+    scheduler.acquire(BULK)
+    scheduler.acquire(BULK)
+    scheduler.acquire(BULK)
+    dispatched = threading.Event()
+
+    def send_bulk():
+        scheduler.acquire(BULK)
+        dispatched.set()
+
+    thread = threading.Thread(target=send_bulk)
+    thread.start()
+
+    assert scheduler.acquire(NORMAL) == 0
+    assert not dispatched.wait(0.05)
+    scheduler.release(BULK)
+    assert dispatched.wait(1)
+    thread.join()
+
+
+def test_client_priority_applies_to_all_requests():
+    with NotionEmulator() as emulator:
+        page_id = emulator.add_page("Playground")["id"]
+        client = emulator.client(rate_limit=1000)
+        events = []
+        client.hooks.register("before_request", events.append)
+
+        with client.priority(INTERACTIVE):
+            client.get_page(page_id)
+        client.get_page(page_id)
+
+    assert [event.priority for event in events] == [INTERACTIVE, NORMAL]
+
+
+def test_failing_hook_releases_the_scheduler_slot():
+    with NotionEmulator() as emulator:
+        page_id = emulator.add_page("Playground")["id"]
+        client = emulator.client()
+
+        def fail(event):
+            raise RuntimeError("hook failed")
+
+        client.hooks.register("before_request", fail)
+        with client.priority(BULK):
+            for _ in range(5):
+                try:
+                    client.get_page(page_id)
+                except RuntimeError:
+                    pass
+
+    assert client.scheduler.in_flight[BULK] == 0
@@ -0,0 +1,83 @@
+import time
+
+import pytest
+
+from notion.errors import NotionAPIError
+from notion.rate_limit import RateLimiter
+from notion.scheduling import BULK
+from notion.sharding import ShardedNotionClient
+from notion.testing import NotionEmulator
+
+TOKENS = ["secret_a", "secret_b", "secret_c"]
+
+
+@pytest.fixture
+def emulator():
+    with NotionEmulator(tokens=TOKENS) as emulator:
+        yield emulator
+
+
+@pytest.fixture
+def client(emulator):
+    return ShardedNotionClient(TOKENS, rate_limit=100, base_url=emulator.url)
+
+
+def test_rate_limiter_spaces_out_requests():
+    limiter = RateLimiter(rate=10, burst=2)
+
+    waits = [limiter.reserve() for _ in range(4)]
+
+    assert waits[:2] == [0, 0]
+    assert waits[2] == pytest.approx(0.1, abs=0.01)
+    assert waits[3] == pytest.approx(0.2, abs=0.01)
+
+
+def test_requests_are_spread_across_tokens(emulator, client):
+    page_id = emulator.add_page("Playground")["id"]
+
+    for _ in range(6):
+        client.get_page(page_id)
+
+    assert [shard.requests for shard in client.shards] == [2, 2, 2]
+
+
+def test_throttled_token_fails_over(emulator, client):
+    page_id = emulator.add_page("Playground")["id"]
+    emulator.fail_next(429)
+    start_time = time.monotonic()
+
+    assert client.get_page(page_id).title == "Playground"
+    assert time.monotonic() - start_time < 0.5
+    assert client.shards[0].throttled == 1
+    assert client.shards[0].limiter.delay() > 0.5
+
+
+def test_revoked_token_is_not_used_anymore(emulator, client):
+    page_id = emulator.add_page("Playground")["id"]
+    emulator.revoke("secret_a")
+
+    for _ in range(4):
+        client.get_page(page_id)
+
+    assert client.shards[0].revoked
+    assert client.shards[0].requests == 1
+
+    emulator.revoke("secret_b")
+    emulator.revoke("secret_c")
+    with pytest.raises(NotionAPIError) as error:
+        client.get_page(page_id)
+    assert error.value.status == 401
+
+
+def test_revoked_tokens_release_the_scheduler_slot(emulator, client):
+    page_id = emulator.add_page("Playground")["id"]
+    for token in TOKENS:
+        emulator.revoke(token)
+
+    with client.priority(BULK):
+        for _ in range(6):
+            with pytest.raises(NotionAPIError):
+                client.get_page(page_id)
+
+    assert client.scheduler.in_flight[BULK] == 0
+    assert all(shard.in_flight == 0 for shard in client.shards)
@@ -0,0 +1,52 @@
+import pytest
+
+from notion.title_index import TitleIndex
+
+
+@pytest.fixture
+def emulator(emulator):
+    for title in ("Roadmap 2024", "Roadmap 2025", "Meeting Notes", "Team Wiki"):
+        emulator.add_page(title)
+    return emulator
+
+
+def test_iter_search_stops_early(emulator, client):
+    pages = client.iter_search("", page_size=2)
+    next(pages)
+    next(pages)
+    assert len(emulator.request_log) == 1
+    next(pages)
+    assert len(emulator.request_log) == 2
+
+
+def test_lookups(client):
+    index = TitleIndex(client)
+    assert index.refresh() == 4
+
+    assert [entry.title for entry in index.exact("meeting  notes")] == ["Meeting Notes"]
+    assert index.resolve("Team Wiki") == index.exact("Team Wiki")[0].id
+    assert index.resolve("Unknown") is None
+    assert [entry.title for entry in index.prefix("road")] == [
+        "Roadmap 2024",
+        "Roadmap 2025",
+    ]
+    assert index.fuzzy("Metting notes")[0].title == "Meeting Notes"
+
+
+def test_incremental_refresh(emulator, client, tmp_path):
+    index = TitleIndex(client)
+    index.refresh()
+    index.save(tmp_path / "titles.json")
+
+    page_id = index.resolve("Team Wiki")
+    client.update_page(
+        page_id, {"properties": {"title": {"title": [{"text": {"content": "Wiki"}}]}}}
+    )
+    emulator.add_page("Onboarding")
+    index = TitleIndex.load(client, tmp_path / "titles.json")
+    index.refresh()
+
+    assert index.resolve("Wiki") == page_id
+    assert index.resolve("Team Wiki") is None
+    assert index.resolve("Onboarding")
+    assert len(index) == 5
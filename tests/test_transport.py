@@ -0,0 +1,44 @@
+import pytest
+
+from notion.transport import (
+    HttpxTransport,
+    RequestsTransport,
+    Transport,
+    get_transport,
+)
+from notion.testing import NotionEmulator
+
+
+def test_get_transport():
+    assert isinstance(get_transport(), RequestsTransport)
+    assert isinstance(get_transport("requests"), RequestsTransport)
+    with pytest.raises(ValueError):
+        get_transport("urllib")
+    with pytest.raises(TypeError):
+        Transport()
+
+
+@pytest.mark.parametrize("transport", ["requests", "httpx"])
+def test_transports_against_emulator(transport):
+    try:
+        transport = get_transport(transport)
+    except ImportError:
+        pytest.skip("httpx is not installed")
+
+    with NotionEmulator() as emulator:
+        page_id = emulator.add_page("Playground")["id"]
+        with emulator.client(transport=transport) as client:
+            assert client.get_page(page_id).title == "Playground"
+
+
+def test_connection_errors_are_retried_for_reads():
+    with NotionEmulator() as emulator:
+        pass
+    # The emulator is stopped, so every connection attempt fails.
+    client = emulator.client(max_retries=1, retry_backoff=0)
+    retries = []
+    client.hooks.register("retry", retries.append)
+
+    with pytest.raises(RequestsTransport.errors):
+        client.search("")
+    assert len(retries) == 1
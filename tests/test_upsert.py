@@ -0,0 +1,85 @@
+import pytest
+
+from notion.upsert import KeyIndex, upsert_many
+
+
+@pytest.fixture
+def database(emulator):
+    parent_id = emulator.add_page("Sync")["id"]
+    client = emulator.client()
+    data = client._make_request(
+        "post",
+        "databases",
+        {
+            "parent": {"page_id": parent_id},
+            "title": [{"text": {"content": "Orders"}}],
+            "properties": {
+                "Name": {"title": {}},
+                "External ID": {"rich_text": {}},
+                "Amount": {"number": {}},
+                "Status": {"select": {}},
+            },
+        },
+    )
+    return client.get_database(data["id"])
+
+
+def rows(count, amount=10):
+    return [
+        {"External ID": f"A-{i}", "Name": f"Order {i}", "Amount": amount + i}
+        for i in range(count)
+    ]
+
+
+def writes(emulator):
+    return sum(
+        method in ("POST", "PATCH") and not path.endswith("/query")
+        for method, path, _ in emulator.request_log
+    )
+
+
+def test_upsert_creates_updates_and_skips(emulator, database):
+    result = database.upsert_many(rows(5))
+    assert (result.created, result.updated, result.unchanged) == (5, 0, 0)
+
+    before = writes(emulator)
+    changed = rows(5)
+    changed[1]["Amount"] = 99
+    changed[3]["Status"] = "Shipped"
+    result = database.upsert_many(changed + rows(7)[5:])
+    assert (result.created, result.updated, result.unchanged) == (2, 2, 3)
+    assert writes(emulator) - before == 4
+
+    pages = {
+        page.properties["External ID"]["rich_text"][0]["plain_text"]: page
+        for page in database.query({})
+    }
+    assert len(pages) == 7
+    assert pages["A-1"].properties["Amount"]["number"] == 99
+    assert pages["A-3"].properties["Status"]["select"]["name"] == "Shipped"
+
+
+def test_index_refreshes_incrementally(emulator, database, tmp_path):
+    client = emulator.client()
+    index = KeyIndex(client, database.id)
+    upsert_many(client, database.id, rows(3), index=index)
+    assert len(index) == 3 and "A-2" in index
+
+    index.save(tmp_path / "index.json")
+    index = KeyIndex.load(client, tmp_path / "index.json")
+    emulator.request_log.clear()
+    result = upsert_many(client, database.id, rows(3), index=index)
+    assert result.unchanged == 3
+    assert writes(emulator) == 0
+
+    page_id = index.get("A-0").page_id
+    client.delete_page(page_id)
+    assert index.refresh(full=True) == 2
+    assert "A-0" not in index
+
+
+def test_rows_need_a_key(database):
+    with pytest.raises(ValueError):
+        database.upsert_many([{"Name": "No key"}])
+    with pytest.raises(ValueError):
+        database.upsert_many([{"External ID": "A-1", "Missing": 1}])
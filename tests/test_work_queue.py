@@ -0,0 +1,70 @@
+import pytest
+
+from notion.work_queue import DONE, FAILED, PENDING, SQLiteWorkQueue, WorkQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = SQLiteWorkQueue(tmp_path / "work.db", max_attempts=2)
+    yield queue
+    queue.close()
+
+
+def test_lease_and_complete(queue):
+    assert queue.put([("a", {"n": 1}), ("b", {"n": 2})]) == 2
+    assert queue.put([("a", {"n": 3}), ("c", {"n": 4})]) == 1
+
+    leases = queue.lease("worker-1", count=2)
+    assert [(lease.key, lease.data) for lease in leases] == [
+        ("a", {"n": 1}),
+        ("b", {"n": 2}),
+    ]
+    assert [lease.key for lease in queue.lease("worker-2", count=2)] == ["c"]
+    assert queue.lease("worker-2") == []
+
+    assert all(queue.complete(lease) for lease in leases)
+    assert queue.counts()[DONE] == 2
+    assert not queue.finished()
+
+
+def test_expired_leases_are_stolen(queue, tmp_path):
+    queue.put([("a", {})])
+    (lease,) = queue.lease("worker-1", duration=0)
+
+    other = SQLiteWorkQueue(tmp_path / "work.db")
+    (stolen,) = other.lease("worker-2")
+    assert stolen.key == "a" and stolen.attempts == 2
+
+    assert not queue.renew(lease)
+    assert not queue.complete(lease)
+    assert other.complete(stolen)
+    assert queue.finished()
+    other.close()
+
+
+def test_items_failing_every_lease_are_given_up(queue):
+    queue.put([("a", {}), ("b", {})])
+    queue.lease("worker-1", count=2, duration=0)
+    (lease,) = queue.lease("worker-2", duration=0)
+    assert lease.key == "a" and lease.attempts == 2
+
+    assert [lease.key for lease in queue.lease("worker-3", count=2)] == ["b"]
+    assert queue.failures() == [("a", {}, "Lease expired.")]
+
+
+def test_failed_items_are_retried(queue):
+    queue.put([("a", {})])
+    (lease,) = queue.lease("worker-1")
+    assert queue.fail(lease, "boom")
+    assert queue.counts()[PENDING] == 1
+
+    (lease,) = queue.lease("worker-1")
+    queue.fail(lease, "boom again")
+    assert queue.counts()[FAILED] == 1
+    assert queue.failures() == [("a", {}, "boom again")]
+    assert queue.finished()
+
+
+def test_work_queue_is_abstract():
+    with pytest.raises(TypeError):
+        WorkQueue()